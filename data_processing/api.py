@@ -1,33 +1,196 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
+import argparse
 import json
+import os
 from datetime import datetime
 import threading
 import time
-from market_data.api_client import MarketDataClient
-from news_sentiment import NewsAPIClient, SentimentAnalyzer, NewsSentimentManager
-from ml_models.trading_model import TradingSignalModel
+from signal_workers import SignalWorkerPool
+from outbound_queue import OutboundDispatcher
 
 app = Flask(__name__)
 CORS(app)
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# Initialize clients
-market_client = MarketDataClient(provider='twelvedata', api_key='YOUR_API_KEY')
-news_client = NewsAPIClient(api_provider='newsapi', api_key='YOUR_API_KEY')
-sentiment_analyzer = SentimentAnalyzer()
-news_manager = NewsSentimentManager(news_client, sentiment_analyzer)
-trading_model = TradingSignalModel()
+# Clients are built on first use: pandas, scikit-learn, NLTK and the VADER
+# lexicon are only imported when a subsystem is actually needed
+_services = {}
+_services_lock = threading.Lock()
+
+# Sentiment backend mode of the news manager (see SentimentAnalyzer)
+sentiment_backends = 'vader'
+
+# ModelRegistry directory and model name served (None: no registry)
+model_registry = None
+model_name = 'trading_signal'
+
+# Set once warm_up() has loaded the model and run a dummy inference
+ready = threading.Event()
+startup_timings = {}
+# Error that stopped warm_up() (None while warming up or once ready)
+startup_error = None
+
+def _service(name, factory):
+    service = _services.get(name)
+    if service is None:
+        with _services_lock:
+            service = _services.get(name)
+            if service is None:
+                service = _services[name] = factory()
+    return service
+
+def get_market_client():
+    def build():
+        from market_data.api_client import MarketDataClient
+        return MarketDataClient(api_provider='twelvedata', api_key='YOUR_API_KEY')
+    return _service('market_client', build)
+
+def get_news_manager():
+    def build():
+        from news_sentiment import NewsAPIClient, SentimentAnalyzer, NewsSentimentManager, SentimentCache
+        news_client = NewsAPIClient(api_provider='newsapi', api_key='YOUR_API_KEY', fold_keywords=True)
+        cache = SentimentCache(os.path.join('data', 'sentiment_cache.sqlite'))
+        return NewsSentimentManager(news_client, SentimentAnalyzer(cache=cache, backends=sentiment_backends))
+    return _service('news_manager', build)
+
+def get_model_handle():
+    def build():
+        from ml_models.trading_model import TradingSignalModel
+        from ml_models.model_registry import ModelRegistry, ModelHandle
+        registry = ModelRegistry(model_registry) if model_registry else None
+        handle = ModelHandle(registry=registry, name=model_name, warm=_warm_model)
+        if handle.model is None:
+            handle.swap(TradingSignalModel())
+        return handle
+    return _service('model_handle', build)
+
+def get_trading_model():
+    """Model currently served (read once per request so hot swaps never split one)"""
+    return get_model_handle().model
+
+def _dummy_market_data(bars=250):
+    """Synthetic OHLCV bars, long enough for every indicator window"""
+    import numpy as np
+    import pandas as pd
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, bars))
+    return pd.DataFrame({
+        'open': close,
+        'high': close + 0.5,
+        'low': close - 0.5,
+        'close': close,
+        'volume': np.full(bars, 1000.0)
+    }, index=pd.date_range(end=datetime.now(), periods=bars, freq='h'))
+
+def _warm_model(trading_model):
+    """Run one dummy inference so a model's first real request is not slower"""
+    market_data = _dummy_market_data()
+    # Goes through the same news conversion as a live request with no articles
+    sentiment_data = get_news_manager().get_signal_sentiment({'warm_up': []})['warm_up']
+    if trading_model.is_trained:
+        trading_model.predict_latest(market_data, sentiment_data, key='warm_up')
+        trading_model.live_states.pop('warm_up', None)
+    else:
+        # No trained model yet: still exercise the indicator and feature path
+        trading_model.prepare_features(market_data, sentiment_data)
+
+def warm_up(model_path=None):
+    """
+    Load heavy subsystems before reporting readiness
+    
+    Builds every client, loads the model, primes the sentiment lexicons and
+    runs one dummy inference so the first real request doesn't pay for
+    imports, corpus loading or first-call overhead. With a model registry,
+    newly promoted versions are then hot-swapped in as they appear. If a
+    step fails, the error is logged and /api/health reports it.
+    
+    Args:
+        model_path (str): Saved TradingSignalModel to load (when no
+            registry version is current)
+        
+    Returns:
+        dict: Seconds spent in each warm-up step
+    """
+    global startup_error
+    try:
+        started = time.perf_counter()
+        get_market_client()
+        news_manager = get_news_manager()
+        handle = get_model_handle()
+        trading_model = handle.model
+        startup_timings['clients'] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        if model_path and handle.version is None:
+            trading_model.load_model(model_path)
+        startup_timings['model_load'] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        news_manager.sentiment_analyzer.warm_up()
+        startup_timings['sentiment'] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        _warm_model(trading_model)
+        startup_timings['dummy_inference'] = time.perf_counter() - started
+        
+        if handle.registry is not None:
+            handle.watch()
+    except Exception as e:
+        # Reported by /api/health instead of leaving it 'warming' forever
+        print(f"Error warming up: {str(e)}")
+        startup_error = str(e)
+        return startup_timings
+    ready.set()
+    return startup_timings
 
 # Store active subscriptions
 active_subscriptions = {}
 
+# Subscriptions held by each connected client: sid -> {(type, asset, timeframe)}
+client_subscriptions = {}
+
+# Sharded signal worker processes (None when signals run in-process)
+signal_pool = None
+
+def _transport_backlog(sid):
+    """Number of packets waiting in a client's engine.io transport queue"""
+    try:
+        eio_sid = socketio.server.manager.eio_sid_from_sid(sid, '/')
+        eio_socket = socketio.server.eio.sockets.get(eio_sid)
+    except Exception:
+        return 0
+    return eio_socket.queue.qsize() if eio_socket else 0
+
+# Per-client bounded outboxes; price updates are conflated to the latest value
+outbound = OutboundDispatcher(
+    send=lambda sid, event, payload: socketio.emit(event, payload, to=sid),
+    disconnect=lambda sid: socketio.server.disconnect(sid),
+    transport_backlog=_transport_backlog
+)
+
+def _subscribers(subscription_type, asset, timeframe):
+    key = (subscription_type, asset, timeframe)
+    return [sid for sid, keys in list(client_subscriptions.items()) if key in keys]
+
+@app.route('/api/health')
+def get_health():
+    if startup_error is not None:
+        return jsonify({'status': 'failed', 'error': startup_error, 'startup': startup_timings}), 503
+    if not ready.is_set():
+        return jsonify({'status': 'warming'}), 503
+    return jsonify({
+        'status': 'ready',
+        'startup': startup_timings,
+        'model_version': get_model_handle().version,
+        'timestamp': datetime.now().isoformat()
+    })
+
 @app.route('/api/market-data/<asset>')
 def get_market_data(asset):
     timeframe = request.args.get('timeframe', '1h')
     try:
-        data = market_client.get_price_data(asset, interval=timeframe, bars=100)
+        data = get_market_client().get_price_data(asset, interval=timeframe, bars=100)
         return jsonify({
             'prices': data.to_dict('records'),
             'timestamp': datetime.now().isoformat()
@@ -40,13 +203,15 @@ def get_trading_signal(asset):
     timeframe = request.args.get('timeframe', '1h')
     try:
         # Get market data
-        market_data = market_client.get_price_data(asset, interval=timeframe, bars=100)
+        market_data = get_market_client().get_price_data(asset, interval=timeframe, bars=100)
         
         # Get news sentiment
+        news_manager = get_news_manager()
         news_data = news_manager.collect_and_analyze_news([asset], days_back=3, max_articles_per_asset=5)
+        sentiment_data = news_manager.get_signal_sentiment(news_data)[asset]
         
         # Generate trading signal
-        signal = trading_model.predict(market_data, news_data)
+        signal = get_trading_model().predict_latest(market_data, sentiment_data, key=(asset, timeframe))
         
         return jsonify({
             'signal': signal['signal'],
@@ -60,55 +225,142 @@ def get_trading_signal(asset):
 @app.route('/api/news-sentiment/<asset>')
 def get_news_sentiment(asset):
     try:
-        news_data = news_manager.collect_and_analyze_news([asset], days_back=3, max_articles_per_asset=5)
+        news_data = get_news_manager().collect_and_analyze_news([asset], days_back=3, max_articles_per_asset=5)
+        articles = news_data[asset]
+        scores = [article['sentiment']['vader_compound'] for article in articles]
         
         # Calculate overall sentiment
         overall_sentiment = {
-            'score': sum(article['sentiment'] for article in news_data) / len(news_data),
-            'direction': 'positive' if sum(article['sentiment'] for article in news_data) > 0 else 'negative'
+            'score': sum(scores) / len(scores) if scores else 0,
+            'direction': 'positive' if sum(scores) > 0 else 'negative'
         }
         
         return jsonify({
             'overall_sentiment': overall_sentiment,
-            'articles': news_data,
+            'articles': articles,
             'timestamp': datetime.now().isoformat()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/metrics/socket')
+def get_socket_metrics():
+    return jsonify({
+        'outbound': outbound.get_metrics(),
+        'timestamp': datetime.now().isoformat()
+    })
+
 def background_market_data_updates():
     while True:
         for asset, timeframe in active_subscriptions.get('market_data', []):
             try:
-                data = market_client.get_price_data(asset, interval=timeframe, bars=1)
-                socketio.emit('market_data_update', {
+                data = get_market_client().get_price_data(asset, interval=timeframe, bars=1)
+                outbound.publish('market_data_update', (asset, timeframe), {
                     'asset': asset,
                     'timeframe': timeframe,
                     'data': data.iloc[-1].to_dict(),
                     'timestamp': datetime.now().isoformat()
-                })
+                }, _subscribers('market_data', asset, timeframe))
             except Exception as e:
                 print(f"Error updating market data for {asset}: {str(e)}")
         time.sleep(1)  # Update every second
 
 def background_signal_updates():
     while True:
-        for asset, timeframe in active_subscriptions.get('trading_signals', []):
+        # Fetch every subscription's data, then score them all with one model call
+        subscriptions = list(active_subscriptions.get('trading_signals', []))
+        assets = list(dict.fromkeys(asset for asset, _ in subscriptions))
+        sentiment = {}
+        if assets:
             try:
-                market_data = market_client.get_price_data(asset, interval=timeframe, bars=100)
-                news_data = news_manager.collect_and_analyze_news([asset], days_back=3, max_articles_per_asset=5)
-                signal = trading_model.predict(market_data, news_data)
-                
-                socketio.emit('trading_signal_update', {
-                    'asset': asset,
-                    'timeframe': timeframe,
-                    'signal': signal,
-                    'timestamp': datetime.now().isoformat()
-                })
+                news_manager = get_news_manager()
+                news_data = news_manager.collect_and_analyze_news(assets, days_back=3, max_articles_per_asset=5)
+                sentiment = news_manager.get_signal_sentiment(news_data)
+            except Exception as e:
+                print(f"Error collecting news for trading signals: {str(e)}")
+        
+        streams = {}
+        for asset, timeframe in subscriptions:
+            if asset not in sentiment:
+                continue
+            try:
+                market_data = get_market_client().get_price_data(asset, interval=timeframe, bars=100)
+                streams[(asset, timeframe)] = (market_data, sentiment[asset])
             except Exception as e:
                 print(f"Error updating trading signal for {asset}: {str(e)}")
+        
+        try:
+            signals = get_trading_model().predict_batch(streams) if streams else {}
+        except Exception as e:
+            print(f"Error scoring trading signals: {str(e)}")
+            signals = {}
+        for (asset, timeframe), signal in signals.items():
+            if 'error' in signal:
+                print(f"Error updating trading signal for {asset}: {signal['error']}")
+                continue
+            outbound.publish('trading_signal_update', (asset, timeframe), {
+                'asset': asset,
+                'timeframe': timeframe,
+                'signal': signal,
+                'timestamp': datetime.now().isoformat()
+            }, _subscribers('trading_signals', asset, timeframe))
         time.sleep(5)  # Update every 5 seconds
 
+def background_news_updates():
+    """Stream news sentiment to subscribers asset by asset as each batch is scored"""
+    while True:
+        subscriptions = list(active_subscriptions.get('news_sentiment', []))
+        assets = list(dict.fromkeys(asset for asset, _ in subscriptions))
+        if assets:
+            try:
+                for result in get_news_manager().stream_and_analyze_news(assets, days_back=3, max_articles_per_asset=5):
+                    for asset, timeframe in subscriptions:
+                        if asset != result['asset']:
+                            continue
+                        outbound.publish('news_sentiment_update', (asset, timeframe), {
+                            'asset': asset,
+                            'articles': result['articles'],
+                            'summary': result['summary'],
+                            'complete': result['complete'],
+                            'timestamp': datetime.now().isoformat()
+                        }, _subscribers('news_sentiment', asset, timeframe))
+            except Exception as e:
+                print(f"Error streaming news sentiment: {str(e)}")
+        time.sleep(30)  # Update every 30 seconds
+
+def background_signal_results():
+    """Emit the signals published by the sharded worker processes"""
+    while True:
+        result = signal_pool.get_result(timeout=1)
+        if result is None:
+            continue
+        asset, timeframe, payload = result
+        outbound.publish('trading_signal_update', (asset, timeframe), payload,
+                         _subscribers('trading_signals', asset, timeframe))
+
+def _release_subscription(subscription_type, asset, timeframe):
+    """Stop updating a stream once no connected client subscribes to it"""
+    if _subscribers(subscription_type, asset, timeframe):
+        return
+    if subscription_type in active_subscriptions:
+        active_subscriptions[subscription_type] = [
+            (a, t) for a, t in active_subscriptions[subscription_type]
+            if not (a == asset and t == timeframe)
+        ]
+        if subscription_type == 'trading_signals' and signal_pool:
+            signal_pool.unsubscribe(asset, timeframe)
+
+@socketio.on('connect')
+def handle_connect(auth=None):
+    client_subscriptions[request.sid] = set()
+    outbound.add_client(request.sid)
+
+@socketio.on('disconnect')
+def handle_disconnect(reason=None):
+    outbound.remove_client(request.sid)
+    for key in client_subscriptions.pop(request.sid, set()):
+        _release_subscription(*key)
+
 @socketio.on('subscribe')
 def handle_subscription(data):
     subscription_type = data.get('type')
@@ -116,11 +368,15 @@ def handle_subscription(data):
     timeframe = data.get('timeframe')
     
     if subscription_type and asset and timeframe:
+        client_subscriptions.setdefault(request.sid, set()).add((subscription_type, asset, timeframe))
+        
         if subscription_type not in active_subscriptions:
             active_subscriptions[subscription_type] = []
         
         if (asset, timeframe) not in active_subscriptions[subscription_type]:
             active_subscriptions[subscription_type].append((asset, timeframe))
+            if subscription_type == 'trading_signals' and signal_pool:
+                signal_pool.subscribe(asset, timeframe)
 
 @socketio.on('unsubscribe')
 def handle_unsubscription(data):
@@ -128,16 +384,48 @@ def handle_unsubscription(data):
     asset = data.get('asset')
     timeframe = data.get('timeframe')
     
-    if subscription_type in active_subscriptions:
-        active_subscriptions[subscription_type] = [
-            (a, t) for a, t in active_subscriptions[subscription_type]
-            if not (a == asset and t == timeframe)
-        ]
+    client_subscriptions.get(request.sid, set()).discard((subscription_type, asset, timeframe))
+    _release_subscription(subscription_type, asset, timeframe)
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Trading platform API server')
+    parser.add_argument('--signal-workers', type=int, default=0,
+                        help='Generate signals in this many sharded worker processes (0 = in-process thread)')
+    parser.add_argument('--model-path', default=None,
+                        help='Saved TradingSignalModel to preload (in-process and in each signal worker)')
+    parser.add_argument('--model-registry', default=None,
+                        help='ModelRegistry directory; promoted versions are hot-swapped in')
+    parser.add_argument('--model-name', default='trading_signal',
+                        help='Registered model to serve')
+    parser.add_argument('--sentiment-backends', default='vader', choices=['vader', 'both'],
+                        help='Sentiment backends run on news (signals only use VADER scores)')
+    args = parser.parse_args()
+    sentiment_backends = args.sentiment_backends
+    model_registry, model_name = args.model_registry, args.model_name
+    
+    # Warm up in the background; /api/health reports 503 until it finishes
+    threading.Thread(target=warm_up, args=(args.model_path,), daemon=True).start()
+    
     # Start background update threads
+    threading.Thread(target=outbound.run, daemon=True).start()
     threading.Thread(target=background_market_data_updates, daemon=True).start()
-    threading.Thread(target=background_signal_updates, daemon=True).start()
+    threading.Thread(target=background_news_updates, daemon=True).start()
+    if args.signal_workers > 0:
+        signal_pool = SignalWorkerPool(
+            num_workers=args.signal_workers,
+            model_path=args.model_path,
+            model_registry=args.model_registry,
+            model_name=args.model_name,
+            sentiment_cache_path=os.path.join('data', 'sentiment_cache.sqlite'),
+            sentiment_backends=args.sentiment_backends
+        ).start()
+        threading.Thread(target=background_signal_results, daemon=True).start()
+    else:
+        threading.Thread(target=background_signal_updates, daemon=True).start()
     
     # Start the Flask app
-    socketio.run(app, debug=True, port=5000) 
\ No newline at end of file
+    try:
+        socketio.run(app, debug=args.signal_workers == 0, port=5000)
+    finally:
+        if signal_pool:
+            signal_pool.stop() 
\ No newline at end of file
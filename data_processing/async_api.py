@@ -0,0 +1,507 @@
+"""
+Production server for the trading platform API.
+
+Serves the same REST endpoints and SocketIO events as ``api.py`` on an
+asyncio worker model: provider and news requests go through a shared aiohttp
+session, while sentiment analysis, indicators and model inference run on a
+bounded thread pool so a slow computation never stalls the event loop.
+
+Usage:
+    python async_api.py --port 5000 --cpu-workers 8 --io-connections 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import aiohttp
+import socketio
+from aiohttp import web
+
+from market_data.api_client import MarketDataClient
+from news_sentiment import NewsAPIClient, SentimentAnalyzer, NewsSentimentManager, SentimentCache, NewsPipeline
+from ml_models.trading_model import TradingSignalModel
+from ml_models.model_registry import ModelRegistry, ModelHandle
+from outbound_queue import OutboundDispatcher
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when the CPU executor already holds its maximum number of tasks"""
+
+
+class BoundedExecutor(ThreadPoolExecutor):
+    """
+    Thread pool for CPU-bound work that rejects new tasks once full
+
+    Instead of letting the internal queue grow without limit under load,
+    ``submit`` raises ``ExecutorSaturated`` when ``max_workers + max_pending``
+    tasks are already running or queued, so callers can shed load.
+    """
+    def __init__(self, max_workers, max_pending):
+        """
+        Initialize the executor
+
+        Args:
+            max_workers (int): Number of worker threads
+            max_pending (int): Tasks allowed to wait for a free worker
+        """
+        super().__init__(max_workers=max_workers, thread_name_prefix='cpu-worker')
+        self.capacity = max_workers + max_pending
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._in_flight_lock:
+            if self._in_flight >= self.capacity:
+                raise ExecutorSaturated(f"CPU executor is full ({self.capacity} tasks)")
+            self._in_flight += 1
+        try:
+            future = super().submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future=None):
+        with self._in_flight_lock:
+            self._in_flight -= 1
+
+
+class AsyncTradingServer:
+    """
+    Asyncio implementation of the trading platform API
+    """
+    def __init__(self, config):
+        """
+        Initialize the server
+
+        Args:
+            config (argparse.Namespace): Server configuration, see ``parse_args``
+        """
+        self.config = config
+
+        # Initialize clients
+        self.market_client = MarketDataClient(api_provider='twelvedata', api_key=config.market_api_key)
+        self.news_client = NewsAPIClient(api_provider='newsapi', api_key=config.news_api_key, fold_keywords=True)
+        self.sentiment_analyzer = SentimentAnalyzer(
+            cache=SentimentCache(os.path.join('data', 'sentiment_cache.sqlite')),
+            backends=config.sentiment_backends
+        )
+        self.news_manager = NewsSentimentManager(self.news_client, self.sentiment_analyzer)
+        registry = ModelRegistry(config.model_registry) if config.model_registry else None
+        self.model_handle = ModelHandle(registry=registry, name=config.model_name)
+        if self.model_handle.model is None:
+            self.model_handle.swap(TradingSignalModel())
+
+        # Store active subscriptions
+        self.active_subscriptions = {}
+        # Subscriptions held by each connected client: sid -> {(type, asset, timeframe)}
+        self.client_subscriptions = {}
+
+        # Per-client bounded outboxes, dispatched from the event loop; price
+        # updates are conflated to the latest value
+        self.outbound = OutboundDispatcher(
+            send=self._send,
+            disconnect=lambda sid: self._spawn(self.sio.disconnect(sid)),
+            transport_backlog=self._transport_backlog
+        )
+        self.emit_tasks = set()
+
+        self.session = None
+        self.executor = None
+        self.background_tasks = []
+        self.stopping = asyncio.Event()
+
+        self.sio = socketio.AsyncServer(async_mode='aiohttp', cors_allowed_origins='*')
+        self.app = web.Application(middlewares=[self.cors_middleware])
+        self.sio.attach(self.app)
+
+        self.app.router.add_get('/api/market-data/{asset:.+}', self.get_market_data)
+        self.app.router.add_get('/api/trading-signal/{asset:.+}', self.get_trading_signal)
+        self.app.router.add_get('/api/news-sentiment/{asset:.+}', self.get_news_sentiment)
+        self.app.router.add_get('/api/metrics/socket', self.get_socket_metrics)
+
+        self.sio.on('connect', self.handle_connect)
+        self.sio.on('disconnect', self.handle_disconnect)
+        self.sio.on('subscribe', self.handle_subscription)
+        self.sio.on('unsubscribe', self.handle_unsubscription)
+
+        self.app.on_startup.append(self.on_startup)
+        self.app.on_shutdown.append(self.on_shutdown)
+        self.app.on_cleanup.append(self.on_cleanup)
+
+    @property
+    def trading_model(self):
+        """Model currently served; promoted registry versions are swapped in atomically"""
+        return self.model_handle.model
+
+    @web.middleware
+    async def cors_middleware(self, request, handler):
+        response = await handler(request)
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        return response
+
+    async def on_startup(self, app):
+        """Open the shared HTTP session and start the background update loops"""
+        connector = aiohttp.TCPConnector(limit=self.config.io_connections)
+        timeout = aiohttp.ClientTimeout(total=self.config.request_timeout)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        self.executor = BoundedExecutor(
+            max_workers=self.config.cpu_workers,
+            max_pending=self.config.max_pending_tasks
+        )
+        self.background_tasks = [
+            asyncio.create_task(self.dispatch_outbound()),
+            asyncio.create_task(self.background_market_data_updates()),
+            asyncio.create_task(self.background_signal_updates()),
+            asyncio.create_task(self.background_news_updates())
+        ]
+        if self.model_handle.registry is not None:
+            self.model_handle.watch()
+
+    async def on_shutdown(self, app):
+        """Stop the background loops, letting an in-progress update finish"""
+        self.stopping.set()
+        self.model_handle.stop()
+        done, pending = await asyncio.wait(
+            self.background_tasks, timeout=self.config.shutdown_timeout
+        )
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def on_cleanup(self, app):
+        """Close the HTTP session, drain the CPU executor and flush stored news"""
+        await self.session.close()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.executor.shutdown, True)
+        await loop.run_in_executor(None, self.news_manager.close)
+
+    def _spawn(self, coro):
+        """Run a coroutine as a task of the event loop, logging its failure"""
+        task = asyncio.ensure_future(coro)
+        self.emit_tasks.add(task)
+        task.add_done_callback(self._spawn_done)
+        return task
+
+    def _spawn_done(self, task):
+        self.emit_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error sending socket message: {str(task.exception())}")
+
+    def _send(self, sid, event, payload):
+        self._spawn(self.sio.emit(event, payload, to=sid))
+
+    def _transport_backlog(self, sid):
+        """Number of packets waiting in a client's engine.io transport queue"""
+        try:
+            eio_sid = self.sio.manager.eio_sid_from_sid(sid, '/')
+            eio_socket = self.sio.eio.sockets.get(eio_sid)
+        except Exception:
+            return 0
+        return eio_socket.queue.qsize() if eio_socket else 0
+
+    def _subscribers(self, subscription_type, asset, timeframe):
+        key = (subscription_type, asset, timeframe)
+        return [sid for sid, keys in list(self.client_subscriptions.items()) if key in keys]
+
+    async def dispatch_outbound(self):
+        """Send queued updates to each client at the pace its transport allows"""
+        while not self.stopping.is_set():
+            self.outbound.dispatch_once()
+            await self._sleep_or_stop(self.outbound.interval)
+
+    async def run_cpu(self, func, *args):
+        """Run a CPU-bound callable on the bounded executor"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def fetch_inputs(self, asset, timeframe):
+        """Fetch market data and news of one subscription concurrently"""
+        return await asyncio.gather(
+            self.market_client.get_price_data_async(self.session, asset, interval=timeframe, bars=100),
+            self.news_manager.collect_and_analyze_news_async(
+                self.session, [asset], days_back=3, max_articles_per_asset=5, executor=self.executor
+            )
+        )
+
+    async def fetch_signal(self, asset, timeframe):
+        """Fetch market data and news concurrently, then run inference off the loop"""
+        market_data, news_data = await self.fetch_inputs(asset, timeframe)
+        sentiment_data = self.news_manager.get_signal_sentiment(news_data)[asset]
+        return await self.run_cpu(self.trading_model.predict_latest, market_data, sentiment_data, (asset, timeframe))
+
+    async def get_market_data(self, request):
+        asset = request.match_info['asset']
+        timeframe = request.query.get('timeframe', '1h')
+        try:
+            data = await self.market_client.get_price_data_async(
+                self.session, asset, interval=timeframe, bars=100
+            )
+            return web.json_response({
+                'prices': data.to_dict('records'),
+                'timestamp': datetime.now().isoformat()
+            })
+        except Exception as e:
+            return web.json_response({'error': str(e)}, status=500)
+
+    async def get_trading_signal(self, request):
+        asset = request.match_info['asset']
+        timeframe = request.query.get('timeframe', '1h')
+        try:
+            signal = await self.fetch_signal(asset, timeframe)
+            return web.json_response({
+                'signal': signal['signal'],
+                'confidence': signal['confidence'],
+                'features': signal['features'],
+                'timestamp': datetime.now().isoformat()
+            }, dumps=_dumps)
+        except ExecutorSaturated as e:
+            return web.json_response({'error': str(e)}, status=503)
+        except Exception as e:
+            return web.json_response({'error': str(e)}, status=500)
+
+    async def get_news_sentiment(self, request):
+        asset = request.match_info['asset']
+        try:
+            news_data = await self.news_manager.collect_and_analyze_news_async(
+                self.session, [asset], days_back=3, max_articles_per_asset=5, executor=self.executor
+            )
+            articles = news_data[asset]
+            scores = [article['sentiment']['vader_compound'] for article in articles]
+
+            # Calculate overall sentiment
+            overall_sentiment = {
+                'score': sum(scores) / len(scores) if scores else 0,
+                'direction': 'positive' if sum(scores) > 0 else 'negative'
+            }
+
+            return web.json_response({
+                'overall_sentiment': overall_sentiment,
+                'articles': articles,
+                'timestamp': datetime.now().isoformat()
+            }, dumps=_dumps)
+        except ExecutorSaturated as e:
+            return web.json_response({'error': str(e)}, status=503)
+        except Exception as e:
+            return web.json_response({'error': str(e)}, status=500)
+
+    async def get_socket_metrics(self, request):
+        return web.json_response({
+            'outbound': self.outbound.get_metrics(),
+            'timestamp': datetime.now().isoformat()
+        })
+
+    async def _sleep_or_stop(self, seconds):
+        """Sleep between update rounds, returning early on shutdown"""
+        try:
+            await asyncio.wait_for(self.stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def background_market_data_updates(self):
+        async def update(asset, timeframe):
+            try:
+                data = await self.market_client.get_price_data_async(
+                    self.session, asset, interval=timeframe, bars=1
+                )
+                self.outbound.publish('market_data_update', (asset, timeframe), {
+                    'asset': asset,
+                    'timeframe': timeframe,
+                    'data': data.iloc[-1].to_dict(),
+                    'timestamp': datetime.now().isoformat()
+                }, self._subscribers('market_data', asset, timeframe))
+            except Exception as e:
+                print(f"Error updating market data for {asset}: {str(e)}")
+
+        while not self.stopping.is_set():
+            subscriptions = list(self.active_subscriptions.get('market_data', []))
+            await asyncio.gather(*[update(asset, timeframe) for asset, timeframe in subscriptions])
+            await self._sleep_or_stop(1)  # Update every second
+
+    async def background_signal_updates(self):
+        async def fetch_market_data(asset, timeframe):
+            try:
+                return (asset, timeframe), await self.market_client.get_price_data_async(
+                    self.session, asset, interval=timeframe, bars=100
+                )
+            except Exception as e:
+                print(f"Error updating trading signal for {asset}: {str(e)}")
+                return (asset, timeframe), None
+
+        async def fetch_sentiment(assets):
+            if not assets:
+                return {}
+            try:
+                news_data = await self.news_manager.collect_and_analyze_news_async(
+                    self.session, assets, days_back=3, max_articles_per_asset=5, executor=self.executor
+                )
+                return self.news_manager.get_signal_sentiment(news_data)
+            except Exception as e:
+                print(f"Error collecting news for trading signals: {str(e)}")
+                return {}
+
+        while not self.stopping.is_set():
+            subscriptions = list(self.active_subscriptions.get('trading_signals', []))
+            assets = list(dict.fromkeys(asset for asset, _ in subscriptions))
+            # Fetch concurrently (news once for every asset), then score every
+            # subscription with one model call
+            sentiment, *fetched = await asyncio.gather(
+                fetch_sentiment(assets),
+                *[fetch_market_data(asset, timeframe) for asset, timeframe in subscriptions]
+            )
+            streams = {
+                (asset, timeframe): (market_data, sentiment[asset])
+                for (asset, timeframe), market_data in fetched
+                if market_data is not None and asset in sentiment
+            }
+            try:
+                signals = await self.run_cpu(self.trading_model.predict_batch, streams) if streams else {}
+            except Exception as e:
+                print(f"Error scoring trading signals: {str(e)}")
+                signals = {}
+
+            for (asset, timeframe), signal in signals.items():
+                if 'error' in signal:
+                    print(f"Error updating trading signal for {asset}: {signal['error']}")
+                    continue
+                self.outbound.publish('trading_signal_update', (asset, timeframe), {
+                    'asset': asset,
+                    'timeframe': timeframe,
+                    'signal': signal,
+                    'timestamp': datetime.now().isoformat()
+                }, self._subscribers('trading_signals', asset, timeframe))
+            await self._sleep_or_stop(5)  # Update every 5 seconds
+
+    async def background_news_updates(self):
+        """Emit news sentiment asset by asset as each batch is scored"""
+        while not self.stopping.is_set():
+            subscriptions = list(self.active_subscriptions.get('news_sentiment', []))
+            assets = list(dict.fromkeys(asset for asset, _ in subscriptions))
+            if assets:
+                # Waits on the pipeline use the default executor, not the bounded CPU pool
+                results = NewsPipeline(self.news_manager).stream_async(
+                    assets, days_back=3, max_articles_per_asset=5
+                )
+                try:
+                    async for result in results:
+                        for asset, timeframe in subscriptions:
+                            if asset != result['asset']:
+                                continue
+                            self.outbound.publish('news_sentiment_update', (asset, timeframe), {
+                                'asset': asset,
+                                'articles': result['articles'],
+                                'summary': result['summary'],
+                                'complete': result['complete'],
+                                'timestamp': datetime.now().isoformat()
+                            }, self._subscribers('news_sentiment', asset, timeframe))
+                        if self.stopping.is_set():
+                            break
+                except Exception as e:
+                    print(f"Error streaming news sentiment: {str(e)}")
+                finally:
+                    await results.aclose()
+            await self._sleep_or_stop(30)  # Update every 30 seconds
+
+    def _release_subscription(self, subscription_type, asset, timeframe):
+        """Stop updating a stream once no connected client subscribes to it"""
+        if self._subscribers(subscription_type, asset, timeframe):
+            return
+        if subscription_type in self.active_subscriptions:
+            self.active_subscriptions[subscription_type] = [
+                (a, t) for a, t in self.active_subscriptions[subscription_type]
+                if not (a == asset and t == timeframe)
+            ]
+
+    async def handle_connect(self, sid, environ, auth=None):
+        self.client_subscriptions[sid] = set()
+        self.outbound.add_client(sid)
+
+    async def handle_disconnect(self, sid, reason=None):
+        self.outbound.remove_client(sid)
+        for key in self.client_subscriptions.pop(sid, set()):
+            self._release_subscription(*key)
+
+    async def handle_subscription(self, sid, data):
+        subscription_type = data.get('type')
+        asset = data.get('asset')
+        timeframe = data.get('timeframe')
+
+        if subscription_type and asset and timeframe:
+            self.client_subscriptions.setdefault(sid, set()).add((subscription_type, asset, timeframe))
+
+            if subscription_type not in self.active_subscriptions:
+                self.active_subscriptions[subscription_type] = []
+
+            if (asset, timeframe) not in self.active_subscriptions[subscription_type]:
+                self.active_subscriptions[subscription_type].append((asset, timeframe))
+
+    async def handle_unsubscription(self, sid, data):
+        subscription_type = data.get('type')
+        asset = data.get('asset')
+        timeframe = data.get('timeframe')
+
+        self.client_subscriptions.get(sid, set()).discard((subscription_type, asset, timeframe))
+        self._release_subscription(subscription_type, asset, timeframe)
+
+    def run(self):
+        """Serve until SIGINT/SIGTERM, then shut down gracefully"""
+        web.run_app(
+            self.app,
+            host=self.config.host,
+            port=self.config.port,
+            shutdown_timeout=self.config.shutdown_timeout
+        )
+
+
+def _dumps(obj):
+    """JSON encoder that tolerates numpy scalars in model output"""
+    return json.dumps(obj, default=lambda value: value.item() if hasattr(value, 'item') else str(value))
+
+
+def parse_args(argv=None):
+    """
+    Parse the server configuration from the command line and environment
+
+    Args:
+        argv (list): Command line arguments (``sys.argv[1:]`` when None)
+
+    Returns:
+        argparse.Namespace: Server configuration
+    """
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description='Trading platform API server (async worker mode)')
+    parser.add_argument('--host', default=os.getenv('API_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('API_PORT', 5000)))
+    parser.add_argument('--cpu-workers', type=int, default=int(os.getenv('API_CPU_WORKERS', cpu_count)),
+                        help='Threads for sentiment, indicators and inference')
+    parser.add_argument('--max-pending-tasks', type=int,
+                        default=int(os.getenv('API_MAX_PENDING_TASKS', 4 * cpu_count)),
+                        help='CPU tasks allowed to queue before requests get 503')
+    parser.add_argument('--io-connections', type=int, default=int(os.getenv('API_IO_CONNECTIONS', 100)),
+                        help='Maximum concurrent outbound provider connections')
+    parser.add_argument('--request-timeout', type=float, default=float(os.getenv('API_REQUEST_TIMEOUT', 10)),
+                        help='Timeout in seconds for provider requests')
+    parser.add_argument('--shutdown-timeout', type=float, default=float(os.getenv('API_SHUTDOWN_TIMEOUT', 10)),
+                        help='Seconds to wait for in-flight work on shutdown')
+    parser.add_argument('--sentiment-backends', default=os.getenv('API_SENTIMENT_BACKENDS', 'vader'),
+                        choices=['vader', 'both'],
+                        help='Sentiment backends run on news (signals only use VADER scores)')
+    parser.add_argument('--model-registry', default=os.getenv('API_MODEL_REGISTRY'),
+                        help='ModelRegistry directory; promoted versions are hot-swapped in')
+    parser.add_argument('--model-name', default=os.getenv('API_MODEL_NAME', 'trading_signal'),
+                        help='Registered model to serve')
+    parser.add_argument('--market-api-key', default=os.getenv('MARKET_API_KEY', 'YOUR_API_KEY'))
+    parser.add_argument('--news-api-key', default=os.getenv('NEWS_API_KEY', 'YOUR_API_KEY'))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    AsyncTradingServer(parse_args(argv)).run()
+
+
+if __name__ == '__main__':
+    main()
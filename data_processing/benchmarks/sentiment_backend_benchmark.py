@@ -0,0 +1,73 @@
+"""
+Per-article cost of each sentiment backend mode.
+
+Scores the same synthetic headline corpus in-process with
+SentimentAnalyzer(backends=mode) for the 'vader', 'textblob' and 'both'
+modes and reports microseconds per article and articles/sec for each.
+
+Usage (from the data_processing directory):
+    python benchmarks/sentiment_backend_benchmark.py --articles 5000 --output backends.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_sentiment import SentimentAnalyzer
+from news_sentiment.sentiment_backends import SENTIMENT_MODES
+from sentiment_batch_benchmark import synthetic_headlines
+
+
+def run_benchmark(articles=5000, modes=None, repeats=3):
+    """
+    Measure single-process scoring cost for several backend modes
+
+    Args:
+        articles (int): Corpus size
+        modes (list): Backend modes to measure (all of SENTIMENT_MODES when None)
+        repeats (int): Timed passes per mode; the fastest is reported
+
+    Returns:
+        dict: Per-article microseconds and articles/sec for each mode
+    """
+    texts = synthetic_headlines(articles)
+    modes = modes or list(SENTIMENT_MODES)
+    results = {}
+
+    for mode in modes:
+        analyzer = SentimentAnalyzer(backends=mode)
+        analyzer.warm_up()
+
+        elapsed = float('inf')
+        for _ in range(repeats):
+            started = time.perf_counter()
+            analyzer.analyze_texts(texts, n_jobs=1)
+            elapsed = min(elapsed, time.perf_counter() - started)
+
+        results[mode] = {
+            'fields': analyzer.fields,
+            'us_per_article': elapsed / len(texts) * 1e6,
+            'articles_per_sec': len(texts) / elapsed
+        }
+        print(f"{mode:>9}: {elapsed / len(texts) * 1e6:8.1f} us/article "
+              f"({len(texts) / elapsed:,.0f} articles/sec)")
+
+    return {'articles': len(texts), 'results': results}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure per-article cost of each sentiment backend mode')
+    parser.add_argument('--articles', type=int, default=5000)
+    parser.add_argument('--modes', nargs='*', default=None,
+                        help='Backend modes to measure (default: all)')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', default=None, help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.articles, args.modes, args.repeats)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
@@ -0,0 +1,90 @@
+"""
+Throughput benchmark for batch sentiment scoring.
+
+Scores the same synthetic headline corpus with SentimentAnalyzer.analyze_texts
+at 1, 4 and N processes and reports articles/sec for each.
+
+Usage (from the data_processing directory):
+    python benchmarks/sentiment_batch_benchmark.py --articles 20000 --output batch.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_sentiment import SentimentAnalyzer
+
+SUBJECTS = ['Nasdaq', 'Dow Jones', 'Tech stocks', 'The euro', 'Sterling', 'Crude oil',
+            'Brent crude', 'OPEC', 'The Federal Reserve', 'The ECB', 'Bank of England']
+VERBS = ['surges', 'slumps', 'rallies', 'edges higher', 'falls sharply', 'holds steady',
+         'hits record high', 'drops to lowest level in months', 'rebounds', 'wavers']
+CAUSES = ['after strong earnings', 'on inflation fears', 'as investors weigh rate outlook',
+          'amid recession worries', 'after upbeat jobs data', 'on supply cut concerns',
+          'as traders await central bank decision', 'despite weak guidance']
+
+
+def synthetic_headlines(count, seed=42):
+    """Generate reproducible financial headlines with short descriptions"""
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(CAUSES)}. "
+        f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(CAUSES)}"
+        for _ in range(count)
+    ]
+
+
+def run_benchmark(articles=20000, job_counts=None, chunksize=None):
+    """
+    Measure batch scoring throughput for several process counts
+
+    Args:
+        articles (int): Corpus size
+        job_counts (list): Process counts to measure (1, 4 and all cores when None)
+        chunksize (int): Texts per worker task (automatic when None)
+
+    Returns:
+        dict: articles/sec and elapsed seconds for each process count
+    """
+    texts = synthetic_headlines(articles)
+    job_counts = job_counts or sorted({1, 4, multiprocessing.cpu_count()})
+    results = {}
+
+    for n_jobs in job_counts:
+        analyzer = SentimentAnalyzer(n_jobs=n_jobs)
+        analyzer.warm_up()
+        if n_jobs > 1:
+            # Start the pool before timing so only scoring is measured
+            analyzer.analyze_texts(texts[:analyzer.min_parallel_batch])
+
+        started = time.perf_counter()
+        analyzer.analyze_texts(texts, chunksize=chunksize)
+        elapsed = time.perf_counter() - started
+        analyzer.close()
+
+        results[n_jobs] = {
+            'articles_per_sec': len(texts) / elapsed,
+            'elapsed_seconds': elapsed
+        }
+        print(f"{n_jobs:>3} processes: {len(texts) / elapsed:,.0f} articles/sec ({elapsed:.2f}s)")
+
+    return {'articles': len(texts), 'results': results}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure batch sentiment scoring throughput')
+    parser.add_argument('--articles', type=int, default=20000)
+    parser.add_argument('--jobs', type=int, nargs='*', default=None,
+                        help='Process counts to measure (default: 1, 4 and all cores)')
+    parser.add_argument('--chunksize', type=int, default=None)
+    parser.add_argument('--output', default=None, help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.articles, args.jobs, args.chunksize)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
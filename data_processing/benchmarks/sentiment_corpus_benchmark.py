@@ -0,0 +1,327 @@
+"""
+Sentiment path benchmark on a fixed headline corpus.
+
+The corpus mixes synthetic headlines (see sentiment_batch_benchmark.py)
+with headlines recorded from docs/api_integration/sample_sentiment_data.json.
+The recorded part is built from each asset's key phrases and daily
+positive/negative/neutral ratios, since the fixture holds no raw articles.
+The corpus is generated deterministically in chunks, so the 1M size never
+holds more than one chunk of articles in memory.
+
+For each corpus size the benchmark measures the cost of every stage of the
+sentiment path:
+- tag: KeywordTagger over title and description
+- dedupe: exact and SimHash near-duplicate checks against an IngestionState
+- score: SentimentAnalyzer.analyze_articles with a SentimentCache
+  (hit rate reported, plus the uncached rate on a sample)
+- key_phrases: RAKE phrases for groups of max_articles_per_asset articles
+- summary: NewsSentimentManager.calculate_asset_sentiment_summary per group
+- index: SentimentIndex.add_articles plus one per-bar lookup
+
+It reports articles/sec and microseconds per article for each stage, the
+peak RSS and peak traced allocations of each size, and writes everything as
+JSON. Pass a previous run as --baseline to print the change per stage.
+
+Usage (from the data_processing directory):
+    python benchmarks/sentiment_corpus_benchmark.py --sizes 1000 100000 1000000 --output corpus.json
+    python benchmarks/sentiment_corpus_benchmark.py --sizes 1000 --baseline corpus.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_PROCESSING_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, DATA_PROCESSING_DIR)
+
+import pandas as pd
+
+from news_sentiment import (NewsAPIClient, SentimentAnalyzer, NewsSentimentManager, SentimentCache,
+                            IngestionState, SentimentIndex, NewsStore, simhash)
+from news_sentiment.news_ingestion import _article_text, _exact_key
+from sentiment_batch_benchmark import SUBJECTS, VERBS, CAUSES
+
+RECORDED_FIXTURE = os.path.join(DATA_PROCESSING_DIR, 'docs', 'api_integration', 'sample_sentiment_data.json')
+
+# Asset names of the fixture mapped to the NewsAPIClient asset names
+FIXTURE_ASSETS = {'CRUDE OIL': 'Crude Oil WTI'}
+
+LABEL_VERBS = {
+    'positive': ['boosts', 'lifts', 'supports', 'drives gains in', 'strengthens'],
+    'negative': ['weighs on', 'hurts', 'drags down', 'sparks selloff in', 'pressures'],
+    'neutral': ['in focus for', 'watched by traders of', 'expected to move', 'discussed around']
+}
+
+STAGES = ['tag', 'dedupe', 'score', 'key_phrases', 'summary', 'index']
+
+
+def recorded_templates(path=RECORDED_FIXTURE, seed=7):
+    """
+    Headline templates recorded from the sample sentiment fixture
+
+    Every asset/day entry contributes article_count headlines built from the
+    asset's key phrases, with labels drawn in the recorded ratios.
+
+    Returns:
+        list: (asset, title, description) tuples
+    """
+    with open(path) as f:
+        fixture = json.load(f)
+    rng = random.Random(seed)
+    templates = []
+    for entry in fixture['assets']:
+        asset = FIXTURE_ASSETS.get(entry['symbol'], entry['symbol'])
+        phrases = entry['current_sentiment']['key_phrases']
+        for day in entry['historical_sentiment']:
+            labels = rng.choices(
+                ['positive', 'negative', 'neutral'],
+                weights=[day['positive_ratio'], day['negative_ratio'], day['neutral_ratio']],
+                k=day['article_count']
+            )
+            for label in labels:
+                phrase = rng.choice(phrases)
+                title = f"{phrase[0].upper()}{phrase[1:]} {rng.choice(LABEL_VERBS[label])} {asset}"
+                description = f"{asset} traders react to {rng.choice(phrases)} and {rng.choice(phrases)}"
+                templates.append((asset, title, description))
+    return templates
+
+
+def iter_corpus(size, chunk_size=10000, recorded_fraction=0.1, seed=42, days=30):
+    """
+    Generate the benchmark corpus in chunks
+
+    Args:
+        size (int): Total number of articles
+        chunk_size (int): Articles per yielded chunk
+        recorded_fraction (float): Share of articles from the recorded templates
+        seed (int): Random seed
+        days (int): Publication times are spread over this many days
+
+    Yields:
+        list: Article dictionaries with asset, title, description, url and publishedAt
+    """
+    rng = random.Random(seed)
+    templates = recorded_templates()
+    synthetic_assets = ['US100', 'US30', 'EUR/USD', 'GBP/USD', 'Crude Oil WTI', 'Crude Oil Brent']
+    end = datetime(2023, 6, 22, 12, tzinfo=timezone.utc)
+    start = end - timedelta(days=days)
+    step = (end - start).total_seconds() / max(size, 1)
+
+    for chunk_start in range(0, size, chunk_size):
+        chunk = []
+        for i in range(chunk_start, min(size, chunk_start + chunk_size)):
+            if rng.random() < recorded_fraction:
+                asset, title, description = rng.choice(templates)
+            else:
+                asset = rng.choice(synthetic_assets)
+                title = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(CAUSES)}"
+                description = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(CAUSES)}"
+            published = start + timedelta(seconds=i * step)
+            chunk.append({
+                'asset': asset,
+                'title': title,
+                'description': description,
+                'url': f"https://example.com/news/{i}",
+                'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ')
+            })
+        yield chunk
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=DATA_PROCESSING_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(size, backends='both', group_size=100, uncached_sample=2000, chunk_size=10000, trace_memory=False):
+    """
+    Measure every stage over one corpus size
+
+    Args:
+        size (int): Corpus size
+        backends (str): Sentiment backend mode of the analyzer
+        group_size (int): Articles per key-phrase / summary group
+        uncached_sample (int): Articles scored without the cache for comparison
+        chunk_size (int): Articles generated and processed at a time
+        trace_memory (bool): Also report peak Python allocations (slows all stages)
+
+    Returns:
+        dict: Per-stage timings, memory and cache statistics
+    """
+    workdir = tempfile.mkdtemp(prefix='sentiment_corpus_')
+    tagger = NewsAPIClient(api_provider='newsapi', api_key='benchmark').tagger
+    dedupe_state = IngestionState()
+    cache = SentimentCache()
+    analyzer = SentimentAnalyzer(cache=cache, backends=backends)
+    analyzer.warm_up()
+    manager = NewsSentimentManager(None, analyzer, data_dir=workdir,
+                                   news_store=NewsStore(os.path.join(workdir, 'news.sqlite')))
+    index = SentimentIndex()
+
+    elapsed = dict.fromkeys(STAGES, 0.0)
+    near_duplicates = exact_duplicates = distinct_texts = 0
+    texts = set()
+
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    for chunk in iter_corpus(size, chunk_size=chunk_size):
+        t0 = time.perf_counter()
+        tagger.tag_articles(chunk)
+        t1 = time.perf_counter()
+        for article in chunk:
+            asset = article['asset']
+            key = _exact_key(article)
+            if dedupe_state.is_seen(asset, key):
+                exact_duplicates += 1
+                continue
+            fingerprint = simhash(_article_text(article))
+            if dedupe_state.find_near_duplicate(asset, fingerprint):
+                near_duplicates += 1
+                continue
+            dedupe_state.add(asset, key, fingerprint, 0)
+        dedupe_state.commit()
+        t2 = time.perf_counter()
+        analyzer.analyze_articles(chunk)
+        t3 = time.perf_counter()
+        groups = [chunk[i:i + group_size] for i in range(0, len(chunk), group_size)]
+        for group in groups:
+            analyzer.extract_article_key_phrases(group)
+        t4 = time.perf_counter()
+        for group in groups:
+            manager.calculate_asset_sentiment_summary(group)
+        t5 = time.perf_counter()
+        by_asset = {}
+        for article in chunk:
+            by_asset.setdefault(article['asset'], []).append(article)
+        for asset, articles in by_asset.items():
+            index.add_articles(asset, articles)
+        t6 = time.perf_counter()
+
+        for stage, seconds in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4, t6 - t5)):
+            elapsed[stage] += seconds
+        texts.update((article['title'], article['description']) for article in chunk)
+    bars = pd.date_range('2023-05-23', '2023-06-22', freq='1h', tz='UTC')
+    t0 = time.perf_counter()
+    for asset in index.assets:
+        index.features(asset, bars)
+    elapsed['index'] += time.perf_counter() - t0
+    total = time.perf_counter() - started
+    distinct_texts = len(texts)
+
+    traced_peak = None
+    if trace_memory:
+        traced_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    # Uncached scoring rate on a sample, to put the cache hit rate in context
+    sample = next(iter_corpus(min(uncached_sample, size), chunk_size=uncached_sample, seed=1))
+    uncached = SentimentAnalyzer(backends=backends)
+    uncached.warm_up()
+    t0 = time.perf_counter()
+    uncached.analyze_articles(sample)
+    uncached_seconds = time.perf_counter() - t0
+
+    cache_stats = cache.stats()
+    manager.close()
+    dedupe_state.close()
+
+    stages = {
+        stage: {
+            'seconds': seconds,
+            'articles_per_sec': size / seconds if seconds else None,
+            'us_per_article': seconds / size * 1e6
+        }
+        for stage, seconds in elapsed.items()
+    }
+    return {
+        'articles': size,
+        'distinct_texts': distinct_texts,
+        'total_seconds': total,
+        'articles_per_sec': size / total,
+        'stages': stages,
+        'dedupe': {'exact_duplicates': exact_duplicates, 'near_duplicates': near_duplicates},
+        'cache': dict(cache_stats, uncached_articles_per_sec=len(sample) / uncached_seconds,
+                      cached_articles_per_sec=stages['score']['articles_per_sec']),
+        'peak_rss_mb': _peak_rss_mb(),
+        'peak_traced_mb': traced_peak
+    }
+
+
+def compare(report, baseline):
+    """Print the change in per-article cost of each stage against an earlier report"""
+    for size, result in report['results'].items():
+        previous = baseline.get('results', {}).get(size)
+        if not previous:
+            continue
+        print(f"\n{int(size):,} articles vs {baseline.get('commit') or 'baseline'}:")
+        for stage, timing in result['stages'].items():
+            before = previous['stages'].get(stage, {}).get('us_per_article')
+            if before:
+                change = (timing['us_per_article'] / before - 1) * 100
+                print(f"  {stage:>12}: {before:8.1f} -> {timing['us_per_article']:8.1f} us/article ({change:+.1f}%)")
+
+
+def run_benchmark(sizes=(1000, 100000, 1000000), backends='both', trace_memory=False):
+    """
+    Run the corpus benchmark for several sizes
+
+    Args:
+        sizes (tuple): Corpus sizes
+        backends (str): Sentiment backend mode of the analyzer
+        trace_memory (bool): Also report peak Python allocations
+
+    Returns:
+        dict: Environment and per-size results
+    """
+    report = {
+        'commit': _git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'backends': backends,
+        'results': {}
+    }
+    for size in sizes:
+        result = run_size(size, backends=backends, trace_memory=trace_memory)
+        report['results'][str(size)] = result
+        print(f"\n{size:,} articles: {result['articles_per_sec']:,.0f} articles/sec end to end, "
+              f"peak RSS {result['peak_rss_mb']:.0f} MB, cache hit rate {result['cache']['hit_rate']:.1%}")
+        for stage, timing in result['stages'].items():
+            print(f"  {stage:>12}: {timing['us_per_article']:8.1f} us/article")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the sentiment path on a fixed headline corpus')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[1000, 100000, 1000000])
+    parser.add_argument('--backends', default='both', choices=['vader', 'textblob', 'both'])
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Also report peak Python allocations (slower)')
+    parser.add_argument('--baseline', default=None, help='Earlier JSON report to compare against')
+    parser.add_argument('--output', default=None, help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.sizes, args.backends, args.trace_memory)
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
@@ -0,0 +1,165 @@
+"""
+Throughput benchmark for the sharded signal workers.
+
+Subscribes the same set of (asset, timeframe) keys to a SignalWorkerPool
+with 1, 2 and N worker processes and reports the signals/sec published back
+to the parent. The workers run with no pause between rounds, a small model
+trained on synthetic bars, and offline providers (rolling synthetic bars and
+canned headlines scored with VADER), so only signal generation is measured.
+
+Usage (from the data_processing directory):
+    python benchmarks/signal_worker_benchmark.py --keys 32 --duration 10 --output workers.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signal_workers import SignalWorkerPool, signal_worker_main
+from startup_benchmark import train_model
+
+HEADLINES = [
+    ('{asset} rallies as earnings beat expectations', 'Strong results lift the market.'),
+    ('{asset} slips on rate worries', 'Investors turn cautious ahead of the central bank.'),
+    ('{asset} holds steady after jobs data', 'Traders weigh the outlook.'),
+    ('{asset} falls sharply amid recession fears', 'Weak guidance weighs on sentiment.'),
+    ('{asset} rebounds on upbeat manufacturing survey', 'Buyers return after the selloff.')
+]
+
+
+def offline_worker_main(worker_id, command_queue, result_queue, config):
+    """signal_worker_main() with the market data and news providers replaced by offline data"""
+    import numpy as np
+    import pandas as pd
+    from market_data.api_client import MarketDataClient
+    from news_sentiment import NewsAPIClient
+
+    close = 100 + np.cumsum(np.random.default_rng(worker_id).normal(0, 1, 100000))
+    start = pd.Timestamp('2026-01-01')
+    calls = {}
+
+    def get_price_data(self, asset, interval='1h', bars=100):
+        # Every call returns the window one bar later, like a live feed
+        offset = calls[asset] = calls.get(asset, -1) + 1
+        window = close[offset:offset + bars]
+        return pd.DataFrame({
+            'open': window,
+            'high': window + 0.5,
+            'low': window - 0.5,
+            'close': window,
+            'volume': np.full(len(window), 1000.0)
+        }, index=pd.date_range(start + pd.Timedelta(hours=offset), periods=len(window), freq='h'))
+
+    def get_news_for_assets(self, assets, days_back=3, max_articles=10, **kwargs):
+        return {asset: [{
+            'title': title.format(asset=asset),
+            'description': description,
+            'url': f'https://example.com/{asset}/{i}',
+            'publishedAt': '2026-01-01T00:00:00Z'
+        } for i, (title, description) in enumerate(HEADLINES[:max_articles])] for asset in assets}
+
+    MarketDataClient.get_price_data = get_price_data
+    NewsAPIClient.get_news_for_assets = get_news_for_assets
+    signal_worker_main(worker_id, command_queue, result_queue, config)
+
+
+class OfflineSignalWorkerPool(SignalWorkerPool):
+    worker_main = staticmethod(offline_worker_main)
+
+
+def measure(num_workers, keys, model_path, duration=10, warm_up_timeout=120):
+    """
+    Measure the signal throughput of one pool size
+
+    Args:
+        num_workers (int): Worker processes
+        keys (list): (asset, timeframe) subscriptions
+        model_path (str): Saved TradingSignalModel preloaded by the workers
+        duration (float): Seconds to count published signals for
+        warm_up_timeout (float): Seconds to wait for every key's first signal
+
+    Returns:
+        dict: signals/sec, signals counted and elapsed seconds
+    """
+    pool = OfflineSignalWorkerPool(num_workers=num_workers, interval=0, model_path=model_path).start()
+    try:
+        for asset, timeframe in keys:
+            pool.subscribe(asset, timeframe)
+
+        # Start timing once every worker has loaded and scored all its keys
+        pending = set(keys)
+        deadline = time.monotonic() + warm_up_timeout
+        while pending:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{len(pending)} keys produced no signal within {warm_up_timeout}s")
+            result = pool.get_result(timeout=1)
+            if result is not None:
+                pending.discard(result[:2])
+
+        signals = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < duration:
+            if pool.get_result(timeout=0.1) is not None:
+                signals += 1
+        elapsed = time.perf_counter() - started
+    finally:
+        pool.stop()
+
+    return {
+        'signals_per_sec': signals / elapsed,
+        'signals': signals,
+        'elapsed_seconds': elapsed,
+        'restarts': pool.restarts
+    }
+
+
+def run_benchmark(key_count=32, worker_counts=None, duration=10, model_path=None):
+    """
+    Measure signal throughput for several pool sizes
+
+    Args:
+        key_count (int): Number of subscribed (asset, timeframe) keys
+        worker_counts (list): Pool sizes to measure (1, 2 and all cores when None)
+        duration (float): Seconds to count published signals for at each size
+        model_path (str): Saved TradingSignalModel (a small synthetic one is
+            trained when None)
+
+    Returns:
+        dict: signals/sec for each pool size
+    """
+    if model_path is None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, 'trading_signal.joblib')
+            train_model(model_path)
+            return run_benchmark(key_count, worker_counts, duration, model_path)
+
+    keys = [(f'ASSET{i}', '1h') for i in range(key_count)]
+    worker_counts = worker_counts or sorted({1, 2, multiprocessing.cpu_count()})
+    results = {}
+
+    for num_workers in worker_counts:
+        results[num_workers] = measure(num_workers, keys, model_path, duration)
+        print(f"{num_workers:>3} workers: {results[num_workers]['signals_per_sec']:,.1f} signals/sec")
+
+    return {'keys': key_count, 'duration_seconds': duration, 'results': results}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure sharded signal worker throughput')
+    parser.add_argument('--keys', type=int, default=32)
+    parser.add_argument('--workers', type=int, nargs='*', default=None,
+                        help='Pool sizes to measure (default: 1, 2 and all cores)')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--model-path', default=None)
+    parser.add_argument('--output', default=None, help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.keys, args.workers, args.duration, args.model_path)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
@@ -0,0 +1,167 @@
+"""
+Startup-time benchmark for api.py.
+
+Each run starts a fresh interpreter, warms up in the background as the
+server does, and serves requests through the Flask app. It measures:
+- import_seconds: time to import api.py
+- warm_up_seconds: time from the import until /api/health reports ready
+  (clients, model load, sentiment lexicons, one dummy inference)
+- first_signal_seconds: time from the start until the first
+  /api/trading-signal request has been answered, i.e. how long a restarted
+  worker takes to serve its first signal
+
+The market data and news providers are replaced with synthetic bars and
+canned headlines so no network time is measured, and unless --model-path
+is given a small TradingSignalModel is trained on synthetic data first, so
+the first request is a served signal. A run fails if that request doesn't
+return 200.
+
+Usage (from the data_processing directory):
+    python benchmarks/startup_benchmark.py --runs 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+DATA_PROCESSING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RUN_SNIPPET = """
+import json, sys, threading, time
+started = time.perf_counter()
+import api
+imported = time.perf_counter()
+
+# Offline providers: synthetic bars and canned headlines
+from market_data.api_client import MarketDataClient
+from news_sentiment import NewsAPIClient
+MarketDataClient.get_price_data = lambda self, asset, interval='1h', bars=100: api._dummy_market_data()
+NewsAPIClient.get_news_for_assets = lambda self, assets, *args, **kwargs: {asset: [
+    {'title': f'{asset} rallies as earnings beat expectations', 'description': 'Strong results lift the index.',
+     'url': f'https://example.com/{asset}/1', 'publishedAt': '2026-01-01T00:00:00Z'},
+    {'title': f'{asset} slips on rate worries', 'description': 'Investors turn cautious.',
+     'url': f'https://example.com/{asset}/2', 'publishedAt': '2026-01-01T01:00:00Z'}
+] for asset in assets}
+
+threading.Thread(target=api.warm_up, args=(sys.argv[1] or None,), daemon=True).start()
+client = api.app.test_client()
+while client.get('/api/health').status_code != 200:
+    if api.startup_error is not None:
+        sys.exit(f"Warm-up failed: {api.startup_error}")
+    time.sleep(0.01)
+ready = time.perf_counter()
+response = client.get(f'/api/trading-signal/{sys.argv[2]}')
+finished = time.perf_counter()
+if response.status_code != 200:
+    sys.exit(f"First signal failed ({response.status_code}): {response.get_json()}")
+print(json.dumps({
+    'import_seconds': imported - started,
+    'warm_up_seconds': ready - imported,
+    'first_signal_seconds': finished - started,
+    'steps': api.startup_timings
+}))
+"""
+
+
+def train_model(path):
+    """
+    Train a small TradingSignalModel on synthetic bars and save it
+
+    Args:
+        path (str): File the model is saved to
+    """
+    sys.path.insert(0, DATA_PROCESSING_DIR)
+    import numpy as np
+    import pandas as pd
+    from ml_models.trading_model import TradingSignalModel
+
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 500))
+    market_data = pd.DataFrame({
+        'open': close,
+        'high': close + 0.5,
+        'low': close - 0.5,
+        'close': close,
+        'volume': np.full(len(close), 1000.0)
+    }, index=pd.date_range('2026-01-01', periods=len(close), freq='h'))
+    sentiment_data = {'compound': 0.0, 'article_count': 0}
+
+    model = TradingSignalModel()
+    features = model.prepare_features(market_data, sentiment_data)
+    # Label each bar by the direction of the next close
+    labels = (market_data['close'].shift(-1) > market_data['close']).astype(int).loc[features.index]
+    model.train(market_data, sentiment_data, labels)
+    model.save_model(path)
+
+
+def run_once(model_path=None, asset='US100'):
+    """
+    Measure one cold start in a fresh interpreter
+
+    Args:
+        model_path (str): Saved TradingSignalModel passed to warm_up()
+        asset (str): Asset of the first signal request
+
+    Returns:
+        dict: Timings of the run
+
+    Raises:
+        RuntimeError: If warm-up fails or the first signal isn't served
+    """
+    process = subprocess.run(
+        [sys.executable, '-c', RUN_SNIPPET, model_path or '', asset],
+        cwd=DATA_PROCESSING_DIR, capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"Run exited with code {process.returncode}")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(runs=5, model_path=None, asset='US100'):
+    """
+    Measure several cold starts and summarize them
+
+    Args:
+        runs (int): Number of fresh interpreters to start
+        model_path (str): Saved TradingSignalModel passed to warm_up()
+            (a small synthetic one is trained when None)
+        asset (str): Asset of the first signal request
+
+    Returns:
+        dict: Per-run timings plus median and max for each metric
+    """
+    if model_path is None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, 'trading_signal.joblib')
+            train_model(model_path)
+            return run_benchmark(runs, model_path, asset)
+
+    results = [run_once(model_path, asset) for _ in range(runs)]
+    summary = {}
+    for metric in ['import_seconds', 'warm_up_seconds', 'first_signal_seconds']:
+        values = [result[metric] for result in results]
+        summary[metric] = {'median': statistics.median(values), 'max': max(values)}
+    return {'runs': results, 'summary': summary}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure api.py cold start time')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--model-path', default=None)
+    parser.add_argument('--asset', default='US100', help='Asset of the first signal request')
+    parser.add_argument('--output', default=None, help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    try:
+        report = run_benchmark(args.runs, args.model_path, args.asset)
+    except RuntimeError as e:
+        sys.exit(f"Startup benchmark failed: {e}")
+    for metric, stats in report['summary'].items():
+        print(f"{metric}: median {stats['median']:.3f}s, max {stats['max']:.3f}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
@@ -58,22 +58,42 @@ class MarketDataClient:
                 'alphavantage': 'BNO'  # Using ETF as proxy
             }
         }
-    
-    def get_current_price(self, asset):
-        """Get the current price of an asset
         
-        Args:
-            asset (str): Asset symbol from our standardized list
-            
-        Returns:
-            dict: Current price data
-        """
+        # Interval names for each provider's candle endpoint
+        self.interval_mapping = {
+            '1m': {'twelvedata': '1min', 'finnhub': '1'},
+            '5m': {'twelvedata': '5min', 'finnhub': '5'},
+            '15m': {'twelvedata': '15min', 'finnhub': '15'},
+            '1h': {'twelvedata': '1h', 'finnhub': '60'},
+            '4h': {'twelvedata': '4h', 'finnhub': '240'},
+            '1d': {'twelvedata': '1day', 'finnhub': 'D'}
+        }
+        self.interval_seconds = {
+            '1m': 60, '5m': 300, '15m': 900,
+            '1h': 3600, '4h': 14400, '1d': 86400
+        }
+    
+    def _resolve_symbol(self, asset):
+        """Map a standardized asset name to the provider's symbol"""
         if self.api_provider not in self.base_urls:
             raise ValueError(f"Unsupported API provider: {self.api_provider}")
             
         symbol = self.symbol_mapping.get(asset, {}).get(self.api_provider)
         if not symbol:
             raise ValueError(f"Asset {asset} not supported for {self.api_provider}")
+        return symbol
+    
+    def _build_price_request(self, asset):
+        """
+        Build the provider request for the current price of an asset
+        
+        Args:
+            asset (str): Asset symbol from our standardized list
+            
+        Returns:
+            tuple: (url, params) for the HTTP GET request
+        """
+        symbol = self._resolve_symbol(asset)
             
         if self.api_provider == 'twelvedata':
             url = f"{self.base_urls['twelvedata']}/price"
@@ -81,8 +101,6 @@ class MarketDataClient:
                 'symbol': symbol,
                 'apikey': self.api_key
             }
-            response = requests.get(url, params=params)
-            return response.json()
             
         elif self.api_provider == 'finnhub':
             url = f"{self.base_urls['finnhub']}/quote"
@@ -90,8 +108,6 @@ class MarketDataClient:
                 'symbol': symbol,
                 'token': self.api_key
             }
-            response = requests.get(url, params=params)
-            return response.json()
             
         elif self.api_provider == 'alphavantage':
             is_forex = '/' in asset
@@ -113,8 +129,154 @@ class MarketDataClient:
                     'apikey': self.api_key
                 }
                 
-            response = requests.get(url, params=params)
-            return response.json()
+        return url, params
+    
+    def get_current_price(self, asset):
+        """Get the current price of an asset
+        
+        Args:
+            asset (str): Asset symbol from our standardized list
+            
+        Returns:
+            dict: Current price data
+        """
+        url, params = self._build_price_request(asset)
+        response = requests.get(url, params=params)
+        return response.json()
+    
+    async def get_current_price_async(self, session, asset):
+        """Get the current price of an asset without blocking the event loop
+        
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            asset (str): Asset symbol from our standardized list
+            
+        Returns:
+            dict: Current price data
+        """
+        url, params = self._build_price_request(asset)
+        async with session.get(url, params=params) as response:
+            return await response.json(content_type=None)
+    
+    def _build_history_request(self, asset, interval='1h', bars=100):
+        """
+        Build the provider request for historical OHLCV candles
+        
+        Args:
+            asset (str): Asset symbol from our standardized list
+            interval (str): Time interval (1m, 5m, 15m, 1h, 4h, 1d)
+            bars (int): Number of candles to return
+            
+        Returns:
+            tuple: (url, params) for the HTTP GET request
+        """
+        symbol = self._resolve_symbol(asset)
+        
+        if interval not in self.interval_mapping:
+            raise ValueError(f"Unsupported interval: {interval}")
+        provider_interval = self.interval_mapping[interval].get(self.api_provider)
+        
+        if self.api_provider == 'twelvedata':
+            url = f"{self.base_urls['twelvedata']}/time_series"
+            params = {
+                'symbol': symbol,
+                'interval': provider_interval,
+                'outputsize': bars,
+                'apikey': self.api_key
+            }
+            
+        elif self.api_provider == 'finnhub':
+            # Finnhub candles are addressed by a unix time range instead of a bar count
+            is_forex = '/' in asset
+            endpoint = 'forex/candle' if is_forex else 'stock/candle'
+            if is_forex:
+                symbol = f"OANDA:{asset.replace('/', '_')}"
+            bar_seconds = self.interval_seconds[interval]
+            end = int(time.time())
+            params = {
+                'symbol': symbol,
+                'resolution': provider_interval,
+                'from': end - bar_seconds * bars,
+                'to': end,
+                'token': self.api_key
+            }
+            url = f"{self.base_urls['finnhub']}/{endpoint}"
+            
+        else:
+            raise ValueError(f"Historical data not supported for {self.api_provider}")
+            
+        return url, params
+    
+    def _parse_history_response(self, payload, bars):
+        """
+        Normalize a provider candle payload into an OHLCV DataFrame
+        
+        Args:
+            payload (dict): Decoded JSON response from the provider
+            bars (int): Number of candles requested
+            
+        Returns:
+            pandas.DataFrame: OHLCV data indexed by timestamp, oldest first
+        """
+        columns = ['open', 'high', 'low', 'close', 'volume']
+        
+        if self.api_provider == 'twelvedata':
+            if payload.get('status') != 'ok':
+                raise ValueError(f"TwelveData error: {payload.get('message', 'unknown error')}")
+            df = pd.DataFrame(payload.get('values', []))
+            if df.empty:
+                return pd.DataFrame(columns=columns)
+            df['datetime'] = pd.to_datetime(df['datetime'])
+            df = df.set_index('datetime').sort_index()
+            if 'volume' not in df.columns:
+                # Forex pairs have no volume on TwelveData
+                df['volume'] = 0
+                
+        elif self.api_provider == 'finnhub':
+            if payload.get('s') != 'ok':
+                raise ValueError(f"Finnhub error: status {payload.get('s')}")
+            df = pd.DataFrame({
+                'open': payload['o'],
+                'high': payload['h'],
+                'low': payload['l'],
+                'close': payload['c'],
+                'volume': payload.get('v', [0] * len(payload['c']))
+            }, index=pd.to_datetime(payload['t'], unit='s'))
+            
+        df = df[columns].astype(float)
+        return df.iloc[-bars:]
+    
+    def get_price_data(self, asset, interval='1h', bars=100):
+        """Get historical OHLCV candles for an asset
+        
+        Args:
+            asset (str): Asset symbol from our standardized list
+            interval (str): Time interval (1m, 5m, 15m, 1h, 4h, 1d)
+            bars (int): Number of candles to return
+            
+        Returns:
+            pandas.DataFrame: OHLCV data indexed by timestamp, oldest first
+        """
+        url, params = self._build_history_request(asset, interval, bars)
+        response = requests.get(url, params=params)
+        return self._parse_history_response(response.json(), bars)
+    
+    async def get_price_data_async(self, session, asset, interval='1h', bars=100):
+        """Get historical OHLCV candles without blocking the event loop
+        
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            asset (str): Asset symbol from our standardized list
+            interval (str): Time interval (1m, 5m, 15m, 1h, 4h, 1d)
+            bars (int): Number of candles to return
+            
+        Returns:
+            pandas.DataFrame: OHLCV data indexed by timestamp, oldest first
+        """
+        url, params = self._build_history_request(asset, interval, bars)
+        async with session.get(url, params=params) as response:
+            payload = await response.json(content_type=None)
+        return self._parse_history_response(payload, bars)
             
     def get_historical_data(self, asset, interval='1h', count=100):
         """Get historical OHLCV data
@@ -127,9 +289,7 @@ class MarketDataClient:
         Returns:
             pandas.DataFrame: Historical price data
         """
-        # Implementation would vary based on provider
-        # This is a placeholder for the actual implementation
-        pass
+        return self.get_price_data(asset, interval=interval, bars=count)
         
     def format_response(self, raw_response, asset, data_type='price'):
         """
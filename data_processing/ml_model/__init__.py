@@ -1,5 +1,8 @@
 from .feature_engineering import FeatureEngineer
 from .prediction_model import TradingModel
 from .model_trainer import ModelTrainer
+from .feature_store import FeatureStore
+from .labeling import LabelEngine
+from .walk_forward import WalkForwardEngine
 
-__all__ = ['FeatureEngineer', 'TradingModel', 'ModelTrainer']
\ No newline at end of file
+__all__ = ['FeatureEngineer', 'TradingModel', 'ModelTrainer', 'FeatureStore', 'LabelEngine', 'WalkForwardEngine']
\ No newline at end of file
@@ -0,0 +1,185 @@
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from .feature_engineering import FeatureEngineer
+from .feature_store import FeatureStore
+
+# Rough peak working memory per bar of a chunk (prices, indicators,
+# sentiment, target and pandas temporaries)
+BYTES_PER_BAR = 1024
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+def _iter_chunks(source, chunk_bars):
+    """Yield price chunks of a DataFrame or a CSV file without loading it whole"""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_bars):
+            yield source.iloc[start:start + chunk_bars]
+    else:
+        for chunk in pd.read_csv(source, index_col=0, parse_dates=True, chunksize=chunk_bars):
+            yield chunk
+
+def build_asset_dataset(asset, source, config):
+    """
+    Build the training rows of one asset chunk by chunk and stream them to disk
+
+    Every chunk is computed together with the last WARMUP_BARS bars of the
+    previous one, so indicators continue across chunk boundaries, and the
+    last ``lookahead`` rows of a chunk (whose targets need later bars) are
+    emitted with the next chunk. Only one chunk plus its overlap is in
+    memory at a time.
+
+    Args:
+        asset (str): Asset name
+        source (pandas.DataFrame or str): OHLCV bars, or a CSV file of them
+            indexed by timestamp
+        config (dict): Options prepared by DatasetBuilder
+
+    Returns:
+        dict: Rows written, chunks processed and seconds taken
+    """
+    started = time.perf_counter()
+    feature_engineer = FeatureEngineer()
+    store = FeatureStore(config['root'], feature_engineer, max_segments=config['max_segments'])
+    store.delete(asset, config['interval'], config['version'])
+
+    lookahead = config['lookahead']
+    warmup = feature_engineer.WARMUP_BARS
+    sentiment = (config.get('sentiment') or {}).get(asset)
+    carry, pending, rows, chunks = None, 0, 0, 0
+
+    for chunk in _iter_chunks(source, config['chunk_bars']):
+        price_columns = [col for col in PRICE_COLUMNS if col in chunk.columns]
+        # Selecting the price columns (or the concat) gives a frame this
+        # function owns, so every stage below adds its columns in place
+        df = chunk[price_columns] if carry is None else pd.concat([carry, chunk[price_columns]])
+        first_new = 0 if carry is None else len(carry) - pending
+        chunks += 1
+
+        # Raw bars the next chunk needs: the warm-up plus rows still without a target
+        pending = min(lookahead, len(df) - first_new)
+        carry = df.iloc[-(warmup + pending):][price_columns]
+
+        feature_engineer.add_technical_indicators(df, copy=False)
+        if sentiment is not None and len(sentiment):
+            feature_engineer.merge_sentiment_features(
+                df, sentiment, tolerance=config.get('sentiment_tolerance'),
+                ffill_limit=config.get('sentiment_ffill_limit'), copy=False
+            )
+        df = feature_engineer.add_target_variable(df, lookahead=lookahead,
+                                                  threshold=config['threshold'], copy=False)
+        df = df.iloc[first_new:].dropna()
+        if config.get('columns'):
+            df = df[config['columns']]
+        rows += store.append(asset, config['interval'], df, config['version'])
+        del df
+
+    return {'rows': rows, 'chunks': chunks, 'seconds': time.perf_counter() - started}
+
+class DatasetBuilder:
+    """
+    Builds training datasets for many assets in parallel, within a memory budget
+
+    Each asset is processed by one worker process, in chunks of
+    ``chunk_bars`` bars overlapping by FeatureEngineer.WARMUP_BARS, and the
+    rows (indicators, sentiment, future_return and target, as from
+    FeatureEngineer.prepare_features()) are appended to a FeatureStore as
+    they are produced. Peak memory is bounded by the number of workers times
+    one chunk, however long the series.
+    """
+    def __init__(self, root='datasets', interval='1m', lookahead=5, threshold=0.01, n_jobs=None,
+                 chunk_bars=None, memory_budget_mb=2048, columns=None, version=None,
+                 sentiment_tolerance=None, sentiment_ffill_limit=None, max_segments=256):
+        """
+        Initialize the builder
+
+        Args:
+            root (str): Directory of the FeatureStore the datasets are written to
+            interval (str): Bar interval of the prices
+            lookahead (int): Periods to look ahead for target
+            threshold (float): Price change threshold for signals
+            n_jobs (int): Worker processes (CPU count when None; 1 builds in-process)
+            chunk_bars (int): Bars per chunk (derived from memory_budget_mb when None)
+            memory_budget_mb (float): Working memory shared by all workers
+            columns (list): Columns to keep (all when None)
+            version (str): Store version of the datasets (derived from the
+                feature-set version, lookahead and threshold when None)
+            sentiment_tolerance (str or pandas.Timedelta): Oldest sentiment a bar may use
+            sentiment_ffill_limit (int): Bars a sentiment row may be carried forward
+            max_segments (int): Chunks of one asset before they are compacted
+        """
+        self.n_jobs = n_jobs or multiprocessing.cpu_count()
+        if chunk_bars is None:
+            chunk_bars = int(memory_budget_mb * 1024 * 1024 / (self.n_jobs * BYTES_PER_BAR))
+        # A chunk must be longer than its overlap to make progress
+        self.chunk_bars = max(chunk_bars, 4 * FeatureEngineer.WARMUP_BARS)
+        self.version = version or f"{FeatureEngineer.FEATURE_SET_VERSION}-la{lookahead}-th{threshold}"
+        self.store = FeatureStore(root, version=self.version, max_segments=max_segments)
+        self.config = {
+            'root': root,
+            'interval': interval,
+            'version': self.version,
+            'lookahead': lookahead,
+            'threshold': threshold,
+            'chunk_bars': self.chunk_bars,
+            'columns': columns,
+            'sentiment_tolerance': sentiment_tolerance,
+            'sentiment_ffill_limit': sentiment_ffill_limit,
+            'max_segments': max_segments
+        }
+
+    def build(self, sources, sentiment=None):
+        """
+        Build and store the dataset of every asset
+
+        Args:
+            sources (dict): Asset name -> OHLCV DataFrame or CSV file path
+                (paths keep the parent from holding every series in memory)
+            sentiment (dict): Asset name -> sentiment features by date or
+                timestamp, as for FeatureEngineer.merge_sentiment_features()
+
+        Returns:
+            dict: Asset name -> rows, chunks and seconds (or 'error')
+        """
+        results = {}
+        if self.n_jobs == 1 or len(sources) == 1:
+            for asset, source in sources.items():
+                config = dict(self.config, sentiment={asset: (sentiment or {}).get(asset)})
+                try:
+                    results[asset] = build_asset_dataset(asset, source, config)
+                except Exception as e:
+                    print(f"Error building dataset for {asset}: {str(e)}")
+                    results[asset] = {'error': str(e)}
+            return results
+
+        with ProcessPoolExecutor(max_workers=min(self.n_jobs, len(sources)),
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = {
+                executor.submit(build_asset_dataset, asset, source,
+                                dict(self.config, sentiment={asset: (sentiment or {}).get(asset)})): asset
+                for asset, source in sources.items()
+            }
+            for future in as_completed(futures):
+                asset = futures[future]
+                try:
+                    results[asset] = future.result()
+                except Exception as e:
+                    print(f"Error building dataset for {asset}: {str(e)}")
+                    results[asset] = {'error': str(e)}
+        return results
+
+    def load(self, asset, start=None, end=None, columns=None):
+        """
+        Load a time slice of a built dataset
+
+        Args:
+            asset (str): Asset name
+            start: First timestamp to include
+            end: Last timestamp to include
+            columns (list): Columns to load (all when None)
+
+        Returns:
+            pandas.DataFrame: Dataset rows indexed by timestamp
+        """
+        return self.store.load(asset, self.config['interval'], start, end, columns)
@@ -2,27 +2,38 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import os
+from .labeling import LabelEngine
 
 class FeatureEngineer:
     """
     Creates features for the ML prediction model based on market data and sentiment analysis
     """
+    # Bump whenever add_technical_indicators() changes, so stored features are recomputed
+    FEATURE_SET_VERSION = '1'
+    
+    # Bars of history that make the indicators of the next bar exact: the
+    # longest rolling window is 20 bars, and after 600 bars the seed of the
+    # 26-bar EMA has decayed below float precision
+    WARMUP_BARS = 600
+    
     def __init__(self):
         """Initialize the feature engineer"""
         pass
         
-    def add_technical_indicators(self, df):
+    def add_technical_indicators(self, df, copy=True):
         """
         Calculate technical indicators from price data
         
         Args:
             df (pandas.DataFrame): DataFrame with OHLCV data (Open, High, Low, Close, Volume)
+            copy (bool): Work on a copy; when False the columns are added to df
             
         Returns:
             pandas.DataFrame: DataFrame with technical indicators added
         """
         # Make a copy to avoid modifying the original dataframe
-        df = df.copy()
+        if copy:
+            df = df.copy()
         
         # 1. Moving Averages
         df['ma_5'] = df['close'].rolling(window=5).mean()
@@ -75,7 +86,7 @@ class FeatureEngineer:
         
         return df
     
-    def add_target_variable(self, df, lookahead=5, threshold=0.01):
+    def add_target_variable(self, df, lookahead=5, threshold=0.01, copy=True):
         """
         Add target variable (Buy/Sell/Hold signal) based on future price movement
         
@@ -83,11 +94,13 @@ class FeatureEngineer:
             df (pandas.DataFrame): DataFrame with price data
             lookahead (int): Number of periods to look ahead for price movement
             threshold (float): Price change threshold for Buy/Sell signal
+            copy (bool): Work on a copy; when False the columns are added to df
             
         Returns:
             pandas.DataFrame: DataFrame with target variable added
         """
-        df = df.copy()
+        if copy:
+            df = df.copy()
         
         # Calculate future price changes
         df['future_return'] = df['close'].shift(-lookahead) / df['close'] - 1
@@ -102,69 +115,178 @@ class FeatureEngineer:
         
         return df
     
-    def merge_sentiment_features(self, price_df, sentiment_features):
+    def add_label_grid(self, df, horizons=(1, 5, 10, 20), thresholds=(0.005, 0.01, 0.02),
+                       method='fixed', copy=True, **options):
+        """
+        Add int8 targets for a grid of horizons and thresholds in one pass
+        
+        Args:
+            df (pandas.DataFrame): DataFrame with price data
+            horizons (tuple): Periods to look ahead
+            thresholds (tuple): Price change thresholds (barrier widths for
+                triple-barrier labels)
+            method (str): 'fixed' (return at the horizon, as add_target_variable())
+                or 'triple_barrier' (first barrier touched within the horizon)
+            copy (bool): Work on a copy; when False the columns are added to df
+            **options: Passed to LabelEngine.triple_barrier()
+            
+        Returns:
+            pandas.DataFrame: DataFrame with one target_<horizon>_<threshold>
+                column per pair, without the rows whose targets need later bars
+        """
+        engine = LabelEngine(horizons, thresholds)
+        if method == 'fixed':
+            labels, valid = engine.label_grid(df['close'])
+        elif method == 'triple_barrier':
+            labels, valid = engine.triple_barrier(df['close'], df.get('high'), df.get('low'), **options)
+        else:
+            raise ValueError(f"Unsupported labeling method: {method}")
+        
+        if copy:
+            df = df.copy()
+        for i, col in enumerate(engine.columns):
+            df[col] = labels[:, i]
+        
+        # Drop the rows where we don't have future data for every target
+        return df[valid.all(axis=1)]
+    
+    # Sentiment columns merged onto the price bars and their values when no news matched
+    SENTIMENT_DEFAULTS = {
+        'sentiment_score': 0.0,
+        'sentiment_magnitude': 0.0,
+        'positive_ratio': 0.0,
+        'negative_ratio': 0.0,
+        'neutral_ratio': 0.0,
+        'article_count': 0,
+        'has_news': False
+    }
+    
+    def _sentiment_frame(self, sentiment_features, like_index):
+        """
+        Build a sorted frame of sentiment rows indexed by timestamp
+        
+        Args:
+            sentiment_features (dict or pandas.DataFrame): Features by date or timestamp
+            like_index (pandas.Index): Index of the price bars, whose timezone is matched
+            
+        Returns:
+            pandas.DataFrame: One row per distinct timestamp (the last one wins)
+        """
+        if isinstance(sentiment_features, pd.DataFrame):
+            frame = sentiment_features.copy()
+        else:
+            frame = pd.DataFrame.from_dict(sentiment_features, orient='index')
+            frame = frame.reindex(columns=list(self.SENTIMENT_DEFAULTS))
+        
+        if isinstance(like_index, pd.DatetimeIndex):
+            index = pd.DatetimeIndex(pd.to_datetime(frame.index))
+            if like_index.tz is not None and index.tz is None:
+                index = index.tz_localize('UTC').tz_convert(like_index.tz)
+            elif like_index.tz is not None:
+                index = index.tz_convert(like_index.tz)
+            elif index.tz is not None:
+                index = index.tz_convert('UTC').tz_localize(None)
+            frame.index = index
+        
+        frame = frame[~frame.index.duplicated(keep='last')]
+        return frame.sort_index()
+    
+    def merge_sentiment_features(self, price_df, sentiment_features, tolerance=None, ffill_limit=None,
+                                 copy=True):
         """
         Merge sentiment features with price data
         
+        Each bar takes the latest sentiment row at or before its timestamp, so
+        sentiment may come at a different resolution than the bars (e.g. daily
+        or hourly sentiment on minute bars). Timestamps should mark when the
+        sentiment became available.
+        
         Args:
             price_df (pandas.DataFrame): DataFrame with price data and technical indicators
-            sentiment_features (dict): Dictionary with sentiment features for each date
+            sentiment_features (dict or pandas.DataFrame): Dictionary with sentiment
+                features for each date, or a frame of sentiment features indexed
+                by timestamp (e.g. from SentimentIndex.features())
+            tolerance (str or pandas.Timedelta): Oldest sentiment a bar may use
+                (no limit when None)
+            ffill_limit (int): Bars after a sentiment row's first bar that may
+                still carry it (no limit when None)
+            copy (bool): Work on a copy; when False the columns are added to price_df
             
         Returns:
             pandas.DataFrame: Combined DataFrame with price and sentiment features
         """
         # Create a copy of the dataframe
-        df = price_df.copy()
-        
-        # Initialize sentiment columns with default values
-        df['sentiment_score'] = 0.0
-        df['sentiment_magnitude'] = 0.0
-        df['positive_ratio'] = 0.0
-        df['negative_ratio'] = 0.0
-        df['neutral_ratio'] = 0.0
-        df['article_count'] = 0
-        df['has_news'] = False
-        
-        # Map sentiment values to corresponding dates
-        for date, features in sentiment_features.items():
-            if date in df.index:
-                df.loc[date, 'sentiment_score'] = features.get('sentiment_score', 0.0)
-                df.loc[date, 'sentiment_magnitude'] = features.get('sentiment_magnitude', 0.0)
-                df.loc[date, 'positive_ratio'] = features.get('positive_ratio', 0.0)
-                df.loc[date, 'negative_ratio'] = features.get('negative_ratio', 0.0)
-                df.loc[date, 'neutral_ratio'] = features.get('neutral_ratio', 0.0)
-                df.loc[date, 'article_count'] = features.get('article_count', 0)
-                df.loc[date, 'has_news'] = features.get('has_news', False)
-        
-        # Forward fill sentiment data (use most recent sentiment until new data arrives)
-        sentiment_cols = ['sentiment_score', 'sentiment_magnitude', 'positive_ratio', 
-                          'negative_ratio', 'neutral_ratio', 'article_count', 'has_news']
-        df[sentiment_cols] = df[sentiment_cols].fillna(method='ffill')
+        df = price_df.copy() if copy else price_df
+        
+        sentiment = self._sentiment_frame(sentiment_features, df.index)
+        
+        # Position of the sentiment row each bar uses (-1 for none), found in one pass
+        if isinstance(df.index, pd.DatetimeIndex) and df.index.is_monotonic_increasing:
+            if tolerance is not None:
+                tolerance = pd.Timedelta(tolerance)
+            indexer = sentiment.index.get_indexer(df.index, method='ffill', tolerance=tolerance)
+            if ffill_limit is not None:
+                # Bars since the first bar at or after each matched sentiment row
+                matched = sentiment.index[np.maximum(indexer, 0)]
+                first_bar = df.index.searchsorted(matched, side='left')
+                carried = np.arange(len(df)) - first_bar
+                indexer = np.where(carried > ffill_limit, -1, indexer)
+        else:
+            # Without ordered timestamps only exact index matches can be aligned
+            indexer = sentiment.index.get_indexer(df.index)
+        aligned = sentiment.reset_index(drop=True).reindex(indexer)
+        aligned.index = df.index
+        
+        # Bars without sentiment get the default values
+        for col, default in self.SENTIMENT_DEFAULTS.items():
+            if col not in aligned.columns:
+                aligned[col] = default
+        for col in aligned.columns:
+            if col in self.SENTIMENT_DEFAULTS:
+                default = self.SENTIMENT_DEFAULTS[col]
+                df[col] = aligned[col].where(aligned[col].notna(), default).astype(type(default))
+            elif pd.api.types.is_numeric_dtype(aligned[col]):
+                df[col] = aligned[col].fillna(0.0)
         
         return df
     
-    def prepare_features(self, price_df, sentiment_features=None, lookahead=5, threshold=0.01):
+    def prepare_features(self, price_df, sentiment_features=None, lookahead=5, threshold=0.01,
+                         sentiment_tolerance=None, sentiment_ffill_limit=None, indicators=None,
+                         copy=True):
         """
         Prepare all features for ML model
         
         Args:
             price_df (pandas.DataFrame): DataFrame with OHLCV data
-            sentiment_features (dict): Dictionary with sentiment features
+            sentiment_features (dict or pandas.DataFrame): Sentiment features
+                by date or timestamp
             lookahead (int): Periods to look ahead for target
             threshold (float): Price change threshold for signals
+            sentiment_tolerance (str or pandas.Timedelta): Oldest sentiment a bar may use
+            sentiment_ffill_limit (int): Bars a sentiment row may be carried forward
+            indicators (pandas.DataFrame): Precomputed add_technical_indicators()
+                output (e.g. from a FeatureStore) used instead of price_df
+            copy (bool): Copy the input once before adding columns; when False
+                the columns are added to the input frame
             
         Returns:
             pandas.DataFrame: Prepared features DataFrame
         """
-        # Add technical indicators
-        df = self.add_technical_indicators(price_df)
+        # Add technical indicators (the only copy; later stages add columns in place)
+        if indicators is not None:
+            df = indicators.copy() if copy else indicators
+        else:
+            df = self.add_technical_indicators(price_df, copy=copy)
         
         # Add sentiment features if available
-        if sentiment_features:
-            df = self.merge_sentiment_features(df, sentiment_features)
+        if sentiment_features is not None and len(sentiment_features):
+            df = self.merge_sentiment_features(
+                df, sentiment_features, tolerance=sentiment_tolerance, ffill_limit=sentiment_ffill_limit,
+                copy=False
+            )
         
         # Add target variable
-        df = self.add_target_variable(df, lookahead=lookahead, threshold=threshold)
+        df = self.add_target_variable(df, lookahead=lookahead, threshold=threshold, copy=False)
         
         # Drop rows with NaN values
         df = df.dropna()
@@ -0,0 +1,410 @@
+import os
+import re
+import json
+import shutil
+import threading
+import numpy as np
+import pandas as pd
+from .feature_engineering import FeatureEngineer
+
+class FeatureStore:
+    """
+    Versioned on-disk store of computed indicator matrices
+
+    The output of FeatureEngineer.add_technical_indicators() is stored per
+    (asset, interval, feature-set version) as append-only segments, each
+    covering a date range. A segment is a directory with one ``.npy`` file
+    per column plus the timestamps, so a time slice is loaded through
+    memory-mapped arrays and only the pages of the requested rows and
+    columns are read.
+
+    update() computes indicators only for bars newer than the stored range.
+    It recomputes them over the new bars plus the last
+    FeatureEngineer.WARMUP_BARS stored bars, so the rolling windows and
+    exponential averages continue exactly as in a full recomputation.
+    Sentiment and target columns depend on the experiment. They are not
+    stored and are added on top of the loaded indicators.
+    """
+    def __init__(self, root='feature_store', feature_engineer=None, version=None, max_segments=32):
+        """
+        Initialize the store
+
+        Args:
+            root (str): Directory holding the store
+            feature_engineer (FeatureEngineer): Computes the indicators
+            version (str): Feature-set version of stored matrices
+                (FeatureEngineer.FEATURE_SET_VERSION when None)
+            max_segments (int): Segments of one key before they are
+                compacted into a single one
+        """
+        self.root = root
+        self.feature_engineer = feature_engineer or FeatureEngineer()
+        self.version = str(version or self.feature_engineer.FEATURE_SET_VERSION)
+        self.max_segments = max_segments
+        self.lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _key_dir(self, asset, interval, version=None):
+        slug = re.sub(r'[^A-Za-z0-9._-]+', '_', asset)
+        return os.path.join(self.root, slug, interval, f"v{version or self.version}")
+
+    def _read_meta(self, key_dir):
+        path = os.path.join(key_dir, 'meta.json')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_meta(self, key_dir, meta):
+        path = os.path.join(key_dir, 'meta.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def _index_values(index):
+        """Timestamps as int64 nanoseconds since the epoch (UTC)"""
+        index = pd.DatetimeIndex(index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        return index.values.astype('datetime64[ns]').astype(np.int64)
+
+    @staticmethod
+    def _to_index(values, tz):
+        index = pd.DatetimeIndex(np.asarray(values).astype('datetime64[ns]'))
+        if tz:
+            index = index.tz_localize('UTC').tz_convert(tz)
+        return index
+
+    @staticmethod
+    def _bound(value, tz):
+        """A slice bound as int64 nanoseconds"""
+        if value is None:
+            return None
+        value = pd.Timestamp(value)
+        if value.tzinfo is None and tz:
+            value = value.tz_localize(tz)
+        if value.tzinfo is not None:
+            value = value.tz_convert('UTC').tz_localize(None)
+        return value.value
+
+    def _write_segment(self, key_dir, frame):
+        """Write one segment; returns its metadata"""
+        values = self._index_values(frame.index)
+        name = f"seg_{values[0]}_{values[-1]}"
+        tmp_dir = os.path.join(key_dir, name + '.tmp')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        np.save(os.path.join(tmp_dir, '_index.npy'), values)
+        for col in frame.columns:
+            np.save(os.path.join(tmp_dir, f"{col}.npy"), np.ascontiguousarray(frame[col].to_numpy()))
+        segment_dir = os.path.join(key_dir, name)
+        shutil.rmtree(segment_dir, ignore_errors=True)
+        os.replace(tmp_dir, segment_dir)
+        return {'name': name, 'start': int(values[0]), 'end': int(values[-1]), 'rows': len(values)}
+
+    def _segment_arrays(self, key_dir, segment, columns, lower=None, upper=None):
+        """Memory-mapped index and columns of a segment, sliced to [lower, upper]"""
+        segment_dir = os.path.join(key_dir, segment['name'])
+        index = np.load(os.path.join(segment_dir, '_index.npy'), mmap_mode='r')
+        start = 0 if lower is None else int(np.searchsorted(index, lower, side='left'))
+        stop = len(index) if upper is None else int(np.searchsorted(index, upper, side='right'))
+        arrays = {
+            col: np.load(os.path.join(segment_dir, f"{col}.npy"), mmap_mode='r')[start:stop]
+            for col in columns
+        }
+        return index[start:stop], arrays
+
+    def info(self, asset, interval, version=None):
+        """
+        Stored range of a key
+
+        Args:
+            asset (str): Asset name
+            interval (str): Bar interval, e.g. '1h'
+            version (str): Feature-set version (the store's when None)
+
+        Returns:
+            dict: 'start' and 'end' timestamps, 'rows', 'columns' and
+                'segments', or None if nothing is stored
+        """
+        meta = self._read_meta(self._key_dir(asset, interval, version))
+        if meta is None or not meta['segments']:
+            return None
+        return {
+            'start': self._to_index([meta['segments'][0]['start']], meta['tz'])[0],
+            'end': self._to_index([meta['segments'][-1]['end']], meta['tz'])[0],
+            'rows': sum(segment['rows'] for segment in meta['segments']),
+            'columns': list(meta['columns']),
+            'segments': len(meta['segments'])
+        }
+
+    def load_arrays(self, asset, interval, start=None, end=None, columns=None, version=None):
+        """
+        Load a time slice as memory-mapped arrays without copying
+
+        Args:
+            asset (str): Asset name
+            interval (str): Bar interval
+            start: First timestamp to include (the stored start when None)
+            end: Last timestamp to include (the stored end when None)
+            columns (list): Columns to load (all when None)
+            version (str): Feature-set version (the store's when None)
+
+        Returns:
+            tuple: (indexes, arrays), one int64 nanosecond timestamp array
+                and one {column: array} dict per overlapping segment
+        """
+        key_dir = self._key_dir(asset, interval, version)
+        meta = self._read_meta(key_dir)
+        if meta is None:
+            return [], []
+        columns = list(meta['columns']) if columns is None else list(columns)
+        lower, upper = self._bound(start, meta['tz']), self._bound(end, meta['tz'])
+
+        indexes, arrays = [], []
+        for segment in meta['segments']:
+            if (upper is not None and segment['start'] > upper) or (lower is not None and segment['end'] < lower):
+                continue
+            index, segment_arrays = self._segment_arrays(key_dir, segment, columns, lower, upper)
+            if len(index):
+                indexes.append(index)
+                arrays.append(segment_arrays)
+        return indexes, arrays
+
+    def load(self, asset, interval, start=None, end=None, columns=None, version=None):
+        """
+        Load a time slice of the stored indicators
+
+        Args:
+            asset (str): Asset name
+            interval (str): Bar interval
+            start: First timestamp to include (the stored start when None)
+            end: Last timestamp to include (the stored end when None)
+            columns (list): Columns to load (all when None)
+            version (str): Feature-set version (the store's when None)
+
+        Returns:
+            pandas.DataFrame: Indicators indexed by timestamp (empty if
+                nothing is stored in the range)
+        """
+        meta = self._read_meta(self._key_dir(asset, interval, version))
+        if meta is None:
+            return pd.DataFrame()
+        columns = list(meta['columns']) if columns is None else list(columns)
+        indexes, arrays = self.load_arrays(asset, interval, start, end, columns, version)
+        if not indexes:
+            return pd.DataFrame(columns=columns)
+        index = self._to_index(np.concatenate(indexes), meta['tz'])
+        data = {col: np.concatenate([segment[col] for segment in arrays]) for col in columns}
+        return pd.DataFrame(data, index=index, columns=columns)
+
+    def _tail(self, key_dir, meta, columns, rows):
+        """The last rows of a key, read from as few segments as needed"""
+        frames = []
+        for segment in reversed(meta['segments']):
+            index, arrays = self._segment_arrays(key_dir, segment, columns)
+            take = min(rows, len(index))
+            frames.insert(0, pd.DataFrame(
+                {col: np.asarray(arrays[col][len(index) - take:]) for col in columns},
+                index=self._to_index(index[len(index) - take:], meta['tz'])
+            ))
+            rows -= take
+            if rows <= 0:
+                break
+        return pd.concat(frames) if frames else pd.DataFrame(columns=columns)
+
+    def _append(self, key_dir, meta, frame, asset, interval, version, price_columns=None):
+        """Write frame as a new segment of a key (under the lock)"""
+        frame = frame.select_dtypes(include=[np.number, bool])
+        if meta is None or not meta['segments']:
+            tz = frame.index.tz if isinstance(frame.index, pd.DatetimeIndex) else None
+            meta = {
+                'asset': asset,
+                'interval': interval,
+                'version': str(version or self.version),
+                'tz': str(tz) if tz is not None else None,
+                'columns': list(frame.columns),
+                'price_columns': [col for col in (price_columns or []) if col in frame.columns],
+                'segments': []
+            }
+        else:
+            frame = frame.reindex(columns=meta['columns'])
+        meta['segments'].append(self._write_segment(key_dir, frame))
+
+        obsolete = []
+        if len(meta['segments']) > self.max_segments:
+            obsolete = self._compact(key_dir, meta)
+        self._write_meta(key_dir, meta)
+        # Merged segments are removed only once meta.json no longer lists them
+        for segment in obsolete:
+            shutil.rmtree(os.path.join(key_dir, segment['name']), ignore_errors=True)
+        return meta
+
+    def append(self, asset, interval, frame, version=None):
+        """
+        Store precomputed rows after the stored range of a key
+
+        Args:
+            asset (str): Asset name
+            interval (str): Bar interval
+            frame (pandas.DataFrame): Numeric columns indexed by timestamp;
+                rows at or before the stored end are skipped
+            version (str): Version of the key (the store's when None)
+
+        Returns:
+            int: Number of rows added
+        """
+        if frame is None or frame.empty:
+            return 0
+        key_dir = self._key_dir(asset, interval, version)
+        with self.lock:
+            os.makedirs(key_dir, exist_ok=True)
+            meta = self._read_meta(key_dir)
+            if meta is not None and meta['segments']:
+                first_new = int(np.searchsorted(self._index_values(frame.index), meta['segments'][-1]['end'],
+                                                side='right'))
+                frame = frame.iloc[first_new:]
+            if frame.empty:
+                return 0
+            self._append(key_dir, meta, frame, asset, interval, version)
+        return len(frame)
+
+    def delete(self, asset, interval, version=None):
+        """
+        Remove everything stored for a key
+
+        Args:
+            asset (str): Asset name
+            interval (str): Bar interval
+            version (str): Version of the key (the store's when None)
+        """
+        with self.lock:
+            shutil.rmtree(self._key_dir(asset, interval, version), ignore_errors=True)
+
+    def update(self, asset, interval, price_data, version=None):
+        """
+        Compute and store indicators for bars newer than the stored range
+
+        Bars at or before the stored end are taken as already stored. If the
+        prices start before the stored range, the key is recomputed over the
+        older bars, the stored bars and any newer ones, so no stored bar is lost.
+
+        Args:
+            asset (str): Asset name
+            interval (str): Bar interval
+            price_data (pandas.DataFrame): OHLCV bars indexed by timestamp
+            version (str): Feature-set version (the store's when None)
+
+        Returns:
+            int: Number of bars added
+        """
+        if price_data is None or price_data.empty:
+            return 0
+        key_dir = self._key_dir(asset, interval, version)
+        warmup = self.feature_engineer.WARMUP_BARS
+
+        with self.lock:
+            os.makedirs(key_dir, exist_ok=True)
+            meta = self._read_meta(key_dir)
+            price_index = self._index_values(price_data.index)
+            if meta is not None and meta['segments'] and price_index[0] < meta['segments'][0]['start']:
+                return self._extend_back(key_dir, meta, price_data, price_index, asset, interval, version)
+
+            if meta is None or not meta['segments']:
+                new_rows = len(price_data)
+                context = price_data
+            else:
+                first_new = int(np.searchsorted(price_index, meta['segments'][-1]['end'], side='right'))
+                new_rows = len(price_data) - first_new
+                if new_rows <= 0:
+                    return 0
+                # Warm the indicators up on the stored bars before the new ones
+                history = self._tail(key_dir, meta, meta['price_columns'], warmup)
+                context = pd.concat([history, price_data[meta['price_columns']].iloc[first_new:]])
+
+            indicators = self.feature_engineer.add_technical_indicators(context).iloc[-new_rows:]
+            self._append(key_dir, meta, indicators, asset, interval, version, price_columns=list(price_data.columns))
+        return new_rows
+
+    def _extend_back(self, key_dir, meta, price_data, price_index, asset, interval, version):
+        """
+        Recompute a key over bars older than its stored range (under the lock)
+
+        The stored prices are kept and joined with the older (and any newer)
+        bars, the indicators are recomputed over the whole range and written
+        as one segment. Old segments are removed only once meta.json points
+        at the new one, so a failure leaves the stored key intact.
+        """
+        stored_start, stored_end = meta['segments'][0]['start'], meta['segments'][-1]['end']
+        price_columns = meta['price_columns']
+        stored_rows = sum(segment['rows'] for segment in meta['segments'])
+        older = price_data[price_columns].iloc[:int(np.searchsorted(price_index, stored_start, side='left'))]
+        newer = price_data[price_columns].iloc[int(np.searchsorted(price_index, stored_end, side='right')):]
+        stored = self._tail(key_dir, meta, price_columns, stored_rows)
+        context = pd.concat([older, stored, newer])
+
+        indicators = self.feature_engineer.add_technical_indicators(context)
+        self._append(key_dir, None, indicators.reindex(columns=meta['columns']), asset, interval,
+                     version, price_columns=price_columns)
+        for segment in meta['segments']:
+            shutil.rmtree(os.path.join(key_dir, segment['name']), ignore_errors=True)
+        return len(older) + len(newer)
+
+    def _compact(self, key_dir, meta, block_rows=1 << 20):
+        """
+        Merge all segments of a key into one
+
+        Every column is copied segment by segment, in blocks of block_rows,
+        into a preallocated memory-mapped ``.npy`` file, so compaction never
+        holds more than one block in memory. meta is updated to list the new
+        segment; the merged segments are returned for the caller to delete
+        after the new meta.json is written.
+        """
+        old_segments = meta['segments']
+        rows = sum(segment['rows'] for segment in old_segments)
+        name = f"seg_{old_segments[0]['start']}_{old_segments[-1]['end']}"
+        tmp_dir = os.path.join(key_dir, name + '.tmp')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        for col in ['_index'] + list(meta['columns']):
+            sources = [np.load(os.path.join(key_dir, segment['name'], f"{col}.npy"), mmap_mode='r')
+                       for segment in old_segments]
+            target = np.lib.format.open_memmap(os.path.join(tmp_dir, f"{col}.npy"), mode='w+',
+                                               dtype=np.result_type(*sources), shape=(rows,))
+            position = 0
+            for source in sources:
+                for start in range(0, len(source), block_rows):
+                    block = source[start:start + block_rows]
+                    target[position:position + len(block)] = block
+                    position += len(block)
+            target.flush()
+            del target, sources
+
+        segment_dir = os.path.join(key_dir, name)
+        shutil.rmtree(segment_dir, ignore_errors=True)
+        os.replace(tmp_dir, segment_dir)
+        meta['segments'] = [{'name': name, 'start': old_segments[0]['start'],
+                             'end': old_segments[-1]['end'], 'rows': rows}]
+        return [segment for segment in old_segments if segment['name'] != name]
+
+    def get_features(self, asset, interval, price_data=None, start=None, end=None, version=None):
+        """
+        Indicators for a time slice, computing any missing new bars first
+
+        Args:
+            asset (str): Asset name
+            interval (str): Bar interval
+            price_data (pandas.DataFrame): Latest prices; bars newer than the
+                stored range are computed and stored (nothing is computed when None)
+            start: First timestamp to include
+            end: Last timestamp to include
+            version (str): Feature-set version (the store's when None)
+
+        Returns:
+            pandas.DataFrame: Indicators indexed by timestamp
+        """
+        if price_data is not None:
+            self.update(asset, interval, price_data, version)
+        return self.load(asset, interval, start, end, version=version)
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+class LabelEngine:
+    """
+    Buy/Sell/Hold labels for a whole grid of horizons and thresholds at once
+
+    Labels are int8 (1=Buy, -1=Sell, 0=Hold), one column per
+    (horizon, threshold) pair, with a matching boolean ``valid`` matrix
+    marking rows whose future is long enough to be labelled.
+
+    label_grid() uses the return at the horizon, as
+    FeatureEngineer.add_target_variable() does. triple_barrier() uses the
+    path: a row is labelled by whichever barrier (+threshold or -threshold
+    around its close) the price touches first within the horizon. First
+    touches are found with argmax over blocks of forward price paths, so no
+    Python loop runs per row.
+    """
+    def __init__(self, horizons=(1, 5, 10, 20), thresholds=(0.005, 0.01, 0.02)):
+        """
+        Initialize the label engine
+
+        Args:
+            horizons (tuple): Periods to look ahead
+            thresholds (tuple): Price change thresholds (barrier widths for
+                triple-barrier labels)
+        """
+        self.horizons = tuple(int(h) for h in horizons)
+        self.thresholds = tuple(float(t) for t in thresholds)
+        if not self.horizons or min(self.horizons) < 1:
+            raise ValueError("Horizons must be positive")
+
+    @property
+    def columns(self):
+        """Label column names, in matrix column order"""
+        return [f"target_{h}_{t:g}" for h in self.horizons for t in self.thresholds]
+
+    def label_grid(self, close):
+        """
+        Fixed-horizon labels for every (horizon, threshold) pair
+
+        Args:
+            close (array-like): Close prices
+
+        Returns:
+            tuple: (labels, valid) with labels an int8 matrix of shape
+                (len(close), len(columns)) and valid a boolean matrix of the
+                same shape, False where the horizon runs past the data
+        """
+        close = np.asarray(close, dtype=np.float64)
+        n, width = len(close), len(self.thresholds)
+        thresholds = np.asarray(self.thresholds)
+        labels = np.zeros((n, len(self.horizons) * width), dtype=np.int8)
+        valid = np.zeros(labels.shape, dtype=bool)
+
+        for j, horizon in enumerate(self.horizons):
+            if horizon >= n:
+                continue
+            future_return = (close[horizon:] / close[:-horizon] - 1)[:, None]
+            columns = slice(j * width, (j + 1) * width)
+            labels[:n - horizon, columns] = (future_return > thresholds).astype(np.int8) - (future_return < -thresholds)
+            valid[:n - horizon, columns] = ~np.isnan(future_return)
+        return labels, valid
+
+    def triple_barrier(self, close, high=None, low=None, scale=None, vertical='zero', block_rows=65536):
+        """
+        Triple-barrier labels for every (horizon, threshold) pair
+
+        For row i the upper barrier is close[i] * (1 + threshold * scale[i])
+        and the lower one close[i] * (1 - threshold * scale[i]). The label is
+        1 if the upper barrier is touched first within the horizon, -1 if the
+        lower one is, and 0 if both are touched on the same bar. If neither
+        is touched, the label is 0 ('zero') or the sign of the return at the
+        horizon ('sign').
+
+        Args:
+            close (array-like): Close prices
+            high (array-like): Highs checked against the upper barrier (closes when None)
+            low (array-like): Lows checked against the lower barrier (closes when None)
+            scale (array-like): Per-row multiplier of the thresholds, e.g. a
+                rolling volatility (1 when None)
+            vertical (str): Label when no barrier is touched: 'zero' or 'sign'
+            block_rows (int): Rows whose forward paths are held in memory at once
+
+        Returns:
+            tuple: (labels, valid) as for label_grid(); a row is valid once a
+                barrier is touched or its whole horizon is in the data
+        """
+        if vertical not in ('zero', 'sign'):
+            raise ValueError("vertical must be 'zero' or 'sign'")
+        close = np.asarray(close, dtype=np.float64)
+        high = close if high is None else np.asarray(high, dtype=np.float64)
+        low = close if low is None else np.asarray(low, dtype=np.float64)
+        scale = np.ones(len(close)) if scale is None else np.asarray(scale, dtype=np.float64)
+
+        n, width = len(close), len(self.thresholds)
+        longest = max(self.horizons)
+        labels = np.zeros((n, len(self.horizons) * width), dtype=np.int8)
+        valid = np.zeros(labels.shape, dtype=bool)
+
+        # Pad so every forward path has `longest` entries; NaN never touches a barrier
+        padding = np.full(longest, np.nan)
+        close_pad, high_pad, low_pad = (np.concatenate([values, padding]) for values in (close, high, low))
+        steps = np.arange(1, longest + 1)
+
+        for start in range(0, n, block_rows):
+            stop = min(n, start + block_rows)
+            rows = np.arange(start, stop)
+            paths = rows[:, None] + steps
+            base = close[start:stop, None]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                up_moves = high_pad[paths] / base - 1
+                down_moves = low_pad[paths] / base - 1
+            block_scale = scale[start:stop, None]
+            # Bars left in the data after each row
+            remaining = n - 1 - rows
+
+            for k, threshold in enumerate(self.thresholds):
+                barrier = threshold * block_scale
+                with np.errstate(invalid='ignore'):
+                    up_hit = up_moves >= barrier
+                    down_hit = down_moves <= -barrier
+                # Offset of the first touch (longest when never touched)
+                first_up = np.where(up_hit.any(axis=1), up_hit.argmax(axis=1), longest)
+                first_down = np.where(down_hit.any(axis=1), down_hit.argmax(axis=1), longest)
+                first = np.minimum(first_up, first_down)
+                usable = ~np.isnan(block_scale[:, 0]) & ~np.isnan(close[start:stop])
+
+                for j, horizon in enumerate(self.horizons):
+                    column = j * width + k
+                    touched = first < horizon
+                    label = np.where(touched, np.sign(first_down - first_up), 0).astype(np.int8)
+                    if vertical == 'sign':
+                        final = close_pad[rows + horizon] / close[start:stop] - 1
+                        label = np.where(touched, label, np.nan_to_num(np.sign(final))).astype(np.int8)
+                    labels[start:stop, column] = label
+                    valid[start:stop, column] = usable & (touched | (remaining >= horizon))
+        return labels, valid
+
+    def label_frame(self, df, method='fixed', dropna=True, **options):
+        """
+        Labels of a price frame as int8 columns
+
+        Args:
+            df (pandas.DataFrame): Frame with a 'close' column (and 'high' and
+                'low' for triple-barrier labels, if present)
+            method (str): 'fixed' (label_grid) or 'triple_barrier'
+            dropna (bool): Keep only rows where every label is valid
+            **options: Passed to triple_barrier() (scale, vertical, block_rows)
+
+        Returns:
+            pandas.DataFrame: One int8 column per name in columns
+        """
+        if method == 'fixed':
+            labels, valid = self.label_grid(df['close'])
+        elif method == 'triple_barrier':
+            labels, valid = self.triple_barrier(df['close'], df.get('high'), df.get('low'), **options)
+        else:
+            raise ValueError(f"Unsupported labeling method: {method}")
+        frame = pd.DataFrame(labels, index=df.index, columns=self.columns)
+        if dropna:
+            frame = frame[valid.all(axis=1)]
+        return frame
@@ -0,0 +1,80 @@
+import math
+from ..technical_analysis import RollingWindow, ExponentialAverage, IncrementalIndicators, safe_divide
+
+class LiveFeatureState(IncrementalIndicators):
+    """
+    Incremental FeatureEngineer.add_technical_indicators() for one price stream
+
+    Produces the indicator columns of the newest bar only, from rolling
+    windows and exponential averages carried over from the previous bars,
+    so a new bar does not recompute every indicator over the whole history.
+    """
+    def _initial_state(self):
+        return {
+            'prev_close': math.nan,
+            'prev_ma_5': math.nan,
+            'prev_ma_20': math.nan,
+            'closes_5': RollingWindow(5),
+            'closes_20': RollingWindow(20),
+            # Closes of the current and previous 5 bars for the momentum
+            'closes_6': RollingWindow(6),
+            'gains': RollingWindow(14),
+            'losses': RollingWindow(14),
+            'ema_12': ExponentialAverage(12),
+            'ema_26': ExponentialAverage(26),
+            'ema_signal': ExponentialAverage(9)
+        }
+
+    def _compute(self, state, bar):
+        close = bar['close']
+        features = dict(bar)
+
+        # 1. Moving Averages
+        state['closes_5'].push(close)
+        state['closes_20'].push(close)
+        ma_5 = features['ma_5'] = state['closes_5'].mean()
+        ma_20 = features['ma_20'] = state['closes_20'].mean()
+
+        # 2. Relative Strength Index (the first bar counts as zero gain and loss)
+        delta = close - state['prev_close']
+        state['gains'].push(delta if delta > 0 else 0.0)
+        state['losses'].push(-delta if delta < 0 else 0.0)
+        rs = safe_divide(state['gains'].mean(), state['losses'].mean())
+        features['rsi'] = math.nan if math.isnan(rs) else 100 - safe_divide(100, 1 + rs)
+
+        # 3. MACD
+        macd = features['macd'] = state['ema_12'].push(close) - state['ema_26'].push(close)
+        features['macd_signal'] = state['ema_signal'].push(macd)
+
+        # 4. Bollinger Bands
+        features['bb_middle'] = ma_20
+        bb_std = features['bb_std'] = state['closes_20'].std()
+        features['bb_upper'] = ma_20 + 2 * bb_std
+        features['bb_lower'] = ma_20 - 2 * bb_std
+
+        # 5. Price momentum
+        closes = state['closes_6']
+        closes.push(close)
+        features['price_momentum_1d'] = safe_divide(close, closes[-2]) - 1 if len(closes) >= 2 else math.nan
+        features['price_momentum_5d'] = safe_divide(close, closes[0]) - 1 if closes.full else math.nan
+
+        # 6. Volatility
+        features['volatility_5d'] = safe_divide(state['closes_5'].std(), ma_5)
+
+        # 7. Price distance from moving average (normalized)
+        features['price_ma_ratio_5'] = safe_divide(close, ma_5)
+        features['price_ma_ratio_20'] = safe_divide(close, ma_20)
+
+        # 8. Moving average crossovers (NaN comparisons are False)
+        prev_ma_5, prev_ma_20 = state['prev_ma_5'], state['prev_ma_20']
+        features['ma_crossover'] = int(ma_5 > ma_20 and prev_ma_5 <= prev_ma_20)
+        features['ma_crossunder'] = int(ma_5 < ma_20 and prev_ma_5 >= prev_ma_20)
+
+        # 9. High-Low range relative to close price
+        features['hlc_ratio'] = safe_divide(bar['high'] - bar['low'], close)
+
+        # 10. Trend strength indicator
+        features['trend_strength'] = safe_divide(abs(ma_5 - ma_20), ma_20)
+
+        state['prev_close'], state['prev_ma_5'], state['prev_ma_20'] = close, ma_5, ma_20
+        return features
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 
 from .feature_engineering import FeatureEngineer
 from .prediction_model import TradingModel
+from .live_features import LiveFeatureState
 from ..news_sentiment.news_sentiment_manager import NewsSentimentManager
 from ..market_data.api_client import MarketDataClient
 
@@ -20,7 +21,11 @@ class ModelTrainer:
         """
         self.feature_engineer = FeatureEngineer()
         
-    def load_and_prepare_data(self, price_data, sentiment_data=None, lookahead=5, threshold=0.01):
+        # Incremental feature state per price stream for predict_latest()
+        self.live_states = {}
+        
+    def load_and_prepare_data(self, price_data, sentiment_data=None, lookahead=5, threshold=0.01,
+                              feature_store=None, asset=None, interval=None, start=None, end=None):
         """
         Load and prepare data for model training
         
@@ -29,18 +34,49 @@ class ModelTrainer:
             sentiment_data (dict): Dictionary with sentiment data by date
             lookahead (int): Periods to look ahead for target
             threshold (float): Price change threshold for signals
+            feature_store (FeatureStore): Store of computed indicators; only
+                bars of price_data it has not stored yet are computed
+            asset (str): Asset of the prices (required with feature_store)
+            interval (str): Bar interval of the prices (required with feature_store)
+            start: First timestamp to train on (with feature_store; the
+                first bar of price_data when None)
+            end: Last timestamp to train on (with feature_store; the last
+                bar of price_data when None)
             
         Returns:
             tuple: (X, y) feature matrix and target vector
         """
+        indicators = None
+        if feature_store is not None:
+            if asset is None or interval is None:
+                raise ValueError("asset and interval are required with a feature store")
+            if price_data is not None and len(price_data):
+                start = price_data.index[0] if start is None else start
+                end = price_data.index[-1] if end is None else end
+            indicators = feature_store.get_features(asset, interval, price_data, start, end)
+        
         # Prepare features
         df = self.feature_engineer.prepare_features(
             price_data, 
             sentiment_data, 
             lookahead=lookahead, 
-            threshold=threshold
+            threshold=threshold,
+            indicators=indicators
         )
         
+        return self.select_features(df)
+    
+    def select_features(self, df):
+        """
+        Split prepared features into the model inputs and the target
+        
+        Args:
+            df (pandas.DataFrame): Output of FeatureEngineer.prepare_features()
+                (or a dataset built by DatasetBuilder)
+            
+        Returns:
+            tuple: (X, y) Features and target
+        """
         # Separate features and target
         y = df['target']
         
@@ -108,7 +144,9 @@ class ModelTrainer:
                               test_size=0.2, random_state=42,
                               lookahead=5, threshold=0.01, 
                               model_type='random_forest',
-                              optimize=False, save_model=True):
+                              optimize=False, save_model=True,
+                              feature_store=None, asset=None, interval=None,
+                              registry=None, model_name=None):
         """
         Run the full training pipeline
         
@@ -122,6 +160,12 @@ class ModelTrainer:
             model_type (str): Type of model to train
             optimize (bool): Whether to optimize hyperparameters
             save_model (bool): Whether to save the trained model
+            feature_store (FeatureStore): Store of computed indicators to reuse
+            asset (str): Asset of the prices (required with feature_store)
+            interval (str): Bar interval of the prices (required with feature_store)
+            registry (ModelRegistry): Register the model (with its metrics and
+                training settings) instead of saving joblib files
+            model_name (str): Registered model name (defaults to model_type)
             
         Returns:
             tuple: (model, metrics, X_test, y_test, y_pred) Model and evaluation results
@@ -133,7 +177,10 @@ class ModelTrainer:
             price_data, 
             sentiment_data, 
             lookahead=lookahead,
-            threshold=threshold
+            threshold=threshold,
+            feature_store=feature_store,
+            asset=asset,
+            interval=interval
         )
         
         # Split into training and test sets
@@ -151,7 +198,18 @@ class ModelTrainer:
         y_pred = model.predict(X_test)
         
         # Save model if requested
-        if save_model:
+        if save_model and registry is not None:
+            version = registry.register(model_name or model_type, model, metadata={
+                'metrics': metrics,
+                'asset': asset,
+                'interval': interval,
+                'lookahead': lookahead,
+                'threshold': threshold,
+                'train_start': X_train.index[0],
+                'train_end': X_train.index[-1]
+            })
+            print(f"Model registered as {model_name or model_type} version {version}")
+        elif save_model:
             os.makedirs('models', exist_ok=True)
             model.save_model(directory='models')
         
@@ -163,6 +221,8 @@ class ModelTrainer:
             plt.xticks(range(len(importances)), list(importances.keys()), rotation=90)
             plt.title(f'Feature Importances ({model_type})')
             plt.tight_layout()
+            # The registry path doesn't create 'models' for joblib files
+            os.makedirs('models', exist_ok=True)
             plt.savefig(f'models/{model_type}_feature_importances.png')
         
         return model, metrics, X_test, y_test, y_pred
@@ -183,7 +243,7 @@ class ModelTrainer:
         df = self.feature_engineer.add_technical_indicators(price_data)
         
         # Add sentiment features if available
-        if sentiment_data:
+        if sentiment_data is not None and len(sentiment_data):
             df = self.feature_engineer.merge_sentiment_features(df, sentiment_data)
         
         # Get feature columns that match the model's expected features
@@ -207,4 +267,106 @@ class ModelTrainer:
         signal_map = {1: 'BUY', -1: 'SELL', 0: 'HOLD'}
         df['signal_label'] = df['signal'].map(signal_map)
         
-        return df
\ No newline at end of file
+        return df
+    
+    def _latest_sentiment(self, price_data, sentiment_data):
+        """Sentiment features of the newest bar"""
+        if sentiment_data is None or not len(sentiment_data):
+            return {}
+        if isinstance(sentiment_data, pd.Series) or (
+                isinstance(sentiment_data, dict) and
+                not any(isinstance(value, (dict, pd.Series)) for value in sentiment_data.values())):
+            # Already the features of the newest bar
+            return dict(sentiment_data)
+        merged = self.feature_engineer.merge_sentiment_features(price_data.iloc[-1:], sentiment_data)
+        return merged.iloc[0].to_dict()
+    
+    def _latest_row(self, model, price_data, sentiment_data, key):
+        """Timestamp and model feature values of the newest bar of a stream"""
+        state = self.live_states.get(key)
+        if state is None:
+            state = self.live_states[key] = LiveFeatureState()
+        features = dict(state.sync(price_data) or {})
+        
+        # Sentiment and any extra price columns of the newest bar
+        for col, default in self.feature_engineer.SENTIMENT_DEFAULTS.items():
+            features[col] = default
+        features.update(self._latest_sentiment(price_data, sentiment_data))
+        for col in model.feature_columns:
+            if col not in features:
+                features[col] = price_data[col].iloc[-1] if col in price_data.columns else 0.0
+        
+        row = {col: features[col] for col in model.feature_columns}
+        if any(pd.isna(value) for value in row.values()):
+            raise ValueError("Not enough bars to compute the latest features")
+        return state.last_timestamp, row
+    
+    def predict_latest(self, model, price_data, sentiment_data=None, key=None):
+        """
+        Generate the trading signal of the newest bar only
+        
+        Unlike predict_signals(), indicators are not recomputed over all bars:
+        an incremental state kept per key only processes the bars that arrived
+        since the last call, and the model scores just the newest row.
+        
+        Args:
+            model (TradingModel): Trained model
+            price_data (pandas.DataFrame): Latest price data of the stream
+            sentiment_data (dict): Sentiment features of the newest bar (e.g. a
+                row of SentimentIndex.features()), or sentiment by date as for
+                predict_signals()
+            key: Stream identifier, e.g. (asset, timeframe)
+            
+        Returns:
+            dict: Timestamp, signal, signal label and class probabilities
+        """
+        timestamp, row = self._latest_row(model, price_data, sentiment_data, key)
+        signal, probabilities = model.predict_latest(row)
+        signal_map = {1: 'BUY', -1: 'SELL', 0: 'HOLD'}
+        return {
+            'timestamp': timestamp,
+            'signal': signal,
+            'signal_label': signal_map.get(signal),
+            'probabilities': probabilities
+        }
+    
+    def predict_batch(self, model, price_data, sentiment_data=None, keys=None):
+        """
+        Generate the trading signals of the newest bars of many assets with one model call
+        
+        Features of each asset's newest bar are kept incrementally as in
+        predict_latest(); the rows are then stacked and scored together by
+        TradingModel.predict_batch().
+        
+        Args:
+            model (TradingModel): Trained model
+            price_data (dict): Asset -> latest price data
+            sentiment_data (dict): Asset -> sentiment features as for predict_latest()
+            keys (dict): Asset -> stream identifier of its incremental state
+                (the asset itself when None)
+            
+        Returns:
+            dict: Asset -> predict_latest() result with its confidence, or
+                {'error': message} for assets that could not be scored
+        """
+        sentiment_data = sentiment_data or {}
+        keys = keys or {}
+        results, timestamps, rows = {}, {}, {}
+        for asset, prices in price_data.items():
+            try:
+                timestamps[asset], rows[asset] = self._latest_row(
+                    model, prices, sentiment_data.get(asset), keys.get(asset, asset)
+                )
+            except Exception as e:
+                results[asset] = {'error': str(e)}
+        
+        signal_map = {1: 'BUY', -1: 'SELL', 0: 'HOLD'}
+        for asset, (signal, probabilities, confidence) in model.predict_batch(rows).items():
+            results[asset] = {
+                'timestamp': timestamps[asset],
+                'signal': signal,
+                'signal_label': signal_map.get(signal),
+                'probabilities': probabilities,
+                'confidence': confidence
+            }
+        return results
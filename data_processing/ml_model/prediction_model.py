@@ -10,6 +10,7 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
+from ..ml_models.flat_forest import FlatForest
 
 class TradingModel:
     """
@@ -23,10 +24,32 @@ class TradingModel:
             model_type (str): Type of model to use ('random_forest', 'logistic', 'decision_tree', 'gradient_boost')
         """
         self.model_type = model_type.lower()
+        # Loads the pipeline on first use for registry models served from
+        # their flat arrays (see from_registry())
+        self._model_loader = None
         self.model = None
         self.feature_columns = None
         self.scaler = StandardScaler()
         self.model_path = None
+        self._row_scorer = None
+    
+    @property
+    def model(self):
+        """The fitted pipeline (loaded on first use for registry models)"""
+        loader = self._model_loader
+        if loader is not None:
+            self._model = loader()['model']
+            self._model_loader = None
+        return self._model
+    
+    @model.setter
+    def model(self, model):
+        self._model_loader = None
+        self._model = model
+    
+    def _is_trained(self):
+        """Whether the model can score rows (without loading a lazy pipeline)"""
+        return self._model_loader is not None or bool(self._model)
         
     def _create_model(self):
         """
@@ -88,6 +111,7 @@ class TradingModel:
         
         # Fit the model
         self.model.fit(X, y)
+        self._row_scorer = None
         
         return self
     
@@ -154,6 +178,7 @@ class TradingModel:
         
         # Get best model
         self.model = grid_search.best_estimator_
+        self._row_scorer = None
         print(f"Best parameters: {grid_search.best_params_}")
         print(f"Best score: {grid_search.best_score_:.4f}")
         
@@ -212,6 +237,131 @@ class TradingModel:
             print(f"Model type {self.model_type} does not support prediction probabilities.")
             return None
     
+    def export_flat(self, path=None):
+        """
+        Flatten the trained tree pipeline (scaler and classifier) into
+        contiguous node arrays
+        
+        Args:
+            path (str): Directory to save the arrays to (not saved when None)
+            
+        Returns:
+            FlatForest: Model scoring unscaled rows in feature_columns order
+                with the same predictions and probabilities as the pipeline
+        """
+        if not self.model:
+            raise ValueError("Model is not trained. Call fit() first.")
+        classifier = self.model.named_steps['classifier']
+        if not FlatForest.supports(classifier):
+            raise ValueError(f"Model type {self.model_type} can't be flattened")
+        flat = FlatForest(classifier, self.model.named_steps.get('scaler'))
+        if path:
+            flat.save(path)
+        return flat
+    
+    def _build_row_scorer(self):
+        """Scorers of unscaled rows for predict_latest() and predict_batch()"""
+        scaler = self.model.named_steps.get('scaler')
+        classifier = self.model.named_steps['classifier']
+        if FlatForest.supports(classifier):
+            flat = self.export_flat()
+            return flat.classes_, flat.predict_proba_row, flat.predict_proba
+        
+        def scale(X):
+            return X if scaler is None else (X - scaler.mean_) / scaler.scale_
+        
+        return (classifier.classes_,
+                lambda x: classifier.predict_proba(scale(x).reshape(1, -1))[0],
+                lambda X: classifier.predict_proba(scale(X)))
+    
+    def predict_latest(self, x):
+        """
+        Predict the signal of a single feature row
+        
+        Skips predict()'s DataFrame handling and, for tree models, scikit-learn's
+        per-tree dispatch: the row is scaled directly and tree ensembles are
+        scored through flattened node arrays, with the same result.
+        
+        Args:
+            x (dict or numpy.ndarray): Feature values by column name, or a
+                vector in feature_columns order
+            
+        Returns:
+            tuple: (signal, probabilities) where probabilities maps each
+                class to its probability
+        """
+        if not self._is_trained():
+            raise ValueError("Model is not trained. Call fit() first.")
+        
+        if isinstance(x, dict):
+            missing_cols = set(self.feature_columns) - set(x)
+            if missing_cols:
+                raise ValueError(f"Missing columns in input data: {missing_cols}")
+            x = [x[col] for col in self.feature_columns]
+        x = np.asarray(x, dtype=np.float64)
+        
+        if self._row_scorer is None:
+            self._row_scorer = self._build_row_scorer()
+        classes, score, _ = self._row_scorer
+        
+        probabilities = score(x)
+        signal = classes[np.argmax(probabilities)]
+        return signal, dict(zip(classes.tolist(), probabilities.tolist()))
+    
+    def predict_batch(self, rows):
+        """
+        Predict the signals of many feature rows (e.g. the newest row of
+        every asset) with one model call
+        
+        The rows are stacked into one matrix and scored by a single call
+        (through flattened node arrays for tree models, with the same result)
+        instead of one call per row.
+        
+        Args:
+            rows (dict or pandas.DataFrame): Key (e.g. asset) -> feature values
+                by column name or a vector in feature_columns order, or a frame
+                with one row per key
+            
+        Returns:
+            dict: Key -> (signal, probabilities, confidence), where
+                probabilities maps each class to its probability and confidence
+                is the probability of the predicted signal
+        """
+        if not self._is_trained():
+            raise ValueError("Model is not trained. Call fit() first.")
+        
+        if isinstance(rows, pd.DataFrame):
+            missing_cols = set(self.feature_columns) - set(rows.columns)
+            if missing_cols:
+                raise ValueError(f"Missing columns in input data: {missing_cols}")
+            keys = list(rows.index)
+            X = rows[self.feature_columns].to_numpy(dtype=np.float64)
+        else:
+            keys, vectors = list(rows), []
+            for key in keys:
+                x = rows[key]
+                if isinstance(x, dict):
+                    missing_cols = set(self.feature_columns) - set(x)
+                    if missing_cols:
+                        raise ValueError(f"Missing columns in input data for {key}: {missing_cols}")
+                    x = [x[col] for col in self.feature_columns]
+                vectors.append(np.asarray(x, dtype=np.float64))
+            X = np.vstack(vectors) if vectors else np.empty((0, len(self.feature_columns)))
+        if not keys:
+            return {}
+        
+        if self._row_scorer is None:
+            self._row_scorer = self._build_row_scorer()
+        classes, _, score_batch = self._row_scorer
+        probabilities = score_batch(X)
+        
+        classes = classes.tolist()
+        best = probabilities.argmax(axis=1)
+        return {
+            key: (classes[best[i]], dict(zip(classes, probabilities[i].tolist())), float(probabilities[i, best[i]]))
+            for i, key in enumerate(keys)
+        }
+    
     def evaluate(self, X_test, y_test):
         """
         Evaluate the model performance
@@ -323,6 +473,41 @@ class TradingModel:
         
         return instance
     
+    def registry_state(self):
+        """Objects and metadata stored by ModelRegistry.register()"""
+        if not self.model:
+            raise ValueError("Model is not trained. Call fit() first.")
+        return {'model': self.model}, {
+            'model_type': self.model_type,
+            'feature_columns': self.feature_columns,
+            'flat': FlatForest.supports(self.model.named_steps['classifier'])
+        }
+    
+    @classmethod
+    def from_registry(cls, objects, metadata, flat=None):
+        """
+        Rebuild a model loaded by ModelRegistry.load()
+        
+        Args:
+            objects (dict or callable): Objects from registry_state(), or a
+                function returning them, called the first time the pipeline
+                is needed (predict_latest() and predict_batch() only use flat)
+            metadata (dict): Registered metadata
+            flat (FlatForest): Flattened pipeline, when registered
+            
+        Returns:
+            TradingModel: The rebuilt model
+        """
+        instance = cls(model_type=metadata['model_type'])
+        if callable(objects):
+            instance._model_loader = objects
+        else:
+            instance.model = objects['model']
+        instance.feature_columns = metadata['feature_columns']
+        if flat is not None:
+            instance._row_scorer = (flat.classes_, flat.predict_proba_row, flat.predict_proba)
+        return instance
+    
     def get_feature_importances(self):
         """
         Get feature importances if the model supports it
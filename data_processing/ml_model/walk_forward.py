@@ -0,0 +1,261 @@
+import os
+import time
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from .prediction_model import TradingModel
+from .model_trainer import ModelTrainer
+
+def walk_forward_splits(n_rows, train_size, test_size, step=None, expanding=False, purge=0, embargo=0):
+    """
+    Chronological train/test windows over n_rows rows
+
+    Fold k trains on the ``train_size`` rows before ``train_size + k * step``
+    (every earlier row when expanding) and tests on the ``test_size`` rows
+    that follow. The last ``purge`` training rows are dropped, since their
+    targets look ahead into the test window, and ``embargo`` rows are skipped
+    between the training and test windows.
+
+    Args:
+        n_rows (int): Rows in the dataset
+        train_size (int): Rows in the (first) training window
+        test_size (int): Rows in each test window
+        step (int): Rows the windows move per fold (test_size when None)
+        expanding (bool): Keep every earlier row in the training window
+        purge (int): Training rows dropped before each test window
+        embargo (int): Rows skipped between training and test windows
+
+    Returns:
+        list: One dict per fold with positional 'train' and 'test' (start, stop) ranges
+    """
+    step = step or test_size
+    folds = []
+    train_end = train_size
+    while train_end + embargo < n_rows:
+        test_start = train_end + embargo
+        folds.append({
+            'fold': len(folds),
+            'train': (0 if expanding else train_end - train_size, max(0, train_end - purge)),
+            'test': (test_start, min(n_rows, test_start + test_size))
+        })
+        train_end += step
+    return folds
+
+def run_fold(config, fold):
+    """
+    Train and score one walk-forward fold
+
+    The dataset is memory-mapped from the arrays written by
+    WalkForwardEngine.run(), so every fold reads the same cached features
+    without copying the whole dataset into each worker.
+
+    Args:
+        config (dict): Options prepared by WalkForwardEngine
+        fold (dict): Fold from walk_forward_splits()
+
+    Returns:
+        dict: Fold metrics
+    """
+    started = time.perf_counter()
+    path = config['work_dir']
+    X = np.load(os.path.join(path, 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(path, 'y.npy'), mmap_mode='r')
+    index = np.load(os.path.join(path, 'index.npy'), mmap_mode='r')
+    future_return = np.load(os.path.join(path, 'future_return.npy'), mmap_mode='r')
+
+    def timestamp(position):
+        value = index[position]
+        if not config['datetime_index']:
+            return value.item()
+        value = pd.Timestamp(value)
+        return value.tz_localize('UTC').tz_convert(config['tz']) if config['tz'] else value
+
+    (train_start, train_stop), (test_start, test_stop) = fold['train'], fold['test']
+    X_train = pd.DataFrame(np.asarray(X[train_start:train_stop]), columns=config['columns'])
+    X_test = pd.DataFrame(np.asarray(X[test_start:test_stop]), columns=config['columns'])
+    y_train, y_test = np.asarray(y[train_start:train_stop]), np.asarray(y[test_start:test_stop])
+
+    model = TradingModel(model_type=config['model_type'])
+    if config['optimize']:
+        model.optimize_hyperparameters(X_train, y_train, cv=config['cv'])
+    else:
+        model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+
+    # Return of trading each predicted signal over the target horizon
+    returns = np.asarray(future_return[test_start:test_stop])
+    traded = y_pred != 0
+    signal_returns = y_pred[traded] * returns[traded]
+
+    return {
+        'fold': fold['fold'],
+        'train_start': timestamp(train_start),
+        'train_end': timestamp(train_stop - 1),
+        'test_start': timestamp(test_start),
+        'test_end': timestamp(test_stop - 1),
+        'train_rows': train_stop - train_start,
+        'test_rows': test_stop - test_start,
+        'accuracy': accuracy_score(y_test, y_pred),
+        'precision': precision_score(y_test, y_pred, average='macro', zero_division=0),
+        'recall': recall_score(y_test, y_pred, average='macro', zero_division=0),
+        'f1': f1_score(y_test, y_pred, average='macro', zero_division=0),
+        'trade_rate': traded.mean(),
+        'hit_rate': (signal_returns > 0).mean() if len(signal_returns) else np.nan,
+        'mean_signal_return': signal_returns.mean() if len(signal_returns) else np.nan,
+        'seconds': time.perf_counter() - started
+    }
+
+class WalkForwardEngine:
+    """
+    Walk-forward validation of a model type over rolling or expanding windows
+
+    Features and targets are prepared once (or taken from a DatasetBuilder
+    dataset), written as arrays to a work directory and memory-mapped by
+    every fold, so folds never recompute indicators. Folds are trained and
+    scored in parallel worker processes and reported one row per fold.
+    """
+    def __init__(self, model_type='random_forest', train_size=5000, test_size=1000, step=None,
+                 expanding=False, purge=None, embargo=0, lookahead=5, threshold=0.01,
+                 n_jobs=None, optimize=False, cv=5, work_dir=None):
+        """
+        Initialize the engine
+
+        Args:
+            model_type (str): TradingModel type trained in every fold
+            train_size (int): Rows in the (first) training window
+            test_size (int): Rows in each test window
+            step (int): Rows the windows move per fold (test_size when None)
+            expanding (bool): Keep every earlier row in the training window
+            purge (int): Training rows dropped before each test window
+                (lookahead when None: the rows whose targets overlap it)
+            embargo (int): Rows skipped between training and test windows
+            lookahead (int): Periods to look ahead for target
+            threshold (float): Price change threshold for signals
+            n_jobs (int): Worker processes (CPU count when None; 1 runs in-process)
+            optimize (bool): Whether to optimize hyperparameters in every fold
+            cv (int): Cross-validation folds of the optimization
+            work_dir (str): Directory for the memory-mapped dataset (a
+                temporary one, removed after the run, when None)
+        """
+        self.n_jobs = n_jobs or multiprocessing.cpu_count()
+        self.trainer = ModelTrainer()
+        self.split_options = {
+            'train_size': train_size,
+            'test_size': test_size,
+            'step': step,
+            'expanding': expanding,
+            'purge': lookahead if purge is None else purge,
+            'embargo': embargo
+        }
+        self.lookahead = lookahead
+        self.threshold = threshold
+        self.work_dir = work_dir
+        self.config = {
+            'model_type': model_type,
+            'optimize': optimize,
+            'cv': cv
+        }
+
+    def splits(self, n_rows):
+        """Folds of a dataset with n_rows rows, see walk_forward_splits()"""
+        return walk_forward_splits(n_rows, **self.split_options)
+
+    def _write_dataset(self, path, X, y, future_return):
+        """Write the features once as arrays the folds memory-map"""
+        np.save(os.path.join(path, 'X.npy'), X.to_numpy(dtype=np.float64))
+        np.save(os.path.join(path, 'y.npy'), y.to_numpy(dtype=np.int8))
+        np.save(os.path.join(path, 'future_return.npy'), future_return.to_numpy(dtype=np.float64))
+        np.save(os.path.join(path, 'index.npy'), np.asarray(X.index.values))
+
+    def run(self, price_data=None, sentiment_data=None, dataset=None, feature_store=None,
+            asset=None, interval=None):
+        """
+        Run every fold and report its metrics
+
+        Args:
+            price_data (pandas.DataFrame): OHLCV price data (not needed with dataset)
+            sentiment_data (dict): Sentiment features by date or timestamp
+            dataset (pandas.DataFrame): Prepared features with 'target' and
+                'future_return', e.g. DatasetBuilder.load(asset)
+            feature_store (FeatureStore): Store of computed indicators to reuse
+            asset (str): Asset of the prices (required with feature_store)
+            interval (str): Bar interval of the prices (required with feature_store)
+
+        Returns:
+            pandas.DataFrame: One row of metrics per fold, in fold order
+        """
+        if dataset is None:
+            # Indicators are computed (or read from the store) once for every fold
+            indicators = None
+            if feature_store is not None:
+                if asset is None or interval is None:
+                    raise ValueError("asset and interval are required with a feature store")
+                indicators = feature_store.get_features(asset, interval, price_data,
+                                                        price_data.index[0], price_data.index[-1])
+            dataset = self.trainer.feature_engineer.prepare_features(
+                price_data, sentiment_data, lookahead=self.lookahead, threshold=self.threshold,
+                indicators=indicators
+            )
+        X, y = self.trainer.select_features(dataset)
+        folds = self.splits(len(X))
+        if not folds:
+            raise ValueError(f"Not enough rows ({len(X)}) for one walk-forward fold")
+
+        path = self.work_dir or tempfile.mkdtemp(prefix='walk_forward_')
+        os.makedirs(path, exist_ok=True)
+        try:
+            self._write_dataset(path, X, y, dataset['future_return'])
+            datetime_index = isinstance(X.index, pd.DatetimeIndex)
+            config = dict(self.config, work_dir=path, columns=list(X.columns),
+                          datetime_index=datetime_index,
+                          tz=str(X.index.tz) if datetime_index and X.index.tz is not None else None)
+            results = self._run_folds(config, folds)
+        finally:
+            if self.work_dir is None:
+                shutil.rmtree(path, ignore_errors=True)
+
+        return pd.DataFrame(sorted(results, key=lambda row: row['fold'])).set_index('fold')
+
+    def _run_folds(self, config, folds):
+        """Run the folds in-process or in a pool of worker processes"""
+        results = []
+        if self.n_jobs == 1 or len(folds) == 1:
+            for fold in folds:
+                try:
+                    results.append(run_fold(config, fold))
+                except Exception as e:
+                    print(f"Error in walk-forward fold {fold['fold']}: {str(e)}")
+                    results.append({'fold': fold['fold'], 'error': str(e)})
+            return results
+
+        with ProcessPoolExecutor(max_workers=min(self.n_jobs, len(folds)),
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = {executor.submit(run_fold, config, fold): fold for fold in folds}
+            for future in as_completed(futures):
+                fold = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"Error in walk-forward fold {fold['fold']}: {str(e)}")
+                    results.append({'fold': fold['fold'], 'error': str(e)})
+        return results
+
+    @staticmethod
+    def summary(report):
+        """
+        Mean, standard deviation and range of every fold metric
+
+        Args:
+            report (pandas.DataFrame): Output of run()
+
+        Returns:
+            pandas.DataFrame: Statistics of the numeric metrics across folds
+        """
+        metrics = report.select_dtypes(include='number').drop(
+            columns=['train_rows', 'test_rows', 'seconds'], errors='ignore'
+        )
+        return metrics.agg(['mean', 'std', 'min', 'max']).T
@@ -0,0 +1,245 @@
+import os
+import json
+import numpy as np
+
+class FlatForest:
+    """
+    Tree classifier ensemble flattened into node arrays for fast scoring
+
+    scikit-learn's predict_proba validates its input and dispatches every tree
+    separately, which costs tens of milliseconds for a 200-tree forest whether
+    it scores one row or a hundred. Here the nodes of all trees are
+    concatenated into flat arrays and rows walk every tree at once, one
+    level per step, so scoring the newest bar is a handful of NumPy operations.
+
+    Random forests, extra trees and decision trees average their normalized
+    leaf probabilities; gradient boosting adds the learning-rate-scaled leaf
+    values of its stages to the initial raw prediction and applies the
+    sigmoid or softmax. A StandardScaler fitted in front of the estimator can
+    be folded in, so raw feature rows are scored directly. Predictions match
+    the estimator's and probabilities agree to the last few bits: rows are
+    scaled in float64, features are compared as float32 and leaf values are
+    accumulated in scikit-learn's order.
+    """
+    # Arrays written by save() and read back (memory-mapped) by load()
+    ARRAYS = ('roots', 'children', 'feature', 'threshold', 'value', 'classes_',
+              'init', 'mean', 'scale')
+
+    def __init__(self, estimator=None, scaler=None):
+        """
+        Flatten a fitted estimator
+
+        Args:
+            estimator: Fitted RandomForestClassifier, ExtraTreesClassifier,
+                DecisionTreeClassifier or GradientBoostingClassifier (None
+                for an empty instance filled by load())
+            scaler: Fitted StandardScaler applied to rows before the trees
+        """
+        if estimator is None:
+            return
+        self.classes_ = np.asarray(estimator.classes_)
+        if hasattr(estimator, 'learning_rate'):
+            self.kind = 'boosting'
+            # Stage-major order: the K trees of stage 0, then those of stage 1, ...
+            trees = [tree.tree_ for tree in np.asarray(estimator.estimators_).ravel()]
+            self.n_outputs = np.asarray(estimator.estimators_).shape[1]
+            n_features = trees[0].n_features
+            # Raw prediction of the init estimator (the same for every row)
+            self.init = np.asarray(
+                estimator._raw_predict_init(np.zeros((1, n_features), dtype=np.float32))[0],
+                dtype=np.float64
+            )
+            values = [estimator.learning_rate * tree.value[:, 0, 0] for tree in trees]
+        else:
+            self.kind = 'forest'
+            trees = [tree.tree_ for tree in getattr(estimator, 'estimators_', [estimator])]
+            self.n_outputs = len(self.classes_)
+            self.init = np.zeros(0)
+            values = []
+            for tree in trees:
+                value = tree.value[:, 0, :].astype(np.float64)
+                normalizer = value.sum(axis=1, keepdims=True)
+                normalizer[normalizer == 0.0] = 1.0
+                values.append(value / normalizer)
+        self.value = np.concatenate(values)
+        self.n_trees = len(trees)
+        self.depth = max(tree.max_depth for tree in trees)
+
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        self.roots = offsets[:-1].astype(np.int32)
+        left = np.concatenate([
+            np.where(tree.children_left >= 0, tree.children_left + offset, -1)
+            for tree, offset in zip(trees, self.roots)
+        ])
+        right = np.concatenate([
+            np.where(tree.children_right >= 0, tree.children_right + offset, -1)
+            for tree, offset in zip(trees, self.roots)
+        ])
+        # Leaves point to their own node so a finished tree stays where it is;
+        # children[2 * node + 1] is taken when the feature exceeds the threshold
+        nodes = np.arange(len(left))
+        self.children = np.stack([np.where(left < 0, nodes, left), np.where(left < 0, nodes, right)],
+                                 axis=1).ravel().astype(np.int32)
+        self.feature = np.concatenate([np.maximum(tree.feature, 0) for tree in trees]).astype(np.int32)
+        self.threshold = np.concatenate([tree.threshold for tree in trees])
+
+        self.mean = np.zeros(0)
+        self.scale = np.zeros(0)
+        if scaler is not None:
+            # with_mean=False / with_std=False leave the statistic as None
+            self.mean = np.atleast_1d(np.asarray(0.0 if scaler.mean_ is None else scaler.mean_, dtype=np.float64))
+            self.scale = np.atleast_1d(np.asarray(1.0 if scaler.scale_ is None else scaler.scale_, dtype=np.float64))
+
+    @classmethod
+    def supports(cls, estimator):
+        """Whether an estimator is a fitted tree classifier this class can flatten"""
+        trees = getattr(estimator, 'estimators_', None)
+        if trees is None:
+            return hasattr(estimator, 'tree_') and hasattr(estimator, 'classes_')
+        if not hasattr(estimator, 'classes_') or np.ndim(estimator.classes_) != 1:
+            return False
+        trees = np.asarray(trees).ravel()
+        if hasattr(estimator, 'learning_rate'):
+            # Gradient boosting with the log-loss (the only one with probabilities)
+            if not (hasattr(estimator, '_raw_predict_init') and hasattr(estimator, 'predict_proba')):
+                return False
+            loss = getattr(estimator, 'loss', 'log_loss')
+            if loss not in ('log_loss', 'deviance'):
+                return False
+        return len(trees) > 0 and all(hasattr(tree, 'tree_') for tree in trees)
+
+    def _prepare(self, X):
+        """Scale rows (when a scaler was folded in) and round them to float32 as the trees do"""
+        X = np.asarray(X, dtype=np.float64)
+        if len(self.scale):
+            X = (X - self.mean) / self.scale
+        return X.astype(np.float32).astype(np.float64)
+
+    def _to_proba(self, leaf_values):
+        """
+        Class probabilities from the leaf values reached
+
+        Args:
+            leaf_values (numpy.ndarray): value of the reached nodes, with trees
+                on the last axis (forests add a class axis after it)
+        """
+        if self.kind == 'forest':
+            return leaf_values.sum(axis=-2) / self.n_trees
+
+        # Stages added one after another to the init raw prediction
+        stages = leaf_values.reshape(leaf_values.shape[:-1] + (-1, self.n_outputs))
+        init = np.broadcast_to(self.init, stages.shape[:-2] + (1, self.n_outputs))
+        raw = np.concatenate([init, stages], axis=-2).cumsum(axis=-2)[..., -1, :]
+        if self.n_outputs == 1:
+            positive = 1.0 / (1.0 + np.exp(-raw[..., 0]))
+            return np.stack([1.0 - positive, positive], axis=-1)
+        exp = np.exp(raw - raw.max(axis=-1, keepdims=True))
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def predict_proba_row(self, x):
+        """
+        Class probabilities of one row
+
+        Args:
+            x (numpy.ndarray): Feature vector in training column order
+                (unscaled when a scaler was folded in)
+
+        Returns:
+            numpy.ndarray: Probability of each class in classes_
+        """
+        x = self._prepare(x)
+        nodes = self.roots
+        for _ in range(self.depth):
+            nodes = self.children.take(2 * nodes + (x.take(self.feature.take(nodes)) > self.threshold.take(nodes)))
+        return self._to_proba(self.value.take(nodes, axis=0))
+
+    def predict_row(self, x):
+        """
+        Class of one row
+
+        Args:
+            x (numpy.ndarray): Feature vector in training column order
+
+        Returns:
+            The predicted class label
+        """
+        return self.classes_[np.argmax(self.predict_proba_row(x))]
+
+    def predict_proba(self, X, block_rows=4096):
+        """
+        Class probabilities of many rows
+
+        Args:
+            X (numpy.ndarray): Feature matrix in training column order
+            block_rows (int): Rows walked through the trees at once
+
+        Returns:
+            numpy.ndarray: Probabilities of shape (rows, classes)
+        """
+        X = self._prepare(np.atleast_2d(X))
+        probabilities = np.empty((len(X), len(self.classes_)))
+        for start in range(0, len(X), block_rows):
+            block = X[start:start + block_rows]
+            nodes = np.broadcast_to(self.roots, (len(block), self.n_trees))
+            for _ in range(self.depth):
+                values = np.take_along_axis(block, self.feature.take(nodes), axis=1)
+                nodes = self.children.take(2 * nodes + (values > self.threshold.take(nodes)))
+            probabilities[start:start + block_rows] = self._to_proba(self.value.take(nodes, axis=0))
+        return probabilities
+
+    def predict(self, X):
+        """
+        Classes of many rows
+
+        Args:
+            X (numpy.ndarray): Feature matrix in training column order
+
+        Returns:
+            numpy.ndarray: Predicted class labels
+        """
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    @property
+    def nbytes(self):
+        """Memory taken by the node arrays"""
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    def save(self, path):
+        """
+        Save the flattened model as one .npy file per array
+
+        Args:
+            path (str): Directory to write (created if missing)
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(path, f'{name}.npy'), np.ascontiguousarray(getattr(self, name)))
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({'kind': self.kind, 'n_trees': self.n_trees, 'depth': self.depth,
+                       'n_outputs': self.n_outputs}, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """
+        Load a model written by save()
+
+        Args:
+            path (str): Directory written by save()
+            mmap_mode (str): numpy.load() memory-map mode; with 'r' processes
+                loading the same files share their pages
+
+        Returns:
+            FlatForest: The loaded model
+        """
+        flat = cls()
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        flat.kind, flat.n_trees = meta['kind'], meta['n_trees']
+        flat.depth, flat.n_outputs = meta['depth'], meta['n_outputs']
+        for name in cls.ARRAYS:
+            # Class labels may be objects, which can't be memory-mapped
+            mode = None if name == 'classes_' else mmap_mode
+            array = np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mode, allow_pickle=True)
+            # A plain view of the mapping skips numpy.memmap's per-operation overhead
+            setattr(flat, name, array.view(np.ndarray))
+        return flat
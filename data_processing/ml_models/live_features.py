@@ -0,0 +1,149 @@
+import math
+from collections import deque
+import numpy as np
+from technical_analysis import RollingWindow, ExponentialAverage, IncrementalIndicators, safe_divide
+
+# Columns of TradingSignalModel.prepare_features(), in order
+FEATURE_COLUMNS = [
+    'price_change', 'volume_change', 'high_low_ratio',
+    'rsi', 'macd', 'macd_signal', 'bb_position', 'stoch_k', 'stoch_d', 'atr',
+    'rsi_signal', 'bb_signal', 'stoch_signal', 'combined_signal',
+    'sentiment_score', 'sentiment_volume'
+] + [
+    f'{name}_lag_{lag}' for lag in (1, 2, 3) for name in ('price_change', 'volume_change', 'rsi')
+]
+
+LAGGED_FEATURES = ('price_change', 'volume_change', 'rsi')
+LAGS = 3
+
+def _sign_signal(buy, sell):
+    if buy:
+        return 1
+    if sell:
+        return -1
+    return 0
+
+def latest_sentiment(sentiment_data):
+    """
+    Sentiment of the newest bar from prepare_features() style sentiment data
+
+    Args:
+        sentiment_data: Mapping or DataFrame with 'compound' and 'article_count'
+            (scalars or series, whose last value is used)
+
+    Returns:
+        tuple: (compound, article_count)
+    """
+    values = []
+    for key in ('compound', 'article_count'):
+        value = sentiment_data[key]
+        if hasattr(value, 'iloc'):
+            value = value.iloc[-1]
+        elif np.ndim(value):
+            value = np.asarray(value)[-1]
+        values.append(float(value))
+    return tuple(values)
+
+class LiveFeatureState(IncrementalIndicators):
+    """
+    Incremental TradingSignalModel features for one (asset, timeframe) stream
+
+    Keeps the rolling windows, exponential averages and lagged values behind
+    prepare_features() so a new bar costs a few microseconds instead of
+    recomputing every indicator over the whole history.
+    """
+    def _initial_state(self):
+        return {
+            'prev_close': math.nan,
+            'prev_volume': math.nan,
+            'gains': RollingWindow(14),
+            'losses': RollingWindow(14),
+            'ema_fast': ExponentialAverage(12),
+            'ema_slow': ExponentialAverage(26),
+            'ema_signal': ExponentialAverage(9),
+            'closes': RollingWindow(20),
+            'lows': RollingWindow(14),
+            'highs': RollingWindow(14),
+            'stoch_k': RollingWindow(3),
+            'true_ranges': RollingWindow(14),
+            # Lagged features of the current and previous bars
+            'history': deque(maxlen=LAGS + 1)
+        }
+
+    def _compute(self, state, bar):
+        close, high, low = bar['close'], bar['high'], bar['low']
+        prev_close = state['prev_close']
+        features = {
+            'price_change': safe_divide(close, prev_close) - 1,
+            'volume_change': safe_divide(bar['volume'], state['prev_volume']) - 1,
+            'high_low_ratio': safe_divide(high, low)
+        }
+
+        # RSI (the first bar has no change and counts as zero gain and loss)
+        delta = close - prev_close
+        state['gains'].push(delta if delta > 0 else 0.0)
+        state['losses'].push(-delta if delta < 0 else 0.0)
+        rs = safe_divide(state['gains'].mean(), state['losses'].mean())
+        rsi = features['rsi'] = math.nan if math.isnan(rs) else 100 - safe_divide(100, 1 + rs)
+
+        # MACD
+        macd = features['macd'] = state['ema_fast'].push(close) - state['ema_slow'].push(close)
+        macd_line_signal = state['ema_signal'].push(macd)
+
+        # Bollinger Bands
+        state['closes'].push(close)
+        bb_middle, bb_std = state['closes'].mean(), state['closes'].std()
+        bb_upper, bb_lower = bb_middle + 2 * bb_std, bb_middle - 2 * bb_std
+        features['bb_position'] = safe_divide(close - bb_lower, bb_upper - bb_lower)
+
+        # Stochastic
+        state['lows'].push(low)
+        state['highs'].push(high)
+        lowest_low, highest_high = state['lows'].min(), state['highs'].max()
+        stoch_k = features['stoch_k'] = 100 * safe_divide(close - lowest_low, highest_high - lowest_low)
+        state['stoch_k'].push(stoch_k)
+        stoch_d = features['stoch_d'] = state['stoch_k'].mean()
+
+        # ATR (the first bar's true range is its high - low)
+        true_range = high - low
+        if not math.isnan(prev_close):
+            true_range = max(true_range, abs(high - prev_close), abs(low - prev_close))
+        state['true_ranges'].push(true_range)
+        features['atr'] = state['true_ranges'].mean()
+
+        # Technical signals (NaN comparisons are False, as in generate_trading_signals())
+        features['rsi_signal'] = _sign_signal(rsi < 30, rsi > 70)
+        features['macd_signal'] = _sign_signal(macd > macd_line_signal, macd < macd_line_signal)
+        features['bb_signal'] = _sign_signal(close < bb_lower, close > bb_upper)
+        features['stoch_signal'] = _sign_signal((stoch_k < 20) and (stoch_d < 20), (stoch_k > 80) and (stoch_d > 80))
+        features['combined_signal'] = (
+            features['rsi_signal'] + features['macd_signal'] + features['bb_signal'] + features['stoch_signal']
+        )
+
+        history = state['history']
+        history.append(tuple(features[name] for name in LAGGED_FEATURES))
+        for lag in range(1, LAGS + 1):
+            lagged = history[-1 - lag] if len(history) > lag else (math.nan,) * len(LAGGED_FEATURES)
+            for name, value in zip(LAGGED_FEATURES, lagged):
+                features[f'{name}_lag_{lag}'] = value
+
+        state['prev_close'], state['prev_volume'] = close, bar['volume']
+        return features
+
+    def vector(self, compound=0.0, article_count=0.0):
+        """
+        Feature vector of the newest bar
+
+        Args:
+            compound (float): Sentiment compound score of the bar
+            article_count (float): Article count of the bar
+
+        Returns:
+            numpy.ndarray: Features in FEATURE_COLUMNS order, or None while
+                any feature is still NaN (prepare_features() drops such rows)
+        """
+        if self.features is None:
+            return None
+        values = dict(self.features, sentiment_score=compound, sentiment_volume=article_count)
+        vector = np.array([values[name] for name in FEATURE_COLUMNS], dtype=np.float64)
+        return None if np.isnan(vector).any() else vector
@@ -0,0 +1,277 @@
+import os
+import json
+import shutil
+import uuid
+import time
+import importlib
+import functools
+import threading
+from datetime import datetime
+import joblib
+from .flat_forest import FlatForest
+
+def _json_default(value):
+    """JSON form of NumPy values (e.g. a confusion matrix) and timestamps in metadata"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+class ModelRegistry:
+    """
+    Versioned store of trained models with their feature columns and metadata
+
+    Layout: ``root/<name>/<version>/`` holds ``meta.json`` (model class,
+    feature columns, metadata), ``model.joblib`` (the estimator objects) and,
+    for tree models, ``flat/`` (FlatForest arrays). ``root/<name>/CURRENT``
+    names the version servers should use. Versions are written to a
+    temporary directory and renamed into place, and CURRENT is replaced
+    atomically, so readers never see a partial model.
+
+    Models take part by implementing ``registry_state()``, returning
+    (objects to pickle, metadata), and a ``from_registry(objects, metadata,
+    flat)`` classmethod (see TradingSignalModel and TradingModel). When a
+    version has flat arrays, ``objects`` is a function that unpickles them on
+    first use, so serving processes only map the shared arrays.
+    """
+    def __init__(self, root='models'):
+        """
+        Initialize the registry
+
+        Args:
+            root (str): Directory holding the registered models
+        """
+        self.root = root
+
+    def _path(self, name, version=None):
+        path = os.path.join(self.root, name.replace('/', '_'))
+        return path if version is None else os.path.join(path, str(version))
+
+    def versions(self, name):
+        """Registered versions of a model, oldest first"""
+        path = self._path(name)
+        if not os.path.isdir(path):
+            return []
+        return sorted((int(entry) for entry in os.listdir(path) if entry.isdigit()))
+
+    def current_version(self, name):
+        """Version CURRENT points to (None if nothing was promoted)"""
+        try:
+            with open(os.path.join(self._path(name), 'CURRENT')) as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def register(self, name, model, metadata=None, promote=True):
+        """
+        Store a trained model as the next version of ``name``
+
+        Args:
+            name (str): Model name, e.g. 'trading_signal'
+            model: Trained TradingSignalModel or TradingModel
+            metadata (dict): Extra JSON-serializable metadata (metrics, data range, ...)
+            promote (bool): Make it the current version
+
+        Returns:
+            int: The new version
+        """
+        objects, model_metadata = model.registry_state()
+        meta = {
+            'name': name,
+            'module': type(model).__module__,
+            'class': type(model).__qualname__,
+            'created': datetime.now().isoformat(),
+            **model_metadata,
+            'metadata': metadata or {}
+        }
+
+        base = self._path(name)
+        os.makedirs(base, exist_ok=True)
+        tmp = os.path.join(base, f'.tmp-{uuid.uuid4().hex}')
+        os.makedirs(tmp)
+        try:
+            # Uncompressed, so load() can memory-map the arrays
+            joblib.dump(objects, os.path.join(tmp, 'model.joblib'))
+            flat = model.export_flat() if hasattr(model, 'export_flat') and model_metadata.get('flat') else None
+            if flat is not None:
+                flat.save(os.path.join(tmp, 'flat'))
+            while True:
+                version = max(self.versions(name), default=0) + 1
+                meta['version'] = version
+                with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+                    json.dump(meta, f, indent=2, default=_json_default)
+                try:
+                    # Fails if another process registered this version first
+                    os.rename(tmp, self._path(name, version))
+                    break
+                except OSError:
+                    if not os.path.isdir(self._path(name, version)):
+                        raise
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        if promote:
+            self.promote(name, version)
+        return version
+
+    def promote(self, name, version):
+        """
+        Point CURRENT at a registered version (picked up by ModelHandle.refresh())
+
+        Args:
+            name (str): Model name
+            version (int): Registered version
+        """
+        if not os.path.isdir(self._path(name, version)):
+            raise ValueError(f"Unknown version {version} of model {name}")
+        tmp = os.path.join(self._path(name), f'.CURRENT-{uuid.uuid4().hex}')
+        with open(tmp, 'w') as f:
+            f.write(str(version))
+        os.replace(tmp, os.path.join(self._path(name), 'CURRENT'))
+
+    def metadata(self, name, version=None):
+        """meta.json of a version (the current one when None)"""
+        version = self.current_version(name) if version is None else version
+        with open(os.path.join(self._path(name, version), 'meta.json')) as f:
+            return json.load(f)
+
+    def load(self, name, version=None, mmap_mode='r', model_class=None):
+        """
+        Load a registered model
+
+        Args:
+            name (str): Model name
+            version (int): Version to load (the current one when None)
+            mmap_mode (str): Memory-map mode of the arrays; with 'r' the
+                flattened node arrays are shared by every process loading them
+                (the estimator itself is then loaded only when first used)
+            model_class: Class to rebuild (the registered one when None)
+
+        Returns:
+            tuple: (model, version)
+        """
+        version = self.current_version(name) if version is None else version
+        if version is None:
+            raise ValueError(f"No current version of model {name}")
+        path = self._path(name, version)
+        meta = self.metadata(name, version)
+
+        if model_class is None:
+            model_class = getattr(importlib.import_module(meta['module']), meta['class'])
+        model_path = os.path.join(path, 'model.joblib')
+        flat_path = os.path.join(path, 'flat')
+        if os.path.isdir(flat_path):
+            # Serve from the shared flat arrays; unpickling the estimator would
+            # copy every tree into private memory, so it is only loaded when
+            # something (retraining, feature importances, ...) asks for it
+            flat = FlatForest.load(flat_path, mmap_mode=mmap_mode)
+            objects = functools.partial(joblib.load, model_path, mmap_mode=mmap_mode)
+        else:
+            flat = None
+            objects = joblib.load(model_path, mmap_mode=mmap_mode)
+        return model_class.from_registry(objects, meta, flat), version
+
+    def delete(self, name, version):
+        """Remove a version that is not current"""
+        if version == self.current_version(name):
+            raise ValueError(f"Version {version} of model {name} is current")
+        shutil.rmtree(self._path(name, version), ignore_errors=True)
+
+class ModelHandle:
+    """
+    Reference to the model a server is using, swapped atomically on promotion
+
+    Request handlers read ``handle.model`` once and keep using that object,
+    so requests in flight finish on the old model while new ones get the new
+    one. refresh() loads and warms a newly promoted version before swapping
+    it in, and carries over the incremental live feature states, so no
+    request waits on a load and no stream restarts its indicators.
+    """
+    # Per-stream state handed from the old model to the new one on a swap
+    SHARED_STATE = ('live_states', '_live_lock')
+
+    def __init__(self, model=None, registry=None, name=None, warm=None):
+        """
+        Initialize the handle
+
+        Args:
+            model: Initial model (loaded from the registry when None)
+            registry (ModelRegistry): Registry to load promoted versions from
+            name (str): Registered model name
+            warm (callable): Called with a freshly loaded model before it is
+                swapped in, e.g. to run a dummy inference
+        """
+        self.registry = registry
+        self.name = name
+        self.warm = warm
+        self.version = None
+        self.model = model
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        if model is None and registry is not None and registry.current_version(name) is not None:
+            self.refresh()
+
+    def swap(self, model, version=None):
+        """
+        Make a model current
+
+        Args:
+            model: Model to serve from now on
+            version (int): Its registry version
+        """
+        old = self.model
+        if old is not None:
+            for attr in self.SHARED_STATE:
+                if hasattr(old, attr) and hasattr(model, attr):
+                    setattr(model, attr, getattr(old, attr))
+        # A single reference assignment: readers see the old or the new model
+        self.model = model
+        self.version = version
+
+    def refresh(self):
+        """
+        Load and swap in the registry's current version if it changed
+
+        Returns:
+            bool: Whether a new version was swapped in
+        """
+        if self.registry is None:
+            return False
+        version = self.registry.current_version(self.name)
+        if version is None or version == self.version:
+            return False
+        with self._refresh_lock:
+            if version == self.version:
+                return False
+            started = time.perf_counter()
+            model, version = self.registry.load(self.name, version)
+            if self.warm:
+                self.warm(model)
+            self.swap(model, version)
+            print(f"Model {self.name} version {version} loaded in {time.perf_counter() - started:.2f}s")
+            return True
+
+    def watch(self, interval=5):
+        """
+        Poll the registry for promoted versions in a daemon thread
+
+        Args:
+            interval (float): Seconds between checks
+
+        Returns:
+            threading.Thread: The polling thread (stopped by stop())
+        """
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Error refreshing model {self.name}: {str(e)}")
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        """Stop the polling thread"""
+        self._stop.set()
@@ -1,12 +1,18 @@
+import threading
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 import joblib
-from ..technical_analysis import get_all_indicators, generate_trading_signals
+from technical_analysis import get_all_indicators, generate_trading_signals
+from .flat_forest import FlatForest
+from .live_features import FEATURE_COLUMNS, LiveFeatureState, latest_sentiment
 
 class TradingSignalModel:
     def __init__(self):
+        # Loads model and scaler on first use for registry models served
+        # from their flat arrays (see from_registry())
+        self._objects_loader = None
         self.model = RandomForestClassifier(
             n_estimators=200,
             max_depth=10,
@@ -16,6 +22,45 @@ class TradingSignalModel:
         )
         self.scaler = StandardScaler()
         
+        # Incremental feature state per stream for predict_latest()
+        self.live_states = {}
+        self._live_lock = threading.Lock()
+        self._flat_model = None
+    
+    def _load_objects(self):
+        loader = self._objects_loader
+        if loader is not None:
+            objects = loader()
+            self._model, self._scaler = objects['model'], objects['scaler']
+            self._objects_loader = None
+    
+    @property
+    def model(self):
+        """The scikit-learn estimator (loaded on first use for registry models)"""
+        self._load_objects()
+        return self._model
+    
+    @model.setter
+    def model(self, model):
+        self._load_objects()
+        self._model = model
+    
+    @property
+    def scaler(self):
+        """The fitted StandardScaler (loaded on first use for registry models)"""
+        self._load_objects()
+        return self._scaler
+    
+    @scaler.setter
+    def scaler(self, scaler):
+        self._load_objects()
+        self._scaler = scaler
+    
+    @property
+    def is_trained(self):
+        """Whether the model can score rows (without loading a lazy estimator)"""
+        return self._flat_model is not None or hasattr(self.model, 'estimators_')
+        
     def prepare_features(self, market_data, sentiment_data):
         """Combine market data, technical indicators, and sentiment features"""
         # Calculate technical indicators
@@ -65,6 +110,7 @@ class TradingSignalModel:
         features = self.prepare_features(market_data, sentiment_data)
         X = self.scaler.fit_transform(features)
         self.model.fit(X, labels)
+        self._flat_model = None
     
     def predict(self, market_data, sentiment_data):
         """Generate trading signals with confidence scores"""
@@ -99,6 +145,170 @@ class TradingSignalModel:
             }
         }
     
+    def _live_state(self, key):
+        with self._live_lock:
+            entry = self.live_states.get(key)
+            if entry is None:
+                entry = self.live_states[key] = (threading.Lock(), LiveFeatureState())
+            return entry
+    
+    def export_flat(self, path=None):
+        """
+        Flatten the trained model and its scaler into contiguous node arrays
+        
+        Args:
+            path (str): Directory to save the arrays to (not saved when None)
+            
+        Returns:
+            FlatForest: Model scoring unscaled feature rows with the same
+                predictions and probabilities as scaler + model
+        """
+        flat = FlatForest(self.model, self.scaler)
+        if path:
+            flat.save(path)
+        return flat
+    
+    def _flat(self):
+        """Flattened model used for live scoring (None if it can't be flattened)"""
+        if self._flat_model is None and FlatForest.supports(self.model):
+            self._flat_model = self.export_flat()
+        return self._flat_model
+    
+    def _score_row(self, x):
+        """Class probabilities of one unscaled feature vector"""
+        flat = self._flat()
+        if flat is not None:
+            return flat.classes_, flat.predict_proba_row(x)
+        x = (x - self.scaler.mean_) / self.scaler.scale_
+        return self.model.classes_, self.model.predict_proba(x.reshape(1, -1))[0]
+    
+    def _latest_vector(self, market_data, sentiment_data, key):
+        """Indicator values and feature vector of the newest bar of a stream"""
+        compound, article_count = latest_sentiment(sentiment_data)
+        lock, state = self._live_state(key)
+        with lock:
+            state.sync(market_data)
+            features = state.features
+            vector = state.vector(compound, article_count)
+        if vector is None:
+            raise ValueError("Not enough bars to compute the latest features")
+        return features, vector
+    
+    def _signal_result(self, features, vector, classes, probabilities):
+        """predict() style result of one scored feature vector"""
+        final_signal = classes[np.argmax(probabilities)]
+        model_confidence = probabilities.max()
+        
+        # Adjust confidence based on technical signals
+        technical_confidence = abs(features['combined_signal']) / 4
+        combined_confidence = (model_confidence + technical_confidence) / 2
+        
+        return {
+            'signal': 'BUY' if final_signal == 1 else 'SELL',
+            'confidence': combined_confidence * 100,
+            'features': dict(zip(FEATURE_COLUMNS, vector.tolist())),
+            'technical_signals': {
+                'rsi': features['rsi_signal'],
+                'macd': features['macd_signal'],
+                'bollinger_bands': features['bb_signal'],
+                'stochastic': features['stoch_signal'],
+                'combined': features['combined_signal']
+            }
+        }
+    
+    def predict_latest(self, market_data, sentiment_data, key=None):
+        """
+        Generate the trading signal of the newest bar only
+        
+        Same result format as predict(), but the features come from an
+        incremental state kept per key: only bars that arrived since the last
+        call are processed, and the model scores just the newest row. The
+        first call for a key (or one whose window no longer contains the last
+        seen bar) builds the state from the whole window.
+        
+        Args:
+            market_data (pandas.DataFrame): Latest OHLCV bars of the stream
+            sentiment_data: 'compound' and 'article_count' as for predict()
+                (the last value is used)
+            key: Stream identifier, e.g. (asset, timeframe)
+            
+        Returns:
+            dict: Signal, confidence, features and technical signals
+        """
+        features, vector = self._latest_vector(market_data, sentiment_data, key)
+        classes, probabilities = self._score_row(vector)
+        return self._signal_result(features, vector, classes, probabilities)
+    
+    def predict_batch(self, streams):
+        """
+        Generate the trading signals of the newest bars of many streams at once
+        
+        The latest feature vector of every stream (kept incrementally as in
+        predict_latest()) is stacked into one matrix, which is scaled and
+        scored with a single predict_proba() call, so refreshing many assets
+        pays the model's per-call overhead once.
+        
+        Args:
+            streams (dict): Stream key, e.g. (asset, timeframe) ->
+                (market_data, sentiment_data) as for predict_latest()
+            
+        Returns:
+            dict: Stream key -> predict_latest() result, or {'error': message}
+                for streams that could not be scored
+        """
+        results, rows = {}, {}
+        for key, (market_data, sentiment_data) in streams.items():
+            try:
+                rows[key] = self._latest_vector(market_data, sentiment_data, key)
+            except Exception as e:
+                results[key] = {'error': str(e)}
+        
+        if rows:
+            X = np.vstack([vector for _, vector in rows.values()])
+            flat = self._flat()
+            if flat is not None:
+                classes, probabilities = flat.classes_, flat.predict_proba(X)
+            else:
+                X = (X - self.scaler.mean_) / self.scaler.scale_
+                classes, probabilities = self.model.classes_, self.model.predict_proba(X)
+            for (key, (features, vector)), row_probabilities in zip(rows.items(), probabilities):
+                results[key] = self._signal_result(features, vector, classes, row_probabilities)
+        return results
+    
+    def registry_state(self):
+        """Objects and metadata stored by ModelRegistry.register()"""
+        return {'model': self.model, 'scaler': self.scaler}, {
+            'model_type': type(self.model).__name__,
+            'feature_columns': FEATURE_COLUMNS,
+            'flat': FlatForest.supports(self.model)
+        }
+    
+    @classmethod
+    def from_registry(cls, objects, metadata, flat=None):
+        """
+        Rebuild a model loaded by ModelRegistry.load()
+        
+        Args:
+            objects (dict or callable): Objects from registry_state(), or a
+                function returning them, called the first time the estimator
+                or scaler is needed (live scoring only uses flat)
+            metadata (dict): Registered metadata
+            flat (FlatForest): Flattened model and scaler, when registered
+            
+        Returns:
+            TradingSignalModel: The rebuilt model
+        """
+        if metadata.get('feature_columns', FEATURE_COLUMNS) != FEATURE_COLUMNS:
+            raise ValueError("Registered model was trained on different feature columns")
+        instance = cls()
+        if callable(objects):
+            instance._objects_loader = objects
+        else:
+            instance.model = objects['model']
+            instance.scaler = objects['scaler']
+        instance._flat_model = flat
+        return instance
+    
     def save_model(self, path):
         """Save the trained model"""
         joblib.dump({
@@ -110,4 +320,5 @@ class TradingSignalModel:
         """Load a trained model"""
         saved_model = joblib.load(path)
         self.model = saved_model['model']
-        self.scaler = saved_model['scaler'] 
\ No newline at end of file
+        self.scaler = saved_model['scaler']
+        self._flat_model = None 
\ No newline at end of file
@@ -1,5 +1,14 @@
 from .news_api_client import NewsAPIClient
 from .sentiment_analyzer import SentimentAnalyzer
 from .news_sentiment_manager import NewsSentimentManager
+from .sentiment_cache import SentimentCache
+from .keyword_tagger import KeywordTagger
+from .news_store import NewsStore
+from .key_phrases import RakeExtractor
+from .sentiment_index import SentimentIndex
+from .news_pipeline import NewsPipeline
+from .news_ingestion import IncrementalNewsIngestor, IngestionState, simhash
 
-__all__ = ['NewsAPIClient', 'SentimentAnalyzer', 'NewsSentimentManager']
\ No newline at end of file
+__all__ = ['NewsAPIClient', 'SentimentAnalyzer', 'NewsSentimentManager', 'SentimentCache', 'KeywordTagger',
+           'NewsStore', 'RakeExtractor', 'SentimentIndex', 'NewsPipeline', 'IncrementalNewsIngestor',
+           'IngestionState', 'simhash']
\ No newline at end of file
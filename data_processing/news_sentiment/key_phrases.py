@@ -0,0 +1,140 @@
+import re
+import threading
+from collections import OrderedDict
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how i if in into is it its itself just
+me more most my myself no nor not now of off on once only or other our ours ourselves out over own
+said same says she should so some such than that the their theirs them themselves then there these
+they this those through to too under until up very via was we were what when where which while who
+whom why will with would you your yours yourself yourselves new may might amid per since week
+today yesterday according
+""".split())
+
+# Punctuation that ends a candidate phrase
+_CHUNK_RE = re.compile(r"[.,;:!?()\[\]{}\"“”|\n]|\s[-–—]\s")
+_WORD_RE = re.compile(r"\w+(?:['&/.-]\w+)*")
+
+class RakeExtractor:
+    """
+    Key-phrase extraction with RAKE (Rapid Automatic Keyword Extraction)
+
+    Candidate phrases are runs of words between stop words and punctuation.
+    Each word scores degree / frequency over the candidates of a text, and a
+    phrase scores the sum of its words. Phrases of every article are scored
+    once and cached, so summarizing an asset only adds up cached scores
+    instead of tagging the concatenated text again.
+    """
+    def __init__(self, max_words=3, stop_words=STOP_WORDS, max_cached_articles=20000):
+        """
+        Initialize the extractor
+
+        Args:
+            max_words (int): Longest phrase, in words
+            stop_words (iterable): Words that split phrases
+            max_cached_articles (int): Articles whose phrases are kept in the LRU
+        """
+        self.max_words = max_words
+        self.stop_words = frozenset(word.lower() for word in stop_words)
+        self.max_cached_articles = max_cached_articles
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _candidates(self, text):
+        for chunk in _CHUNK_RE.split(text):
+            phrase = []
+            for word in _WORD_RE.findall(chunk):
+                if word.lower() in self.stop_words or word.isdigit():
+                    if phrase:
+                        yield phrase
+                    phrase = []
+                else:
+                    phrase.append(word)
+            if phrase:
+                yield phrase
+
+    def score_text(self, text):
+        """
+        Score the candidate phrases of a text
+
+        Args:
+            text (str): Input text
+
+        Returns:
+            dict: Lowercased phrases mapped to (score, surface form)
+        """
+        # Runs longer than max_words are cut into consecutive pieces
+        phrases = [
+            candidate[i:i + self.max_words]
+            for candidate in self._candidates(text or '')
+            for i in range(0, len(candidate), self.max_words)
+        ]
+        frequency = {}
+        degree = {}
+        for phrase in phrases:
+            for word in phrase:
+                key = word.lower()
+                frequency[key] = frequency.get(key, 0) + 1
+                degree[key] = degree.get(key, 0) + len(phrase)
+
+        scores = {}
+        for phrase in phrases:
+            key = ' '.join(word.lower() for word in phrase)
+            if key not in scores:
+                score = sum(degree[w.lower()] / frequency[w.lower()] for w in phrase)
+                scores[key] = (score, ' '.join(phrase))
+        return scores
+
+    def extract(self, text, max_phrases=5):
+        """
+        Top phrases of a single text
+
+        Args:
+            text (str): Input text
+            max_phrases (int): Maximum number of phrases to return
+
+        Returns:
+            list: Phrases, highest score first
+        """
+        scores = self.score_text(text)
+        ranked = sorted(scores.values(), key=lambda item: item[0], reverse=True)
+        return [surface for _, surface in ranked[:max_phrases]]
+
+    def article_phrases(self, article):
+        """Cached phrase scores of an article's title and description"""
+        text = f"{article.get('title') or ''}. {article.get('description') or ''}"
+        with self._lock:
+            scores = self._cache.get(text)
+            if scores is not None:
+                self._cache.move_to_end(text)
+                return scores
+        scores = self.score_text(text)
+        with self._lock:
+            self._cache[text] = scores
+            while len(self._cache) > self.max_cached_articles:
+                self._cache.popitem(last=False)
+        return scores
+
+    def extract_from_articles(self, articles, max_phrases=10):
+        """
+        Top phrases across a list of articles
+
+        A phrase's score is summed over the articles that mention it, so
+        topics repeated across sources rank first.
+
+        Args:
+            articles (list): News article dictionaries
+            max_phrases (int): Maximum number of phrases to return
+
+        Returns:
+            list: Phrases, highest score first
+        """
+        totals = {}
+        for article in articles:
+            for key, (score, surface) in self.article_phrases(article).items():
+                total = totals.get(key)
+                totals[key] = (score + total[0], total[1]) if total else (score, surface)
+        ranked = sorted(totals.values(), key=lambda item: item[0], reverse=True)
+        return [surface for _, surface in ranked[:max_phrases]]
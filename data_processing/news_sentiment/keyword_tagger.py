@@ -0,0 +1,159 @@
+from collections import deque
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+def _fold_case(text):
+    """Lowercase text without changing its length, so positions stay valid"""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    # A few characters (e.g. 'İ') lowercase to two code points; keep those as-is
+    return ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+class KeywordTagger:
+    """
+    Tags text with every asset whose keywords it mentions
+
+    All assets' keywords are compiled once into an Aho-Corasick automaton,
+    so each text is scanned in a single pass regardless of how many
+    instruments and keywords are tracked.
+    """
+    def __init__(self, keywords_by_asset, word_boundaries=True, case_sensitive=False):
+        """
+        Compile the keyword automaton
+
+        Args:
+            keywords_by_asset (dict): Asset names mapped to lists of keywords
+            word_boundaries (bool): Only match keywords that start and end at
+                word boundaries ('WTI' matches 'WTI crude' but not 'WTIX')
+            case_sensitive (bool): Match case exactly instead of folding case
+        """
+        self.word_boundaries = word_boundaries
+        self.case_sensitive = case_sensitive
+
+        # Distinct normalized patterns and the (asset, keyword) pairs behind them
+        self.patterns = []
+        self.pattern_owners = []
+        pattern_ids = {}
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for asset, keywords in keywords_by_asset.items():
+            for keyword in keywords:
+                pattern = keyword if case_sensitive else _fold_case(keyword)
+                if not pattern:
+                    continue
+                if pattern not in pattern_ids:
+                    pattern_ids[pattern] = len(self.patterns)
+                    self.patterns.append(pattern)
+                    self.pattern_owners.append([])
+                    self._add_pattern(pattern, pattern_ids[pattern])
+                self.pattern_owners[pattern_ids[pattern]].append((asset, keyword))
+
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern, pattern_id):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(pattern_id)
+
+    def _build_failure_links(self):
+        """Breadth-first pass linking each state to its longest proper suffix state"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # Inherit the matches that end at the suffix state
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text):
+        """
+        Scan text once and yield every keyword occurrence
+
+        Args:
+            text (str): Text to scan
+
+        Yields:
+            tuple: (pattern_id, start, end) with end exclusive
+        """
+        if not text:
+            return
+        scanned = text if self.case_sensitive else _fold_case(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        length = len(scanned)
+        state = 0
+
+        for i, char in enumerate(scanned):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in output[state]:
+                start = i - len(self.patterns[pattern_id]) + 1
+                end = i + 1
+                if self.word_boundaries and (
+                    (start > 0 and _is_word_char(scanned[start - 1])) or
+                    (end < length and _is_word_char(scanned[end]))
+                ):
+                    continue
+                yield pattern_id, start, end
+
+    def tag(self, text):
+        """
+        Find every asset mentioned in a text
+
+        Args:
+            text (str): Text to scan
+
+        Returns:
+            dict: Asset names mapped to {'count': hits, 'positions':
+                [(start, end, keyword), ...]} for each matching asset
+        """
+        tags = {}
+        for pattern_id, start, end in self.iter_matches(text):
+            for asset, keyword in self.pattern_owners[pattern_id]:
+                asset_tags = tags.setdefault(asset, {'count': 0, 'positions': []})
+                asset_tags['count'] += 1
+                asset_tags['positions'].append((start, end, keyword))
+        return tags
+
+    def tag_article(self, article):
+        """
+        Tag a news article by its title and description
+
+        Positions refer to the text ``f"{title}\\n{description}"``.
+
+        Args:
+            article (dict): News article dictionary
+
+        Returns:
+            dict: Asset tags as returned by tag()
+        """
+        return self.tag(f"{article.get('title') or ''}\n{article.get('description') or ''}")
+
+    def tag_articles(self, articles):
+        """
+        Tag many articles
+
+        Args:
+            articles (iterable): News article dictionaries
+
+        Returns:
+            list: Asset tags for each article, in input order
+        """
+        return [self.tag_article(article) for article in articles]
@@ -1,21 +1,69 @@
+import asyncio
+import threading
 import requests
 import os
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from .news_feed import GeneralNewsFeed, FeedSnapshot
+from .keyword_tagger import KeywordTagger
+
+def published_timestamp(article):
+    """
+    Publication time of an article as unix seconds
+    
+    NewsAPI articles carry ISO 8601 strings and Finnhub items unix seconds.
+    
+    Args:
+        article (dict): News article dictionary
+        
+    Returns:
+        float: Unix timestamp, or 0 when the article has no valid date
+    """
+    published = article.get('publishedAt')
+    if isinstance(published, (int, float)):
+        return float(published)
+    if not published:
+        return 0.0
+    try:
+        parsed = datetime.fromisoformat(str(published).replace('Z', '+00:00'))
+    except ValueError:
+        return 0.0
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
 
 class NewsAPIClient:
     """
     A client for fetching financial news from various news APIs
     """
-    def __init__(self, api_provider='newsapi', api_key=None):
+    # NewsAPI rejects `q` values longer than this
+    MAX_QUERY_LENGTH = 500
+    
+    def __init__(self, api_provider='newsapi', api_key=None, fold_keywords=False, max_concurrency=8,
+                 feed_poll_interval=60, asset_keywords=None):
         """
         Initialize the news API client
         
         Args:
             api_provider (str): The news API provider ('newsapi', 'finnhub')
             api_key (str): API key for the provider
+            fold_keywords (bool): Combine an asset's keywords into as few
+                requests as the provider allows instead of one per keyword
+            max_concurrency (int): Maximum provider requests in flight at once
+            feed_poll_interval (float): Seconds a downloaded Finnhub general
+                news feed is reused before it is fetched again
+            asset_keywords (dict): Asset names mapped to search keywords,
+                replacing the built-in keyword lists
         """
         self.api_provider = api_provider.lower()
         self.api_key = api_key
+        self.fold_keywords = fold_keywords
+        self.max_concurrency = max_concurrency
+        
+        # Shared connection pool and worker threads for concurrent requests
+        self.session = requests.Session()
+        self._executor = None
+        self._executor_lock = threading.Lock()
         
         # Base URLs for news APIs
         self.base_urls = {
@@ -32,80 +80,158 @@ class NewsAPIClient:
             'Crude Oil WTI': ['crude oil', 'WTI', 'oil prices', 'OPEC', 'oil market'],
             'Crude Oil Brent': ['Brent crude', 'Brent oil', 'oil prices', 'OPEC', 'oil market']
         }
+        if asset_keywords is not None:
+            self.asset_keywords = asset_keywords
+        self._tagger = None
+        
+        # Finnhub has no keyword search: its general feed is downloaded once
+        # per polling interval and every asset is matched against it
+        self.general_feed = None
+        if self.api_provider == 'finnhub':
+            self.general_feed = GeneralNewsFeed(
+                f"{self.base_urls['finnhub']}/news",
+                {'category': 'general', 'token': self.api_key},
+                poll_interval=feed_poll_interval,
+                session=self.session
+            )
 
-    def get_news_for_asset(self, asset, days_back=3, max_articles=10):
+    def _get_keywords(self, asset):
+        """Return the search keywords of an asset"""
+        if self.api_provider not in self.base_urls:
+            raise ValueError(f"Unsupported API provider: {self.api_provider}")
+            
+        keywords = self.asset_keywords.get(asset)
+        if not keywords:
+            raise ValueError(f"No keywords defined for asset: {asset}")
+        return keywords
+    
+    def _build_requests(self, asset, days_back=3, since=None, until=None):
         """
-        Fetch news articles related to a specific asset
+        Build the NewsAPI requests needed to fetch news for an asset
         
         Args:
             asset (str): The asset name from our standard list
             days_back (int): Number of days to look back for news
-            max_articles (int): Maximum number of articles to fetch
+            since (float): Only request articles published after this unix
+                time (overrides days_back)
+            until (float): Only request articles published up to this unix time
             
         Returns:
-            list: List of news articles
+            list: List of (keywords, url, params) tuples, where keywords is
+                the tuple of keywords a request covers
         """
-        if self.api_provider not in self.base_urls:
-            raise ValueError(f"Unsupported API provider: {self.api_provider}")
+        keywords = self._get_keywords(asset)
+        if since:
+            from_date = datetime.fromtimestamp(since, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+        else:
+            from_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
+        
+        news_requests = []
+        
+        # For each keyword (or folded group of keywords), get articles and merge them
+        groups = self._fold_queries(keywords) if self.fold_keywords else [(k,) for k in keywords]
+        for group in groups:
+            url = f"{self.base_urls['newsapi']}/everything"
+            params = {
+                'q': self._format_query(group) if self.fold_keywords else group[0],
+                'from': from_date,
+                'sortBy': 'publishedAt',
+                'language': 'en',
+                'apiKey': self.api_key
+            }
+            if until:
+                params['to'] = datetime.fromtimestamp(until, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+            news_requests.append((group, url, params))
+                
+        return news_requests
+    
+    @staticmethod
+    def _format_query(keywords):
+        """Join keywords into one NewsAPI OR-query, quoting multi-word phrases"""
+        terms = [f'"{keyword}"' if not keyword.isalnum() else keyword for keyword in keywords]
+        return ' OR '.join(terms)
+    
+    def _fold_queries(self, keywords):
+        """
+        Pack keywords into as few OR-queries as fit the provider's query length
+        
+        Args:
+            keywords (list): Keywords of one asset
             
-        keywords = self.asset_keywords.get(asset)
-        if not keywords:
-            raise ValueError(f"No keywords defined for asset: {asset}")
+        Returns:
+            list: Tuples of keywords, one per request
+        """
+        groups = []
+        current = []
+        for keyword in keywords:
+            if current and len(self._format_query(current + [keyword])) > self.MAX_QUERY_LENGTH:
+                groups.append(tuple(current))
+                current = []
+            current.append(keyword)
+        if current:
+            groups.append(tuple(current))
+        return groups
+    
+    def _parse_response(self, data):
+        """
+        Extract articles from a decoded NewsAPI response
+        
+        Args:
+            data (dict): Decoded JSON response body
             
-        from_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
-        
-        articles = []
-        
-        if self.api_provider == 'newsapi':
-            # For each keyword, get articles and merge them
-            for keyword in keywords:
-                url = f"{self.base_urls['newsapi']}/everything"
-                params = {
-                    'q': keyword,
-                    'from': from_date,
-                    'sortBy': 'publishedAt',
-                    'language': 'en',
-                    'apiKey': self.api_key
-                }
-                
-                try:
-                    response = requests.get(url, params=params)
-                    if response.status_code == 200:
-                        data = response.json()
-                        if data.get('status') == 'ok':
-                            articles.extend(data.get('articles', []))
-                    else:
-                        print(f"Error fetching news from NewsAPI: {response.status_code}")
-                except Exception as e:
-                    print(f"Exception when fetching news: {e}")
-                    
-        elif self.api_provider == 'finnhub':
-            # Use Finnhub's news endpoint
-            for keyword in keywords:
-                url = f"{self.base_urls['finnhub']}/news"
-                params = {
-                    'category': 'general',
-                    'token': self.api_key
-                }
-                
-                try:
-                    response = requests.get(url, params=params)
-                    if response.status_code == 200:
-                        data = response.json()
-                        # Filter articles containing our keyword
-                        for article in data:
-                            if keyword.lower() in article.get('headline', '').lower() or \
-                               keyword.lower() in article.get('summary', '').lower():
-                                articles.append({
-                                    'title': article.get('headline'),
-                                    'description': article.get('summary'),
-                                    'url': article.get('url'),
-                                    'publishedAt': article.get('datetime'),
-                                    'source': {'name': article.get('source')}
-                                })
-                except Exception as e:
-                    print(f"Exception when fetching news: {e}")
+        Returns:
+            list: Articles in the NewsAPI article format
+        """
+        if data.get('status') == 'ok':
+            return data.get('articles', [])
+        return []
+    
+    @property
+    def tagger(self):
+        """Keyword tagger compiled from asset_keywords on first use"""
+        if self._tagger is None:
+            self._tagger = KeywordTagger(self.asset_keywords)
+        return self._tagger
+    
+    def _match_feed(self, snapshot, assets, max_articles, since=None, until=None):
+        """Fan a general feed snapshot out to the requested assets"""
+        for asset in assets:
+            self._get_keywords(asset)
+        matches = snapshot.articles_for_assets(self.tagger, assets)
+        if since:
+            matches = {
+                asset: [a for a in articles if published_timestamp(a) > since]
+                for asset, articles in matches.items()
+            }
+        if until:
+            matches = {
+                asset: [a for a in articles if published_timestamp(a) <= until]
+                for asset, articles in matches.items()
+            }
+        return {
+            asset: self._finalize_articles(asset, matches[asset], max_articles)
+            for asset in assets
+        }
+    
+    def _feed_snapshot(self):
+        try:
+            return self.general_feed.get_snapshot()
+        except Exception as e:
+            print(f"Exception when fetching news: {e}")
+            return FeedSnapshot([], 0)
+    
+    def _finalize_articles(self, asset, articles, max_articles):
+        """
+        Deduplicate, tag and sort the merged articles of an asset
         
+        Args:
+            asset (str): The asset name from our standard list
+            articles (list): Articles merged from all keyword requests
+            max_articles (int): Maximum number of articles to return
+            
+        Returns:
+            list: The most recent unique articles
+        """
         # Deduplicate articles based on title
         unique_articles = []
         titles = set()
@@ -123,3 +249,138 @@ class NewsAPIClient:
                                  reverse=True)
         
         return sorted_articles[:max_articles]
+
+    def get_news_for_asset(self, asset, days_back=3, max_articles=10):
+        """
+        Fetch news articles related to a specific asset
+        
+        Args:
+            asset (str): The asset name from our standard list
+            days_back (int): Number of days to look back for news
+            max_articles (int): Maximum number of articles to fetch
+            
+        Returns:
+            list: List of news articles
+        """
+        if self.general_feed is not None:
+            return self.get_news_for_assets([asset], days_back, max_articles)[asset]
+        
+        news_requests = self._build_requests(asset, days_back)
+        articles = [
+            article for batch in self._fetch_all(news_requests) for article in batch
+        ]
+        return self._finalize_articles(asset, articles, max_articles)
+    
+    def get_news_for_assets(self, assets, days_back=3, max_articles=10, since=None, until=None):
+        """
+        Fetch news for several assets in one concurrent batch
+        
+        Args:
+            assets (list): Asset names from our standard list
+            days_back (int): Number of days to look back for news
+            max_articles (int): Maximum number of articles per asset
+            since (dict): Optional asset names mapped to a unix time; only
+                articles published after it are returned for that asset
+            until (dict): Optional asset names mapped to a unix time; only
+                articles published up to it are returned for that asset
+            
+        Returns:
+            dict: Asset names mapped to their lists of news articles
+        """
+        since = since or {}
+        until = until or {}
+        if self.general_feed is not None:
+            snapshot = self._feed_snapshot()
+            news = {}
+            for asset in assets:
+                news.update(self._match_feed(snapshot, [asset], max_articles, since.get(asset), until.get(asset)))
+            return news
+        
+        requests_by_asset = [
+            (asset, self._build_requests(asset, days_back, since.get(asset), until.get(asset)))
+            for asset in assets
+        ]
+        results = iter(self._fetch_all([
+            news_request for _, news_requests in requests_by_asset for news_request in news_requests
+        ]))
+        
+        news = {}
+        for asset, news_requests in requests_by_asset:
+            articles = [article for _ in news_requests for article in next(results)]
+            news[asset] = self._finalize_articles(asset, articles, max_articles)
+        return news
+    
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix='news-fetch'
+                )
+            return self._executor
+    
+    def _fetch(self, keywords, url, params):
+        """Run one provider request and parse its articles"""
+        try:
+            response = self.session.get(url, params=params)
+            if response.status_code == 200:
+                return self._parse_response(response.json())
+            print(f"Error fetching news from {self.api_provider}: {response.status_code}")
+        except Exception as e:
+            print(f"Exception when fetching news: {e}")
+        return []
+    
+    def _fetch_all(self, news_requests):
+        """
+        Run provider requests concurrently
+        
+        Args:
+            news_requests (list): (keywords, url, params) tuples
+            
+        Returns:
+            list: Parsed articles of each request, in request order
+        """
+        if len(news_requests) <= 1:
+            return [self._fetch(*news_request) for news_request in news_requests]
+        return list(self._get_executor().map(lambda news_request: self._fetch(*news_request), news_requests))
+    
+    async def get_news_for_asset_async(self, session, asset, days_back=3, max_articles=10):
+        """
+        Fetch news articles for an asset without blocking the event loop
+        
+        All keyword requests are issued concurrently on the shared session.
+        
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            asset (str): The asset name from our standard list
+            days_back (int): Number of days to look back for news
+            max_articles (int): Maximum number of articles to fetch
+            
+        Returns:
+            list: List of news articles
+        """
+        if self.general_feed is not None:
+            try:
+                snapshot = await self.general_feed.get_snapshot_async(session)
+            except Exception as e:
+                print(f"Exception when fetching news: {e}")
+                snapshot = FeedSnapshot([], 0)
+            return self._match_feed(snapshot, [asset], max_articles)[asset]
+        
+        async def fetch(keywords, url, params):
+            try:
+                async with session.get(url, params=params) as response:
+                    if response.status == 200:
+                        return self._parse_response(await response.json(content_type=None))
+                    print(f"Error fetching news from {self.api_provider}: {response.status}")
+            except Exception as e:
+                print(f"Exception when fetching news: {e}")
+            return []
+        
+        results = await asyncio.gather(*[
+            fetch(keywords, url, params)
+            for keywords, url, params in self._build_requests(asset, days_back)
+        ])
+        
+        # Merge in keyword order so deduplication matches the blocking client
+        articles = [article for batch in results for article in batch]
+        return self._finalize_articles(asset, articles, max_articles)
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+
+def normalize_finnhub_article(article):
+    """Convert a Finnhub news item to the NewsAPI article format"""
+    return {
+        'title': article.get('headline'),
+        'description': article.get('summary'),
+        'url': article.get('url'),
+        'publishedAt': article.get('datetime'),
+        'source': {'name': article.get('source')}
+    }
+
+class FeedSnapshot:
+    """
+    One download of a general news feed, tagged for asset matching
+    """
+    def __init__(self, articles, fetched_at):
+        """
+        Initialize the snapshot
+
+        Args:
+            articles (list): Articles in the NewsAPI article format
+            fetched_at (float): time.monotonic() of the download
+        """
+        self.articles = articles
+        self.fetched_at = fetched_at
+        self._tagged = None
+        self._lock = threading.Lock()
+
+    def tags(self, tagger):
+        """
+        Asset tags of every article, computed once per snapshot and tagger
+
+        Args:
+            tagger (KeywordTagger): Compiled keyword tagger
+
+        Returns:
+            list: Tags for each article, as returned by KeywordTagger.tag()
+        """
+        with self._lock:
+            if self._tagged is None or self._tagged[0] is not tagger:
+                self._tagged = (tagger, tagger.tag_articles(self.articles))
+            return self._tagged[1]
+
+    def articles_for_assets(self, tagger, assets):
+        """
+        Fan the snapshot out to every requested asset an article mentions
+
+        Args:
+            tagger (KeywordTagger): Compiled keyword tagger
+            assets (list): Asset names to collect articles for
+
+        Returns:
+            dict: Asset names mapped to copies of their matching articles
+        """
+        matches = {asset: [] for asset in assets}
+        for article, article_tags in zip(self.articles, self.tags(tagger)):
+            for asset in article_tags:
+                if asset in matches:
+                    # Copies, since callers tag and score articles per asset
+                    matches[asset].append(dict(article))
+        return matches
+
+class GeneralNewsFeed:
+    """
+    General news feed downloaded at most once per polling interval
+
+    Every asset is matched against the same shared snapshot, so N assets
+    with K keywords each cost one download per interval instead of N x K.
+    """
+    def __init__(self, url, params, poll_interval=60, normalize=normalize_finnhub_article, session=None):
+        """
+        Initialize the feed
+
+        Args:
+            url (str): Feed endpoint
+            params (dict): Query parameters of the feed request
+            poll_interval (float): Seconds a snapshot stays fresh
+            normalize (callable): Converts a provider item to the NewsAPI article format
+            session (requests.Session): Session for blocking downloads
+        """
+        self.url = url
+        self.params = params
+        self.poll_interval = poll_interval
+        self.normalize = normalize
+        self.session = session
+
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._async_lock = None
+
+    def _is_fresh(self):
+        return self._snapshot is not None and \
+            time.monotonic() - self._snapshot.fetched_at < self.poll_interval
+
+    def _install(self, items):
+        self._snapshot = FeedSnapshot([self.normalize(item) for item in items], time.monotonic())
+        return self._snapshot
+
+    def get_snapshot(self):
+        """
+        Return the current snapshot, downloading a new one if it is stale
+
+        Returns:
+            FeedSnapshot: The shared snapshot
+        """
+        if self._is_fresh():
+            return self._snapshot
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            if self._is_fresh():
+                return self._snapshot
+            response = self.session.get(self.url, params=self.params)
+            if response.status_code != 200:
+                print(f"Error fetching news feed: {response.status_code}")
+                return self._snapshot or FeedSnapshot([], time.monotonic())
+            return self._install(response.json())
+
+    async def get_snapshot_async(self, session):
+        """
+        Return the current snapshot without blocking the event loop
+
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+
+        Returns:
+            FeedSnapshot: The shared snapshot
+        """
+        if self._is_fresh():
+            return self._snapshot
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            if self._is_fresh():
+                return self._snapshot
+            async with session.get(self.url, params=self.params) as response:
+                if response.status != 200:
+                    print(f"Error fetching news feed: {response.status}")
+                    return self._snapshot or FeedSnapshot([], time.monotonic())
+                items = await response.json(content_type=None)
+            with self._lock:
+                return self._install(items)
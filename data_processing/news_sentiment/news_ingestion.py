@@ -0,0 +1,321 @@
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+import time
+import numpy as np
+from .news_api_client import published_timestamp
+
+_TOKEN_RE = re.compile(r'\w+')
+
+def _signed(value):
+    """Map an unsigned 64-bit value onto SQLite's signed INTEGER range"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def simhash(text, bits=64):
+    """
+    SimHash fingerprint of a text
+
+    Word unigrams and bigrams are hashed and summed bit by bit, so texts that
+    share most of their wording end up a few bits apart.
+
+    Args:
+        text (str): Text to fingerprint
+        bits (int): Fingerprint width (at most 64)
+
+    Returns:
+        int: Unsigned fingerprint
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+
+    values = np.array([
+        int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for feature in features
+    ], dtype='<u8')
+    # Bit i of every hash in column i, then a majority vote per column
+    feature_bits = np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    votes = feature_bits[:, :bits].sum(axis=0) * 2 > len(features)
+    return int.from_bytes(np.packbits(votes, bitorder='little').tobytes(), 'little')
+
+def _article_text(article):
+    return f"{article.get('title') or ''}\n{article.get('description') or ''}"
+
+def _exact_key(article):
+    """Hash of the article URL, or of its normalized title when it has none"""
+    identity = article.get('url') or ' '.join(_TOKEN_RE.findall((article.get('title') or '').lower()))
+    return hashlib.blake2b(identity.encode('utf-8'), digest_size=16).hexdigest()
+
+class IngestionState:
+    """
+    Persistent cursors and duplicate fingerprints for incremental ingestion
+
+    Stored in a local SQLite file. Each (provider, asset) pair keeps the
+    publication time of the newest article seen, and every accepted article
+    leaves an exact hash (URL or title) and a 64-bit SimHash. SimHashes are
+    split into four 16-bit bands; two fingerprints within 3 bits of each other
+    must agree on at least one band, so near-duplicate lookups only compare
+    against the rows sharing a band instead of the whole history.
+    """
+    BANDS = 4
+    BAND_BITS = 16
+
+    def __init__(self, path=None):
+        """
+        Initialize the ingestion state
+
+        Args:
+            path (str): SQLite file (memory only when None)
+        """
+        self.path = path
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path or ':memory:', timeout=10, check_same_thread=False)
+        if path:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS cursors ('
+            'provider TEXT NOT NULL, asset TEXT NOT NULL, published REAL NOT NULL, '
+            'PRIMARY KEY (provider, asset))'
+        )
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS seen ('
+            'asset TEXT NOT NULL, key TEXT NOT NULL, published REAL NOT NULL, '
+            'PRIMARY KEY (asset, key))'
+        )
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS fingerprints ('
+            'asset TEXT NOT NULL, fingerprint INTEGER NOT NULL, published REAL NOT NULL, '
+            'band0 INTEGER NOT NULL, band1 INTEGER NOT NULL, band2 INTEGER NOT NULL, band3 INTEGER NOT NULL)'
+        )
+        for band in range(self.BANDS):
+            self.conn.execute(
+                f'CREATE INDEX IF NOT EXISTS idx_fingerprints_band{band} ON fingerprints(asset, band{band})'
+            )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_seen_published ON seen(published)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_fingerprints_published ON fingerprints(published)')
+        self.conn.commit()
+
+    def _bands(self, fingerprint):
+        mask = (1 << self.BAND_BITS) - 1
+        return [fingerprint >> (band * self.BAND_BITS) & mask for band in range(self.BANDS)]
+
+    def get_cursor(self, provider, asset):
+        """
+        Publication time of the newest article ingested for an asset
+
+        Returns:
+            float: Unix timestamp, or None before the first ingestion
+        """
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT published FROM cursors WHERE provider = ? AND asset = ?', (provider, asset)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_cursor(self, provider, asset, published):
+        """Advance the cursor of an asset (it never moves backwards)"""
+        with self.lock:
+            self.conn.execute(
+                'INSERT INTO cursors (provider, asset, published) VALUES (?, ?, ?) '
+                'ON CONFLICT(provider, asset) DO UPDATE SET published = MAX(published, excluded.published)',
+                (provider, asset, published)
+            )
+            self.conn.commit()
+
+    def is_seen(self, asset, key):
+        with self.lock:
+            return self.conn.execute(
+                'SELECT 1 FROM seen WHERE asset = ? AND key = ?', (asset, key)
+            ).fetchone() is not None
+
+    def find_near_duplicate(self, asset, fingerprint, max_distance=3):
+        """
+        Check for a stored fingerprint within max_distance bits
+
+        Args:
+            asset (str): Asset the article was fetched for
+            fingerprint (int): SimHash of the article
+            max_distance (int): Largest Hamming distance counted as a duplicate
+                (at most BANDS - 1 for the band lookup to be exhaustive)
+
+        Returns:
+            bool: True if a near duplicate was found
+        """
+        # One indexed lookup per band; an OR across the band columns would scan
+        query = ' UNION ALL '.join(
+            f'SELECT fingerprint FROM fingerprints WHERE asset = ? AND band{band} = ?'
+            for band in range(self.BANDS)
+        )
+        params = [value for band in self._bands(fingerprint) for value in (asset, band)]
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return any(
+            bin((stored & ((1 << 64) - 1)) ^ fingerprint).count('1') <= max_distance
+            for stored, in rows
+        )
+
+    def add(self, asset, key, fingerprint, published):
+        """Record an accepted article"""
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR IGNORE INTO seen (asset, key, published) VALUES (?, ?, ?)',
+                (asset, key, published)
+            )
+            self.conn.execute(
+                'INSERT INTO fingerprints (asset, fingerprint, published, band0, band1, band2, band3) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [asset, _signed(fingerprint), published] + self._bands(fingerprint)
+            )
+
+    def commit(self):
+        with self.lock:
+            self.conn.commit()
+
+    def prune(self, max_age_days=30):
+        """
+        Forget hashes of articles published more than max_age_days ago
+
+        Cursors are kept, so pruned articles are still skipped as stale.
+        """
+        cutoff = time.time() - max_age_days * 86400
+        with self.lock:
+            self.conn.execute('DELETE FROM seen WHERE published < ?', (cutoff,))
+            self.conn.execute('DELETE FROM fingerprints WHERE published < ?', (cutoff,))
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.commit()
+                self.conn.close()
+                self.conn = None
+
+class IncrementalNewsIngestor:
+    """
+    Fetches only news published since the last run and drops duplicates
+
+    Each poll asks the provider for articles newer than the asset's cursor,
+    then filters out articles already ingested (same URL or title) and near
+    duplicates (syndicated copies of a story with light rewording) before
+    anything is scored.
+    """
+    def __init__(self, news_api_client, sentiment_analyzer=None, state_path=None, max_distance=3):
+        """
+        Initialize the ingestor
+
+        Args:
+            news_api_client (NewsAPIClient): Client used to fetch news
+            sentiment_analyzer (SentimentAnalyzer): Scores new articles when given
+            state_path (str): SQLite file for cursors and fingerprints
+                (memory only when None)
+            max_distance (int): Largest SimHash Hamming distance treated as
+                a near duplicate
+        """
+        self.news_api_client = news_api_client
+        self.sentiment_analyzer = sentiment_analyzer
+        self.state = IngestionState(state_path)
+        self.max_distance = max_distance
+        self.stats = {'fetched': 0, 'new': 0, 'stale': 0, 'exact_duplicates': 0, 'near_duplicates': 0}
+
+    def ingest(self, assets, days_back=3, max_articles_per_asset=100):
+        """
+        Fetch and deduplicate new articles for a list of assets
+
+        Args:
+            assets (list): Asset names from our standard list
+            days_back (int): Look-back window for assets without a cursor
+            max_articles_per_asset (int): Maximum articles fetched per request;
+                assets with a cursor page back until it is reached
+
+        Returns:
+            dict: Asset names mapped to their new (and, with an analyzer,
+                scored) articles
+        """
+        provider = self.news_api_client.api_provider
+        cursors = {asset: self.state.get_cursor(provider, asset) for asset in assets}
+        since = {asset: cursor for asset, cursor in cursors.items() if cursor is not None}
+        news = self.news_api_client.get_news_for_assets(
+            assets, days_back=days_back, max_articles=max_articles_per_asset, since=since
+        )
+        news = self._page_back(news, since, days_back, max_articles_per_asset)
+
+        new_articles = {}
+        for asset in assets:
+            cursor = cursors[asset]
+            accepted = []
+            newest = cursor
+            for article in news.get(asset, []):
+                self.stats['fetched'] += 1
+                published = published_timestamp(article)
+                if cursor is not None and published and published < cursor:
+                    self.stats['stale'] += 1
+                    continue
+                key = _exact_key(article)
+                if self.state.is_seen(asset, key):
+                    self.stats['exact_duplicates'] += 1
+                    continue
+                fingerprint = simhash(_article_text(article))
+                if self.state.find_near_duplicate(asset, fingerprint, self.max_distance):
+                    self.stats['near_duplicates'] += 1
+                    continue
+
+                self.state.add(asset, key, fingerprint, published or time.time())
+                accepted.append(article)
+                if published and (newest is None or published > newest):
+                    newest = published
+
+            self.state.commit()
+            if newest is not None:
+                self.state.set_cursor(provider, asset, newest)
+            self.stats['new'] += len(accepted)
+            new_articles[asset] = accepted
+
+        if self.sentiment_analyzer is not None:
+            # Scores are added to the article dicts in place
+            self.sentiment_analyzer.analyze_articles(
+                [article for articles in new_articles.values() for article in articles]
+            )
+        return new_articles
+
+    def _page_back(self, news, since, days_back, max_articles):
+        """
+        Request older pages of capped assets until their cursor is reached
+
+        A provider returns the newest max_articles articles, so a full page
+        may stop short of the cursor. Moving the cursor to the newest of them
+        would skip the articles in between; instead the next page is requested
+        up to the oldest article of the previous one, until a page comes back
+        short or stops moving back in time. Articles on a page boundary come
+        back twice and are dropped as exact duplicates.
+        """
+        news = {asset: list(articles) for asset, articles in news.items()}
+        pages = {asset: news.get(asset, []) for asset in since}
+        bounds = {}
+        while True:
+            until = {}
+            for asset, page in pages.items():
+                if len(page) < max_articles:
+                    continue
+                oldest = min((published_timestamp(article) for article in page), default=0)
+                if since[asset] < oldest < bounds.get(asset, float('inf')):
+                    until[asset] = oldest
+            if not until:
+                return news
+            pages = self.news_api_client.get_news_for_assets(
+                list(until), days_back=days_back, max_articles=max_articles,
+                since={asset: since[asset] for asset in until}, until=until
+            )
+            for asset, page in pages.items():
+                news.setdefault(asset, []).extend(page)
+            bounds = until
+
+    def close(self):
+        self.state.close()
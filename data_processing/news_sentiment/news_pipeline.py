@@ -0,0 +1,249 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .news_api_client import published_timestamp
+from .news_ingestion import _article_text, _exact_key, simhash
+
+# Marks the end of a stage's output
+_DONE = object()
+
+class _StageError:
+    def __init__(self, error):
+        self.error = error
+
+class NewsPipeline:
+    """
+    Streaming news pipeline: fetch -> dedupe -> tag -> score -> persist -> aggregate
+
+    Every stage runs on its own thread and hands batches of one asset's
+    articles to the next through a bounded queue, so a slow stage applies
+    back-pressure instead of letting batches pile up in memory. Results are
+    yielded per batch as soon as they are scored, so the first asset's
+    sentiment is available while other assets are still being fetched.
+    """
+    def __init__(self, manager, tagger=None, dedupe_state=None, max_distance=3,
+                 buffer_size=4, batch_size=50, fetch_workers=8):
+        """
+        Initialize the pipeline
+
+        Args:
+            manager (NewsSentimentManager): Provides the news client, sentiment
+                analyzer, news store and sentiment index
+            tagger (KeywordTagger): Tags articles with every asset they mention
+                (the news client's tagger when None)
+            dedupe_state (IngestionState): Persistent duplicate fingerprints;
+                only duplicates within the stream are dropped when None
+            max_distance (int): SimHash distance treated as a near duplicate
+            buffer_size (int): Batches buffered between two stages
+            batch_size (int): Articles per batch
+            fetch_workers (int): Assets fetched concurrently (at most buffer_size)
+        """
+        self.manager = manager
+        self.tagger = tagger
+        self.dedupe_state = dedupe_state
+        self.max_distance = max_distance
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.fetch_workers = fetch_workers
+
+    # Stages: each takes one batch dict and yields zero or more batch dicts
+
+    def _fetch(self, assets, days_back, max_articles, stop):
+        """
+        Fetch assets concurrently and yield their articles in completion order
+
+        At most buffer_size fetches (running or finished but not yet
+        consumed) are in flight; the next asset is submitted only when one
+        has been handed on, so a slow consumer doesn't accumulate results.
+        """
+        client = self.manager.news_api_client
+        window = max(1, min(self.fetch_workers, self.buffer_size))
+        executor = ThreadPoolExecutor(max_workers=window)
+        remaining = iter(assets)
+        futures = {}
+
+        def submit():
+            for asset in remaining:
+                futures[executor.submit(client.get_news_for_asset, asset, days_back, max_articles)] = asset
+                return
+
+        try:
+            for _ in range(window):
+                submit()
+            while futures and not stop.is_set():
+                done, _ = wait(futures, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    asset = futures.pop(future)
+                    articles = future.result()
+                    if not articles:
+                        yield {'asset': asset, 'articles': [], 'last': True}
+                    else:
+                        for start in range(0, len(articles), self.batch_size):
+                            yield {
+                                'asset': asset,
+                                'articles': articles[start:start + self.batch_size],
+                                'last': start + self.batch_size >= len(articles)
+                            }
+                    if stop.is_set():
+                        return
+                    submit()
+        finally:
+            # Don't wait for fetches still running when the stream stops
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _dedupe(self):
+        # Keys of the assets still streaming; an asset's keys are dropped after
+        # its last batch, so memory stays bounded by the assets in flight
+        seen = {}
+
+        def stage(batch):
+            asset = batch['asset']
+            asset_seen = seen.setdefault(asset, set())
+            kept = []
+            for article in batch['articles']:
+                key = _exact_key(article)
+                if key in asset_seen:
+                    continue
+                asset_seen.add(key)
+                if self.dedupe_state is not None:
+                    if self.dedupe_state.is_seen(asset, key):
+                        continue
+                    fingerprint = simhash(_article_text(article))
+                    if self.dedupe_state.find_near_duplicate(asset, fingerprint, self.max_distance):
+                        continue
+                    self.dedupe_state.add(asset, key, fingerprint, published_timestamp(article) or time.time())
+                kept.append(article)
+            if self.dedupe_state is not None:
+                self.dedupe_state.commit()
+            if batch['last']:
+                del seen[asset]
+            yield dict(batch, articles=kept)
+        return stage
+
+    def _tag(self, batch):
+        tagger = self.tagger or getattr(self.manager.news_api_client, 'tagger', None)
+        if tagger is not None:
+            for article, tags in zip(batch['articles'], tagger.tag_articles(batch['articles'])):
+                article['assets'] = sorted(tags)
+        yield batch
+
+    def _score(self, batch):
+        if batch['articles']:
+            self.manager.sentiment_analyzer.analyze_articles(batch['articles'])
+        yield batch
+
+    def _persist(self, batch):
+        if batch['articles']:
+            self.manager._save_articles(batch['asset'], batch['articles'])
+        yield batch
+
+    # Plumbing
+
+    def _put(self, out, item, stop):
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _drain(self, source, stop):
+        while not stop.is_set():
+            try:
+                item = source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+
+    def _run_stage(self, items, stage, out, stop):
+        try:
+            for item in items:
+                for result in stage(item):
+                    if not self._put(out, result, stop):
+                        return
+        except Exception as e:
+            self._put(out, _StageError(e), stop)
+            return
+        self._put(out, _DONE, stop)
+
+    def _start(self, items, stage, stop):
+        out = queue.Queue(maxsize=self.buffer_size)
+        thread = threading.Thread(target=self._run_stage, args=(items, stage, out, stop), daemon=True)
+        thread.start()
+        return out, thread
+
+    def stream(self, assets, days_back=3, max_articles_per_asset=10):
+        """
+        Collect and analyze news, yielding results per batch as they are ready
+
+        Args:
+            assets (list): Asset names from our standard list
+            days_back (int): Days to look back for news
+            max_articles_per_asset (int): Max articles per asset
+
+        Yields:
+            dict: 'asset', the newly scored 'articles', the running 'summary'
+                of the asset (as calculate_asset_sentiment_summary) and
+                'complete' once the asset's last batch has been processed
+        """
+        stop = threading.Event()
+        source, fetch_thread = self._start(
+            [None], lambda _: self._fetch(assets, days_back, max_articles_per_asset, stop), stop
+        )
+        threads = [fetch_thread]
+        for stage in (self._dedupe(), self._tag, self._score, self._persist):
+            source, thread = self._start(self._drain(source, stop), stage, stop)
+            threads.append(thread)
+
+        # Aggregate in the consumer's thread; an asset's articles are released
+        # with its last batch
+        seen_articles = {}
+        try:
+            for batch in self._drain(source, stop):
+                asset = batch['asset']
+                asset_articles = seen_articles.setdefault(asset, [])
+                asset_articles.extend(batch['articles'])
+                yield {
+                    'asset': asset,
+                    'articles': batch['articles'],
+                    'summary': self.manager.calculate_asset_sentiment_summary(asset_articles),
+                    'complete': batch['last']
+                }
+                if batch['last']:
+                    del seen_articles[asset]
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join(1)
+
+    async def stream_async(self, assets, days_back=3, max_articles_per_asset=10, executor=None):
+        """
+        Async iterator over stream() that never blocks the event loop
+
+        Args:
+            assets (list): Asset names from our standard list
+            days_back (int): Days to look back for news
+            max_articles_per_asset (int): Max articles per asset
+            executor (concurrent.futures.Executor): Executor waiting on the
+                pipeline (the loop's default executor when None)
+
+        Yields:
+            dict: Partial results, as stream()
+        """
+        loop = asyncio.get_running_loop()
+        results = self.stream(assets, days_back, max_articles_per_asset)
+        try:
+            while True:
+                result = await loop.run_in_executor(executor, next, results, _DONE)
+                if result is _DONE:
+                    return
+                yield result
+        finally:
+            await loop.run_in_executor(executor, results.close)
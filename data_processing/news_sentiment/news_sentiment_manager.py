@@ -1,17 +1,26 @@
 import os
-import json
+import asyncio
 import numpy as np
-from datetime import datetime
+from .news_store import NewsStore
+from .sentiment_index import SentimentIndex
+from .news_pipeline import NewsPipeline
+
+def _field_scores(articles, field):
+    """Values of a sentiment field over the articles that have it"""
+    return [a['sentiment'][field] for a in articles if a['sentiment'].get(field) is not None]
 
 class NewsSentimentManager:
     """
     Manages the collection and analysis of news sentiment for trading assets
     """
-    def __init__(self, news_api_client, sentiment_analyzer, data_dir=None):
+    def __init__(self, news_api_client, sentiment_analyzer, data_dir=None, news_store=None,
+                 sentiment_index=None):
         self.news_api_client = news_api_client
         self.sentiment_analyzer = sentiment_analyzer
         self.data_dir = data_dir if data_dir else os.path.join(os.getcwd(), 'data')
         os.makedirs(self.data_dir, exist_ok=True)
+        self.news_store = news_store or NewsStore(os.path.join(self.data_dir, 'news.sqlite'))
+        self.sentiment_index = sentiment_index or SentimentIndex()
         
     def collect_and_analyze_news(self, assets, days_back=3, max_articles_per_asset=10):
         """
@@ -25,31 +34,116 @@ class NewsSentimentManager:
         Returns:
             dict: Dictionary with asset names as keys and analyzed articles as values
         """
-        all_results = {}
+        print(f"Collecting news for {', '.join(assets)}...")
+        
+        # Get news articles for every asset in one concurrent batch
+        all_results = self.news_api_client.get_news_for_assets(
+            assets, days_back, max_articles_per_asset
+        )
+        
+        # Analyze sentiment for every asset's articles as one batch
+        self._analyze_articles([
+            article for articles in all_results.values() for article in articles
+        ])
+        
+        # Queue for the background store writer
+        for asset, analyzed_articles in all_results.items():
+            self._save_articles(asset, analyzed_articles)
+                
+        return all_results
+    
+    async def collect_and_analyze_news_async(self, session, assets, days_back=3,
+                                             max_articles_per_asset=10, executor=None):
+        """
+        Collect and analyze news for multiple assets without blocking the event loop
+        
+        News for all assets is fetched concurrently. Sentiment scoring runs on
+        ``executor`` so the event loop only waits on I/O.
         
-        for asset in assets:
-            print(f"Collecting news for {asset}...")
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            assets (list): List of asset names
+            days_back (int): Days to look back for news
+            max_articles_per_asset (int): Max articles per asset
+            executor (concurrent.futures.Executor): Executor for CPU-bound work
+                (the loop's default executor when None)
             
-            # Get news articles
-            articles = self.news_api_client.get_news_for_asset(
-                asset, days_back, max_articles_per_asset
+        Returns:
+            dict: Dictionary with asset names as keys and analyzed articles as values
+        """
+        loop = asyncio.get_running_loop()
+        
+        async def process(asset):
+            articles = await self.news_api_client.get_news_for_asset_async(
+                session, asset, days_back, max_articles_per_asset
             )
+            analyzed_articles = await loop.run_in_executor(
+                executor, self._analyze_articles, articles
+            )
+            self._save_articles(asset, analyzed_articles)
+            return analyzed_articles
+        
+        results = await asyncio.gather(*[process(asset) for asset in assets])
+        return dict(zip(assets, results))
+    
+    def stream_and_analyze_news(self, assets, days_back=3, max_articles_per_asset=10, **pipeline_options):
+        """
+        Collect and analyze news, yielding partial results as soon as they are ready
+        
+        Unlike collect_and_analyze_news(), which returns once every asset is
+        done, this yields each batch of an asset's articles once it is scored
+        and persisted. See NewsPipeline for the options.
+        
+        Args:
+            assets (list): List of asset names
+            days_back (int): Days to look back for news
+            max_articles_per_asset (int): Max articles per asset
             
-            # Analyze sentiment
-            analyzed_articles = []
-            for article in articles:
-                analyzed_article = self.sentiment_analyzer.analyze_article(article)
-                analyzed_articles.append(analyzed_article)
+        Returns:
+            generator: Partial results, as NewsPipeline.stream()
+        """
+        return NewsPipeline(self, **pipeline_options).stream(assets, days_back, max_articles_per_asset)
+    
+    def _analyze_articles(self, articles):
+        """Run sentiment analysis over a list of articles as one batch"""
+        return self.sentiment_analyzer.analyze_articles(articles)
+    
+    def _save_articles(self, asset, analyzed_articles):
+        """Queue the analyzed articles of an asset for the news store and index their sentiment"""
+        self.news_store.append(asset, analyzed_articles)
+        self.sentiment_index.add_articles(asset, analyzed_articles)
+    
+    def get_stored_articles(self, asset, start=None, end=None, limit=None):
+        """
+        Previously collected articles of an asset, newest first
+        
+        Args:
+            asset (str): Asset name
+            start (float): Earliest publication time as a unix timestamp
+            end (float): Latest publication time as a unix timestamp
+            limit (int): Maximum number of articles
             
-            all_results[asset] = analyzed_articles
+        Returns:
+            list: Analyzed article dictionaries
+        """
+        return self.news_store.query(asset, start, end, limit)
+    
+    def get_bar_sentiment_features(self, asset, timestamps):
+        """
+        Sentiment features aligned to price bars
+        
+        Args:
+            asset (str): Asset name
+            timestamps: Bar times, e.g. the DatetimeIndex of the price data
             
-            # Save to json file
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{asset.replace('/', '_')}_{timestamp}.json"
-            with open(os.path.join(self.data_dir, filename), 'w') as f:
-                json.dump(analyzed_articles, f, indent=4)
-                
-        return all_results
+        Returns:
+            pandas.DataFrame: One row of features per bar, see SentimentIndex.features()
+        """
+        return self.sentiment_index.features(asset, timestamps)
+    
+    def close(self):
+        """Write out queued articles and close the news store"""
+        self.news_store.close()
     
     def calculate_asset_sentiment_summary(self, asset_articles):
         """
@@ -59,7 +153,8 @@ class NewsSentimentManager:
             asset_articles (list): List of analyzed articles for an asset
             
         Returns:
-            dict: Summary sentiment metrics
+            dict: Summary sentiment metrics (the average of a score is None
+                when no article has it)
         """
         if not asset_articles:
             return {
@@ -78,9 +173,9 @@ class NewsSentimentManager:
                 'key_phrases': []
             }
             
-        # Extract sentiment scores
-        vader_scores = [a['sentiment']['vader_compound'] for a in asset_articles]
-        textblob_scores = [a['sentiment']['textblob_polarity'] for a in asset_articles]
+        # Extract sentiment scores (absent when their backend didn't run)
+        vader_scores = _field_scores(asset_articles, 'vader_compound')
+        textblob_scores = _field_scores(asset_articles, 'textblob_polarity')
         
         # Count sentiments
         sentiments = [a['sentiment']['sentiment_label'] for a in asset_articles]
@@ -105,16 +200,12 @@ class NewsSentimentManager:
             overall = 'neutral'
             
         # Extract key phrases across all articles
-        all_text = " ".join([
-            f"{a.get('title', '')}. {a.get('description', '')}" 
-            for a in asset_articles
-        ])
-        key_phrases = self.sentiment_analyzer.extract_key_phrases(all_text, 10)
+        key_phrases = self.sentiment_analyzer.extract_article_key_phrases(asset_articles, 10)
         
         return {
             'count': total_count,
-            'avg_vader_compound': np.mean(vader_scores) if vader_scores else 0,
-            'avg_textblob_polarity': np.mean(textblob_scores) if textblob_scores else 0,
+            'avg_vader_compound': np.mean(vader_scores) if vader_scores else None,
+            'avg_textblob_polarity': np.mean(textblob_scores) if textblob_scores else None,
             'positive_count': positive_count,
             'negative_count': negative_count,
             'neutral_count': neutral_count,
@@ -131,7 +222,8 @@ class NewsSentimentManager:
             all_assets_articles (dict): Dictionary with asset names and analyzed articles
             
         Returns:
-            dict: Dictionary with asset names and sentiment features
+            dict: Dictionary with asset names and sentiment features (scores
+                of backends that didn't run are None)
         """
         features = {}
         
@@ -140,9 +232,10 @@ class NewsSentimentManager:
             summary = self.calculate_asset_sentiment_summary(articles)
             
             # Extract ML features
+            sentiment_score = summary['avg_vader_compound']
             features[asset] = {
-                'sentiment_score': summary['avg_vader_compound'],  # Main sentiment score
-                'sentiment_magnitude': abs(summary['avg_vader_compound']),  # Intensity of sentiment
+                'sentiment_score': sentiment_score,  # Main sentiment score
+                'sentiment_magnitude': abs(sentiment_score) if sentiment_score is not None else None,  # Intensity of sentiment
                 'textblob_score': summary['avg_textblob_polarity'],
                 'positive_ratio': summary['sentiment_distribution']['positive'] / 100,
                 'negative_ratio': summary['sentiment_distribution']['negative'] / 100,
@@ -151,5 +244,33 @@ class NewsSentimentManager:
                 'sentiment_label': summary['overall_sentiment'],
                 'has_news': summary['count'] > 0
             }
-            
+
         return features
+
+    def get_signal_sentiment(self, all_assets_articles):
+        """
+        Sentiment inputs of TradingSignalModel.predict_latest()/predict_batch()
+
+        Skips key phrase extraction, which the signal doesn't use.
+
+        Args:
+            all_assets_articles (dict): Dictionary with asset names and analyzed articles
+
+        Returns:
+            dict: Dictionary with asset names and {'compound', 'article_count'}
+
+        Raises:
+            ValueError: If the articles were scored without VADER
+        """
+        sentiment = {}
+
+        for asset, articles in all_assets_articles.items():
+            scores = _field_scores(articles, 'vader_compound')
+            if len(scores) < len(articles):
+                raise ValueError("Trading signals need VADER scores; analyze news with the 'vader' backend")
+            sentiment[asset] = {
+                'compound': float(np.mean(scores)) if scores else 0.0,
+                'article_count': len(articles)
+            }
+
+        return sentiment
@@ -0,0 +1,259 @@
+import os
+import json
+import queue
+import sqlite3
+import threading
+import time
+from .news_api_client import published_timestamp
+
+class NewsStore:
+    """
+    Append-only store of analyzed news articles
+
+    Articles go into a single SQLite file in WAL mode, indexed by asset and
+    publication time. ``append()`` only puts the articles on a bounded queue;
+    a background writer thread inserts them in batches, so no file I/O happens
+    on the request path. Rows older than ``retention_days`` are rotated out
+    by the writer.
+    """
+    def __init__(self, path, batch_size=500, flush_interval=1.0, max_pending=10000,
+                 retention_days=None, prune_interval=3600):
+        """
+        Initialize the store
+
+        Args:
+            path (str): SQLite file holding the articles
+            batch_size (int): Maximum articles inserted per transaction
+            flush_interval (float): Seconds the writer waits to fill a batch
+            max_pending (int): Articles queued for writing before append()
+                starts dropping (and counting) new ones
+            retention_days (float): Delete articles published longer ago
+                than this (kept forever when None)
+            prune_interval (float): Seconds between retention passes
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.prune_interval = prune_interval
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.stats = {'queued': 0, 'written': 0, 'duplicates': 0, 'dropped': 0, 'failed': 0, 'pruned': 0, 'batches': 0}
+        self.lock = threading.Lock()
+
+        self.conn = self._connect()
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS articles ('
+            'id INTEGER PRIMARY KEY, asset TEXT NOT NULL, url TEXT NOT NULL, '
+            'published REAL NOT NULL, stored REAL NOT NULL, '
+            'vader_compound REAL, sentiment_label TEXT, article TEXT NOT NULL, '
+            'UNIQUE (asset, url))'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_articles_asset_published ON articles(asset, published)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published)')
+        self.conn.commit()
+
+        self._writer = None
+        self._stopped = threading.Event()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def start(self):
+        """Start the background writer (append() starts it on first use)"""
+        with self.lock:
+            if self._writer is None:
+                self._stopped.clear()
+                self._writer = threading.Thread(target=self._write_loop, name='news-store-writer', daemon=True)
+                self._writer.start()
+        return self
+
+    def append(self, asset, articles):
+        """
+        Queue analyzed articles of an asset for writing
+
+        Args:
+            asset (str): Asset the articles were collected for
+            articles (list): Analyzed article dictionaries
+
+        Returns:
+            int: Number of articles queued
+        """
+        if self._writer is None:
+            self.start()
+        stored = time.time()
+        queued = 0
+        for article in articles:
+            try:
+                self.pending.put_nowait((asset, stored, article))
+                queued += 1
+            except queue.Full:
+                with self.lock:
+                    self.stats['dropped'] += 1
+        with self.lock:
+            self.stats['queued'] += queued
+        return queued
+
+    def _write_loop(self):
+        conn = self._connect()
+        next_prune = time.monotonic()
+        try:
+            while not (self._stopped.is_set() and self.pending.empty()):
+                # A failing batch or prune must not end the thread: flush() waits on it
+                try:
+                    batch = self._take_batch()
+                    if batch:
+                        self._write_batch(conn, batch)
+                    if self.retention_days is not None and time.monotonic() >= next_prune:
+                        next_prune = time.monotonic() + self.prune_interval
+                        self._prune(conn)
+                except Exception as e:
+                    print(f"Error in news store writer: {str(e)}")
+        finally:
+            conn.close()
+
+    def _take_batch(self):
+        """Wait for the first article, then gather more until the batch is full or the interval ends"""
+        try:
+            batch = [self.pending.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.pending.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, conn, batch):
+        rows, failed, written = [], 0, 0
+        try:
+            for asset, stored, article in batch:
+                try:
+                    sentiment = article.get('sentiment') or {}
+                    rows.append((
+                        asset,
+                        article.get('url') or article.get('title') or '',
+                        published_timestamp(article) or stored,
+                        stored,
+                        sentiment.get('vader_compound'),
+                        sentiment.get('sentiment_label'),
+                        json.dumps(article, default=str)
+                    ))
+                except Exception as e:
+                    print(f"Error encoding news article: {str(e)}")
+                    failed += 1
+            if rows:
+                before = conn.total_changes
+                conn.executemany(
+                    'INSERT OR IGNORE INTO articles '
+                    '(asset, url, published, stored, vader_compound, sentiment_label, article) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)', rows
+                )
+                conn.commit()
+                written = conn.total_changes - before
+        except Exception as e:
+            print(f"Error writing news batch: {str(e)}")
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            failed, rows = len(batch), []
+        finally:
+            for _ in batch:
+                self.pending.task_done()
+        with self.lock:
+            self.stats['written'] += written
+            self.stats['duplicates'] += len(rows) - written
+            self.stats['failed'] += failed
+            self.stats['batches'] += 1
+
+    def _prune(self, conn):
+        cutoff = time.time() - self.retention_days * 86400
+        try:
+            deleted = conn.execute('DELETE FROM articles WHERE published < ?', (cutoff,)).rowcount
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error pruning news store: {str(e)}")
+            return
+        with self.lock:
+            self.stats['pruned'] += deleted
+
+    def flush(self):
+        """Block until every queued article has been written"""
+        if self._writer is not None:
+            self.pending.join()
+
+    def query(self, asset, start=None, end=None, limit=None):
+        """
+        Stored articles of an asset, newest first
+
+        Args:
+            asset (str): Asset name
+            start (float): Earliest publication time as a unix timestamp
+            end (float): Latest publication time as a unix timestamp
+            limit (int): Maximum number of articles
+
+        Returns:
+            list: Analyzed article dictionaries
+        """
+        sql = 'SELECT article FROM articles WHERE asset = ?'
+        params = [asset]
+        if start is not None:
+            sql += ' AND published >= ?'
+            params.append(start)
+        if end is not None:
+            sql += ' AND published <= ?'
+            params.append(end)
+        sql += ' ORDER BY published DESC'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def sentiment_series(self, asset, start=None, end=None):
+        """
+        Publication times and VADER scores of an asset, oldest first
+
+        Reads only the indexed columns, without decoding the articles.
+
+        Returns:
+            list: (published, vader_compound) tuples
+        """
+        sql = 'SELECT published, vader_compound FROM articles WHERE asset = ? AND vader_compound IS NOT NULL'
+        params = [asset]
+        if start is not None:
+            sql += ' AND published >= ?'
+            params.append(start)
+        if end is not None:
+            sql += ' AND published <= ?'
+            params.append(end)
+        with self.lock:
+            return self.conn.execute(sql + ' ORDER BY published', params).fetchall()
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+        stats['pending'] = self.pending.qsize()
+        return stats
+
+    def close(self, timeout=10):
+        """Write out queued articles and stop the writer"""
+        self._stopped.set()
+        if self._writer is not None:
+            self._writer.join(timeout)
+            self._writer = None
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
@@ -1,62 +1,101 @@
-from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from .key_phrases import RakeExtractor
+from .sentiment_backends import resolve_backends
+
+# Analyzer owned by each batch scoring process
+_worker_analyzer = None
+
+def _init_worker(analyzer_kwargs):
+    global _worker_analyzer
+    _worker_analyzer = SentimentAnalyzer(**analyzer_kwargs)
+    _worker_analyzer.warm_up()
+
+def _score_text(text):
+    return _worker_analyzer.analyze_text(text)
 
 class SentimentAnalyzer:
     """
     A class for analyzing sentiment of financial news articles
-    using both VADER and TextBlob
+    using VADER, TextBlob or both
     """
-    def __init__(self):
-        self.vader = SentimentIntensityAnalyzer()
+    # Bump whenever scoring changes so cached scores are not reused
+    VERSION = '2'
+    
+    def __init__(self, cache=None, n_jobs=1, min_parallel_batch=64, key_phrase_method='rake',
+                 backends='both'):
+        """
+        Initialize the sentiment analyzer
+        
+        Args:
+            cache (SentimentCache): Optional cache of article scores
+            n_jobs (int): Processes used by the batch scoring API (-1 = all cores)
+            min_parallel_batch (int): Batches smaller than this are scored in-process
+            key_phrase_method (str): 'rake' (fast, cached per article) or
+                'textblob' (noun-phrase chunking and POS tagging)
+            backends (str or list): Sentiment backends to run: 'both',
+                'vader', 'textblob' or a list of registered backend names.
+                The first one sets sentiment_label; fields of backends that
+                don't run are left out of the scores
+        """
+        if key_phrase_method not in ('rake', 'textblob'):
+            raise ValueError(f"Unsupported key phrase method: {key_phrase_method}")
+        self.cache = cache
+        self.key_phrase_method = key_phrase_method
+        self.key_phrase_extractor = RakeExtractor()
+        self.n_jobs = n_jobs
+        self.min_parallel_batch = min_parallel_batch
+        self._pool = None
+        self._pool_size = 0
+        
+        # VADER's lexicon and TextBlob's NLTK corpora are loaded on first use
+        # so importing and constructing the analyzer stays cheap
+        self.backends = resolve_backends(backends)
+        self.backend_names = [backend.name for backend in self.backends]
+        self.fields = [field for backend in self.backends for field in backend.fields]
+        # Scores of another backend combination must not come from the cache
+        self.cache_version = self.VERSION if self.backend_names == ['vader', 'textblob'] \
+            else f"{self.VERSION}:{'+'.join(self.backend_names)}"
+        
+    def warm_up(self):
+        """
+        Load the selected backends' lexicons and corpora ahead of the first request
+        """
+        self.analyze_text("Stocks rallied after strong earnings beat expectations.")
         
     def analyze_text(self, text):
         """
-        Analyze sentiment of a text using both VADER and TextBlob
+        Analyze sentiment of a text with the selected backends
         
         Args:
             text (str): The text to analyze
             
         Returns:
-            dict: Sentiment scores from both analyzers
+            dict: Scores of the selected backends' fields plus the sentiment label
         """
         if not text:
-            return {
-                'vader_compound': 0,
-                'vader_pos': 0,
-                'vader_neg': 0,
-                'vader_neu': 0,
-                'textblob_polarity': 0,
-                'textblob_subjectivity': 0,
-                'sentiment_label': 'neutral'
-            }
-        
-        # VADER sentiment analysis
-        vader_scores = self.vader.polarity_scores(text)
-        
-        # TextBlob sentiment analysis
-        tb = TextBlob(text)
-        textblob_polarity = tb.sentiment.polarity
-        textblob_subjectivity = tb.sentiment.subjectivity
+            scores = dict.fromkeys(self.fields, 0)
+            scores['sentiment_label'] = 'neutral'
+            return scores
+        
+        scores = {}
+        for backend in self.backends:
+            scores.update(backend.score(text))
         
         # Combined sentiment label
-        # Use VADER's compound score as the primary indicator
-        if vader_scores['compound'] >= 0.05:
+        # Use the primary backend's score (VADER's compound by default)
+        primary_score = scores[self.backends[0].label_field]
+        if primary_score >= 0.05:
             sentiment_label = 'positive'
-        elif vader_scores['compound'] <= -0.05:
+        elif primary_score <= -0.05:
             sentiment_label = 'negative'
         else:
             sentiment_label = 'neutral'
         
-        return {
-            'vader_compound': vader_scores['compound'],
-            'vader_pos': vader_scores['pos'],
-            'vader_neg': vader_scores['neg'],
-            'vader_neu': vader_scores['neu'],
-            'textblob_polarity': textblob_polarity,
-            'textblob_subjectivity': textblob_subjectivity,
-            'sentiment_label': sentiment_label
-        }
+        scores['sentiment_label'] = sentiment_label
+        return scores
     
     def analyze_article(self, article):
         """
@@ -73,8 +112,15 @@ class SentimentAnalyzer:
         description = article.get('description', '')
         combined_text = f"{title}. {description}"
         
-        # Get sentiment scores
-        sentiment_scores = self.analyze_text(combined_text)
+        # Get sentiment scores, reusing cached scores for repeated articles
+        if self.cache is not None:
+            key = self.cache.make_key(title, description, self.cache_version)
+            sentiment_scores = self.cache.get(key)
+            if sentiment_scores is None:
+                sentiment_scores = self.analyze_text(combined_text)
+                self.cache.put(key, sentiment_scores)
+        else:
+            sentiment_scores = self.analyze_text(combined_text)
         
         # Add to the article dictionary
         article.update({
@@ -84,21 +130,124 @@ class SentimentAnalyzer:
         
         return article
     
-    def extract_key_phrases(self, text, max_phrases=5):
+    def _resolve_jobs(self, n_jobs):
+        n_jobs = self.n_jobs if n_jobs is None else n_jobs
+        if n_jobs is None or n_jobs < 1:
+            n_jobs = multiprocessing.cpu_count()
+        return n_jobs
+    
+    def _get_pool(self, n_jobs):
+        """Reuse one process pool across batches, rebuilding it if the size changes"""
+        if self._pool is not None and self._pool_size != n_jobs:
+            self.close()
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=n_jobs,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=({'backends': self.backend_names},)
+            )
+            self._pool_size = n_jobs
+        return self._pool
+    
+    def analyze_texts(self, texts, n_jobs=None, chunksize=None):
+        """
+        Analyze the sentiment of many texts, spread over a process pool
+        
+        Args:
+            texts (list): Texts to analyze
+            n_jobs (int): Processes to use (the analyzer's n_jobs when None)
+            chunksize (int): Texts sent to a worker at a time (about four
+                chunks per worker when None)
+            
+        Returns:
+            list: Sentiment scores for each text, in input order, in the
+                same format as analyze_text()
+        """
+        n_jobs = self._resolve_jobs(n_jobs)
+        if n_jobs == 1 or len(texts) < self.min_parallel_batch:
+            return [self.analyze_text(text) for text in texts]
+        
+        if chunksize is None:
+            chunksize = max(1, math.ceil(len(texts) / (n_jobs * 4)))
+        return list(self._get_pool(n_jobs).map(_score_text, texts, chunksize=chunksize))
+    
+    def analyze_articles(self, articles, n_jobs=None, chunksize=None):
+        """
+        Analyze the sentiment of many news articles in one batch
+        
+        Cached articles are answered from the cache; only the rest are scored.
+        
+        Args:
+            articles (list): News article dictionaries
+            n_jobs (int): Processes to use (the analyzer's n_jobs when None)
+            chunksize (int): Texts sent to a worker at a time
+            
+        Returns:
+            list: The articles with added sentiment analysis, as analyze_article()
+        """
+        scores = [None] * len(articles)
+        keys = [None] * len(articles)
+        pending = []
+        
+        for i, article in enumerate(articles):
+            title = article.get('title', '')
+            description = article.get('description', '')
+            if self.cache is not None:
+                keys[i] = self.cache.make_key(title, description, self.cache_version)
+                scores[i] = self.cache.get(keys[i])
+            if scores[i] is None:
+                pending.append(i)
+        
+        # Score each distinct text once, even if it repeats within the batch
+        positions = {}
+        for i in pending:
+            text = f"{articles[i].get('title', '')}. {articles[i].get('description', '')}"
+            positions.setdefault(text, []).append(i)
+        
+        texts = list(positions)
+        for text, sentiment_scores in zip(texts, self.analyze_texts(texts, n_jobs, chunksize)):
+            for i in positions[text]:
+                scores[i] = dict(sentiment_scores)
+            if self.cache is not None:
+                self.cache.put(keys[positions[text][0]], sentiment_scores)
+        
+        analyzed_at = datetime.now().isoformat()
+        for article, sentiment_scores in zip(articles, scores):
+            article.update({
+                'sentiment': sentiment_scores,
+                'analyzed_at': analyzed_at
+            })
+        
+        return articles
+    
+    def close(self):
+        """Shut down the batch scoring process pool"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._pool_size = 0
+    
+    def extract_key_phrases(self, text, max_phrases=5, method=None):
         """
         Extract key phrases from text
         
         Args:
             text (str): Input text
             max_phrases (int): Maximum number of phrases to extract
+            method (str): 'rake' or 'textblob' (key_phrase_method when None)
             
         Returns:
             list: List of key phrases
         """
         if not text:
             return []
+        
+        if (method or self.key_phrase_method) == 'rake':
+            return self.key_phrase_extractor.extract(text, max_phrases)
             
         # Simple noun phrase extraction
+        from textblob import TextBlob
         tb = TextBlob(text)
         noun_phrases = list(tb.noun_phrases)
         
@@ -115,3 +264,27 @@ class SentimentAnalyzer:
         sorted_phrases = sorted(unique_phrases, key=len, reverse=True)
         
         return sorted_phrases[:max_phrases]
+    
+    def extract_article_key_phrases(self, articles, max_phrases=10, method=None):
+        """
+        Extract key phrases across a list of articles
+        
+        With RAKE each article's phrases are scored once and cached, so
+        repeated summaries over overlapping article sets stay fast.
+        
+        Args:
+            articles (list): News article dictionaries
+            max_phrases (int): Maximum number of phrases to extract
+            method (str): 'rake' or 'textblob' (key_phrase_method when None)
+            
+        Returns:
+            list: List of key phrases
+        """
+        if (method or self.key_phrase_method) == 'rake':
+            return self.key_phrase_extractor.extract_from_articles(articles, max_phrases)
+        
+        all_text = " ".join([
+            f"{a.get('title', '')}. {a.get('description', '')}" 
+            for a in articles
+        ])
+        return self.extract_key_phrases(all_text, max_phrases, method='textblob')
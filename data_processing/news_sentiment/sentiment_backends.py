@@ -0,0 +1,111 @@
+class SentimentBackend:
+    """
+    Base class of a sentiment scorer
+
+    ``fields`` lists the keys of the analyzer output the backend fills and
+    ``label_field`` the score (in [-1, 1]) the sentiment label is derived
+    from when the backend is the primary one.
+    """
+    name = None
+    fields = ()
+    label_field = None
+
+    def load(self):
+        """Load models or lexicons ahead of the first call"""
+
+    def score(self, text):
+        """
+        Score a non-empty text
+
+        Args:
+            text (str): The text to analyze
+
+        Returns:
+            dict: Values for each name in ``fields``
+        """
+        raise NotImplementedError
+
+class VaderBackend(SentimentBackend):
+    name = 'vader'
+    fields = ('vader_compound', 'vader_pos', 'vader_neg', 'vader_neu')
+    label_field = 'vader_compound'
+
+    def __init__(self):
+        self._analyzer = None
+
+    def load(self):
+        if self._analyzer is None:
+            from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+            self._analyzer = SentimentIntensityAnalyzer()
+        return self._analyzer
+
+    def score(self, text):
+        scores = self.load().polarity_scores(text)
+        return {
+            'vader_compound': scores['compound'],
+            'vader_pos': scores['pos'],
+            'vader_neg': scores['neg'],
+            'vader_neu': scores['neu']
+        }
+
+class TextBlobBackend(SentimentBackend):
+    name = 'textblob'
+    fields = ('textblob_polarity', 'textblob_subjectivity')
+    label_field = 'textblob_polarity'
+
+    def load(self):
+        from textblob import TextBlob
+        # The first analysis loads TextBlob's corpora
+        TextBlob("warm up").sentiment
+
+    def score(self, text):
+        from textblob import TextBlob
+        sentiment = TextBlob(text).sentiment
+        return {
+            'textblob_polarity': sentiment.polarity,
+            'textblob_subjectivity': sentiment.subjectivity
+        }
+
+# Backend name -> class
+SENTIMENT_BACKENDS = {}
+
+# Named backend combinations; the first backend of a mode sets the label
+SENTIMENT_MODES = {
+    'both': ('vader', 'textblob'),
+    'vader': ('vader',),
+    'textblob': ('textblob',)
+}
+
+def register_backend(backend_class):
+    """
+    Make a backend class selectable by its name
+
+    Args:
+        backend_class (type): SentimentBackend subclass with a unique name
+
+    Returns:
+        type: The class, so this can be used as a decorator
+    """
+    SENTIMENT_BACKENDS[backend_class.name] = backend_class
+    return backend_class
+
+def resolve_backends(backends):
+    """
+    Turn a mode name or list of backend names into backend instances
+
+    Args:
+        backends (str or list): A key of SENTIMENT_MODES, or backend names
+
+    Returns:
+        list: Backend instances in order
+    """
+    names = SENTIMENT_MODES.get(backends, (backends,)) if isinstance(backends, str) else tuple(backends)
+    if not names:
+        raise ValueError("At least one sentiment backend is required")
+    unknown = [name for name in names if name not in SENTIMENT_BACKENDS]
+    if unknown:
+        raise ValueError(f"Unsupported sentiment backend(s): {', '.join(unknown)}")
+    return [SENTIMENT_BACKENDS[name]() for name in names]
+
+register_backend(VaderBackend)
+register_backend(TextBlobBackend)
@@ -0,0 +1,201 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+class SentimentCache:
+    """
+    Persistent cache of sentiment scores keyed by article content
+
+    Scores are stored in a local SQLite file under a hash of the article's
+    title, description and the analyzer version, with an in-memory LRU in
+    front. A repeated headline costs one hash lookup instead of re-running
+    VADER and TextBlob. Lookups only note when an entry was used; the
+    last_used column that disk eviction orders by is updated in batches.
+    """
+    def __init__(self, path=None, max_memory_items=10000, max_disk_items=500000,
+                 touch_batch_size=1000, touch_interval=30.0):
+        """
+        Initialize the sentiment cache
+
+        Args:
+            path (str): SQLite file for the persistent layer (memory only when None)
+            max_memory_items (int): Entries kept in the in-memory LRU
+            max_disk_items (int): Entries kept on disk; least recently used
+                entries beyond this are evicted
+            touch_batch_size (int): Pending last_used updates that trigger a write
+            touch_interval (float): Seconds after which pending last_used
+                updates are written on the next lookup or store
+        """
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._writes_since_eviction = 0
+        self.touch_batch_size = touch_batch_size
+        self.touch_interval = touch_interval
+        # Keys used since the last flush -> time of their latest use
+        self._touched = {}
+        self._touched_since = time.monotonic()
+
+        self.conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # WAL lets several processes share the cache file
+            self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS sentiment ('
+                'key TEXT PRIMARY KEY, scores TEXT NOT NULL, last_used REAL NOT NULL)'
+            )
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_sentiment_last_used ON sentiment(last_used)')
+            self.conn.commit()
+
+    @staticmethod
+    def make_key(title, description, analyzer_version):
+        """
+        Build the cache key for an article
+
+        Args:
+            title (str): Article title
+            description (str): Article description
+            analyzer_version (str): Version of the scoring configuration
+
+        Returns:
+            str: Hex digest identifying the content and analyzer version
+        """
+        content = f"{analyzer_version}\x00{title}\x00{description}"
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, key):
+        """
+        Look up cached scores
+
+        Args:
+            key (str): Cache key from make_key()
+
+        Returns:
+            dict: Copy of the cached scores, or None on a miss
+        """
+        with self.lock:
+            scores = self.memory.get(key)
+            if scores is not None:
+                self.memory.move_to_end(key)
+                self._touch(key)
+                self.hits += 1
+                return dict(scores)
+
+            if self.conn is not None:
+                row = self.conn.execute(
+                    'SELECT scores FROM sentiment WHERE key = ?', (key,)
+                ).fetchone()
+                if row is not None:
+                    scores = json.loads(row[0])
+                    self._remember(key, scores)
+                    self._touch(key)
+                    self.hits += 1
+                    return dict(scores)
+
+            self.misses += 1
+            return None
+
+    def put(self, key, scores):
+        """
+        Store scores for a key
+
+        Args:
+            key (str): Cache key from make_key()
+            scores (dict): Sentiment scores to cache
+        """
+        with self.lock:
+            self._remember(key, dict(scores))
+            if self.conn is None:
+                return
+            self.conn.execute(
+                'INSERT OR REPLACE INTO sentiment (key, scores, last_used) VALUES (?, ?, ?)',
+                (key, json.dumps(scores), time.time())
+            )
+            # The row was just written with the current time
+            self._touched.pop(key, None)
+            self._writes_since_eviction += 1
+            # Evict in batches rather than checking the table size on every write
+            if self._writes_since_eviction >= 1000:
+                self._flush_touched()
+                self._evict_disk()
+            elif self._touch_due():
+                self._flush_touched()
+            self.conn.commit()
+
+    def _touch(self, key):
+        """Note a use of a stored entry (under the lock)"""
+        if self.conn is None:
+            return
+        self._touched[key] = time.time()
+        if self._touch_due():
+            self._flush_touched()
+            self.conn.commit()
+
+    def _touch_due(self):
+        return bool(self._touched) and (len(self._touched) >= self.touch_batch_size or
+                                        time.monotonic() - self._touched_since >= self.touch_interval)
+
+    def _flush_touched(self):
+        """Write pending last_used updates in one statement (under the lock, without committing)"""
+        if self._touched:
+            self.conn.executemany(
+                'UPDATE sentiment SET last_used = ? WHERE key = ?',
+                [(used, key) for key, used in self._touched.items()]
+            )
+            self._touched = {}
+        self._touched_since = time.monotonic()
+
+    def _remember(self, key, scores):
+        self.memory[key] = scores
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_items:
+            self.memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Drop the least recently used rows beyond max_disk_items"""
+        self._writes_since_eviction = 0
+        count = self.conn.execute('SELECT COUNT(*) FROM sentiment').fetchone()[0]
+        excess = count - self.max_disk_items
+        if excess > 0:
+            self.conn.execute(
+                'DELETE FROM sentiment WHERE key IN '
+                '(SELECT key FROM sentiment ORDER BY last_used LIMIT ?)', (excess,)
+            )
+
+    def stats(self):
+        """
+        Cache effectiveness counters
+
+        Returns:
+            dict: Hits, misses, hit rate and in-memory size
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'memory_items': len(self.memory)
+            }
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self._flush_touched()
+                self.conn.commit()
+                self.conn.close()
+                self.conn = None
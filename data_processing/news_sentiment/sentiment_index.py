@@ -0,0 +1,302 @@
+import threading
+import numpy as np
+import pandas as pd
+from .news_api_client import published_timestamp
+
+# Aggregates kept per bucket, in column order
+_COUNT, _SUM, _ABS_SUM, _POSITIVE, _NEGATIVE, _NEUTRAL = range(6)
+
+def to_unix_seconds(timestamps):
+    """
+    Convert bar timestamps to unix seconds
+
+    Args:
+        timestamps: DatetimeIndex, datetimes, ISO strings or unix seconds
+            (naive datetimes are taken as UTC)
+
+    Returns:
+        numpy.ndarray: float64 unix seconds
+    """
+    values = np.asarray(timestamps)
+    if values.dtype.kind in 'iuf':
+        return values.astype(np.float64)
+    index = pd.DatetimeIndex(pd.to_datetime(values, utc=True))
+    # Timedelta division works for any datetime resolution
+    return np.asarray((index - pd.Timestamp(0, tz='UTC')) / pd.Timedelta(seconds=1), dtype=np.float64)
+
+def _window_label(seconds):
+    for unit, size in (('d', 86400), ('h', 3600), ('min', 60)):
+        if seconds % size == 0:
+            return f"{seconds // size}{unit}"
+    return f"{seconds}s"
+
+class _AssetBuckets:
+    """Base-resolution buckets of one asset plus their compiled arrays"""
+    def __init__(self):
+        self.buckets = {}  # bucket start -> [count, sum, abs_sum, positive, negative, neutral]
+        self.seen = set()
+        self.compiled = None
+
+class SentimentIndex:
+    """
+    Time-bucketed news sentiment for aligning sentiment to price bars
+
+    Scored articles are aggregated per asset into buckets of
+    ``bucket_seconds`` (counts, compound sums, positive / negative / neutral
+    counts). The buckets are compiled into sorted arrays with prefix sums,
+    so sentiment over any trailing window of any bar is two binary searches
+    and a subtraction, done for all requested bars at once. An exponentially
+    decayed sentiment and news intensity are kept alongside.
+
+    A bucket only counts for a bar once it has closed (bucket end <= bar
+    time), so features never look ahead of the bar they describe.
+    """
+    def __init__(self, bucket_seconds=300, windows=(3600, 14400, 86400), primary_window=86400,
+                 half_life=21600):
+        """
+        Initialize the index
+
+        Args:
+            bucket_seconds (int): Width of the base buckets in seconds
+            windows (tuple): Trailing window lengths in seconds, each a
+                multiple of bucket_seconds
+            primary_window (int): Window whose features use the unsuffixed
+                names FeatureEngineer expects (sentiment_score, article_count, ...)
+            half_life (float): Half-life in seconds of the decayed sentiment
+        """
+        if any(window % bucket_seconds for window in windows):
+            raise ValueError("Every window must be a multiple of bucket_seconds")
+        if primary_window not in windows:
+            windows = tuple(windows) + (primary_window,)
+        self.bucket_seconds = bucket_seconds
+        self.windows = tuple(sorted(windows))
+        self.primary_window = primary_window
+        self.decay_rate = np.log(2) / half_life
+
+        self.assets = {}
+        self.lock = threading.Lock()
+
+    def _asset(self, asset):
+        state = self.assets.get(asset)
+        if state is None:
+            state = self.assets[asset] = _AssetBuckets()
+        return state
+
+    def add(self, asset, timestamps, compound, labels=None):
+        """
+        Add scored articles as arrays
+
+        Args:
+            asset (str): Asset name
+            timestamps: Publication times (see to_unix_seconds)
+            compound (array-like): VADER compound score of each article
+            labels (array-like): 'positive' / 'negative' / 'neutral' labels
+                (derived from compound with the analyzer's thresholds when None)
+        """
+        seconds = to_unix_seconds(timestamps)
+        compound = np.asarray(compound, dtype=np.float64)
+        if labels is None:
+            positive = compound >= 0.05
+            negative = compound <= -0.05
+        else:
+            labels = np.asarray(labels)
+            positive = labels == 'positive'
+            negative = labels == 'negative'
+        neutral = ~(positive | negative)
+
+        starts = (seconds // self.bucket_seconds).astype(np.int64) * self.bucket_seconds
+        with self.lock:
+            state = self._asset(asset)
+            for start, value, pos, neg, neu in zip(starts.tolist(), compound.tolist(),
+                                                   positive.tolist(), negative.tolist(), neutral.tolist()):
+                bucket = state.buckets.get(start)
+                if bucket is None:
+                    bucket = state.buckets[start] = [0, 0.0, 0.0, 0, 0, 0]
+                bucket[_COUNT] += 1
+                bucket[_SUM] += value
+                bucket[_ABS_SUM] += abs(value)
+                bucket[_POSITIVE] += pos
+                bucket[_NEGATIVE] += neg
+                bucket[_NEUTRAL] += neu
+            state.compiled = None
+
+    def add_articles(self, asset, articles):
+        """
+        Add analyzed articles, skipping ones already indexed for the asset
+
+        Args:
+            asset (str): Asset name
+            articles (list): Articles with a 'sentiment' dict, as returned by
+                SentimentAnalyzer.analyze_articles()
+
+        Returns:
+            int: Number of articles added
+        """
+        timestamps, compound, labels = [], [], []
+        with self.lock:
+            seen = self._asset(asset).seen
+            for article in articles:
+                sentiment = article.get('sentiment')
+                published = published_timestamp(article)
+                key = article.get('url') or article.get('title')
+                # Articles scored without VADER carry no compound score
+                if not sentiment or sentiment.get('vader_compound') is None or not published or key in seen:
+                    continue
+                seen.add(key)
+                timestamps.append(published)
+                compound.append(sentiment['vader_compound'])
+                labels.append(sentiment.get('sentiment_label', 'neutral'))
+        if timestamps:
+            self.add(asset, timestamps, compound, labels)
+        return len(timestamps)
+
+    def load_from_store(self, news_store, asset, start=None, end=None):
+        """
+        Index an asset's history from a NewsStore
+
+        Args:
+            news_store (NewsStore): Store of analyzed articles
+            asset (str): Asset name
+            start (float): Earliest publication time as a unix timestamp
+            end (float): Latest publication time as a unix timestamp
+
+        Returns:
+            int: Number of articles added
+        """
+        return self.add_articles(asset, news_store.query(asset, start, end))
+
+    def _compile(self, state):
+        """Sorted bucket ends, prefix sums and decayed state of an asset"""
+        if state.compiled is not None:
+            return state.compiled
+
+        starts = np.array(sorted(state.buckets), dtype=np.int64)
+        values = np.array([state.buckets[start] for start in starts.tolist()], dtype=np.float64)
+        values = values.reshape(len(starts), 6)
+        ends = (starts + self.bucket_seconds).astype(np.float64)
+        prefix = np.vstack([np.zeros((1, 6)), np.cumsum(values, axis=0)])
+
+        # Decayed sums at each bucket end: S_k = S_{k-1} * exp(-rate * dt) + x_k.
+        # Written as exp(-rate * t_k) * cumsum(x_j * exp(rate * t_j)), computed in
+        # segments short enough for the exponent not to overflow.
+        decayed = np.zeros((len(ends), 2))
+        span_limit = 600.0 / self.decay_rate
+        carry = np.zeros(2)
+        carry_time = ends[0] if len(ends) else 0.0
+        segment_start = 0
+        while segment_start < len(ends):
+            origin = ends[segment_start]
+            segment_end = int(np.searchsorted(ends, origin + span_limit, side='right'))
+            offsets = ends[segment_start:segment_end] - origin
+            growth = np.exp(self.decay_rate * offsets)[:, None]
+            sums = np.cumsum(values[segment_start:segment_end][:, [_SUM, _COUNT]] * growth, axis=0)
+            carried = carry * np.exp(-self.decay_rate * (origin - carry_time))
+            decayed[segment_start:segment_end] = sums / growth + carried * np.exp(-self.decay_rate * offsets)[:, None]
+            carry = decayed[segment_end - 1]
+            carry_time = ends[segment_end - 1]
+            segment_start = segment_end
+
+        state.compiled = (ends, prefix, decayed)
+        return state.compiled
+
+    def features(self, asset, timestamps):
+        """
+        Sentiment features for a set of bar timestamps in one lookup
+
+        For every window W the columns are article_count, sentiment_score
+        (mean compound), sentiment_magnitude (mean absolute compound) and
+        positive / negative / neutral ratios over (t - W, t], suffixed with the
+        window (e.g. ``sentiment_score_1h``). The primary window's columns
+        also appear unsuffixed together with has_news, matching the columns
+        FeatureEngineer and ModelTrainer use. sentiment_ewm and news_intensity
+        are the decayed mean compound and decayed article count at t.
+
+        Args:
+            asset (str): Asset name
+            timestamps: Bar times (DatetimeIndex, datetimes or unix seconds)
+
+        Returns:
+            pandas.DataFrame: One row per timestamp, indexed like the input
+        """
+        index = timestamps if isinstance(timestamps, pd.Index) else pd.Index(timestamps)
+        seconds = to_unix_seconds(timestamps)
+
+        with self.lock:
+            state = self.assets.get(asset)
+            compiled = self._compile(state) if state is not None and state.buckets else None
+
+        columns = {}
+        if compiled is None:
+            ends = np.zeros(0)
+            prefix = np.zeros((1, 6))
+            decayed = np.zeros((0, 2))
+        else:
+            ends, prefix, decayed = compiled
+
+        # Buckets that have closed by each bar
+        upper = np.searchsorted(ends, seconds, side='right')
+        for window in self.windows:
+            lower = np.searchsorted(ends, seconds - window, side='right')
+            totals = prefix[upper] - prefix[lower]
+            count = totals[:, _COUNT]
+            safe_count = np.where(count > 0, count, 1.0)
+            window_columns = {
+                'article_count': count,
+                'sentiment_score': totals[:, _SUM] / safe_count,
+                'sentiment_magnitude': totals[:, _ABS_SUM] / safe_count,
+                'positive_ratio': totals[:, _POSITIVE] / safe_count,
+                'negative_ratio': totals[:, _NEGATIVE] / safe_count,
+                'neutral_ratio': totals[:, _NEUTRAL] / safe_count
+            }
+            suffix = _window_label(window)
+            for name, values in window_columns.items():
+                columns[f"{name}_{suffix}"] = values
+            if window == self.primary_window:
+                columns.update(window_columns)
+                columns['has_news'] = count > 0
+
+        last = upper - 1
+        has_state = last >= 0
+        last = np.where(has_state, last, 0)
+        if len(ends):
+            decay = np.exp(-self.decay_rate * np.maximum(seconds - ends[last], 0.0))
+            weighted_sum = np.where(has_state, decayed[last, 0] * decay, 0.0)
+            weight = np.where(has_state, decayed[last, 1] * decay, 0.0)
+        else:
+            weighted_sum = weight = np.zeros(len(seconds))
+        columns['sentiment_ewm'] = np.divide(weighted_sum, weight, out=np.zeros(len(seconds)), where=weight > 1e-12)
+        columns['news_intensity'] = weight
+
+        return pd.DataFrame(columns, index=index)
+
+    def buckets(self, asset, resolution=None):
+        """
+        Aggregated buckets of an asset at any multiple of bucket_seconds
+
+        Args:
+            asset (str): Asset name
+            resolution (int): Bucket width in seconds (bucket_seconds when None)
+
+        Returns:
+            pandas.DataFrame: article_count, compound_sum, positive, negative
+                and neutral counts per non-empty bucket, indexed by bucket start (UTC)
+        """
+        resolution = resolution or self.bucket_seconds
+        if resolution % self.bucket_seconds:
+            raise ValueError("resolution must be a multiple of bucket_seconds")
+        with self.lock:
+            state = self.assets.get(asset)
+            rows = dict(state.buckets) if state is not None else {}
+
+        starts = np.array(sorted(rows), dtype=np.int64)
+        values = np.array([rows[start] for start in starts.tolist()], dtype=np.float64).reshape(len(starts), 6)
+        frame = pd.DataFrame({
+            'article_count': values[:, _COUNT],
+            'compound_sum': values[:, _SUM],
+            'positive': values[:, _POSITIVE],
+            'negative': values[:, _NEGATIVE],
+            'neutral': values[:, _NEUTRAL]
+        }, index=starts // resolution * resolution)
+        frame = frame.groupby(level=0).sum()
+        frame.index = pd.to_datetime(frame.index, unit='s', utc=True)
+        return frame
@@ -0,0 +1,225 @@
+"""
+Bounded per-client outbound queues for SocketIO updates.
+
+Broadcasting every update straight into SocketIO lets a slow browser build
+an unbounded transport queue on the server. ``OutboundDispatcher`` keeps a
+small outbox per connected client instead. Price updates are conflated (a
+newer update for the same asset and timeframe replaces the queued one),
+other events go into a bounded FIFO that drops its oldest entry when full,
+and a client whose transport stays backed up past ``slow_consumer_timeout``
+is disconnected.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class ClientOutbox:
+    """
+    Outbound messages waiting to be sent to one client
+    """
+    def __init__(self, max_messages):
+        """
+        Initialize the outbox
+
+        Args:
+            max_messages (int): Maximum messages held for each of the
+                conflated and queued kinds
+        """
+        self.max_messages = max_messages
+        self.latest = OrderedDict()  # conflation key -> (event, payload, enqueued_at)
+        self.queue = deque()         # (event, payload, enqueued_at)
+        self.slow_since = None
+
+    def put(self, event, key, payload, conflate):
+        """
+        Add a message to the outbox
+
+        Args:
+            event (str): SocketIO event name
+            key (tuple): Conflation key, e.g. (event, asset, timeframe)
+            payload (dict): Event payload
+            conflate (bool): Replace a queued message with the same key
+
+        Returns:
+            str: 'conflated' or 'dropped' when an older message was discarded,
+                otherwise None
+        """
+        enqueued_at = time.monotonic()
+        if conflate:
+            if key in self.latest:
+                # Keep the original position so a busy key can't starve others
+                self.latest[key] = (event, payload, self.latest[key][2])
+                return 'conflated'
+            outcome = None
+            if len(self.latest) >= self.max_messages:
+                self.latest.popitem(last=False)
+                outcome = 'dropped'
+            self.latest[key] = (event, payload, enqueued_at)
+            return outcome
+
+        outcome = None
+        if len(self.queue) >= self.max_messages:
+            self.queue.popleft()
+            outcome = 'dropped'
+        self.queue.append((event, payload, enqueued_at))
+        return outcome
+
+    def pop(self):
+        """Take the next message, queued events before conflated updates"""
+        if self.queue:
+            return self.queue.popleft()
+        if self.latest:
+            return self.latest.popitem(last=False)[1]
+        return None
+
+    def __len__(self):
+        return len(self.queue) + len(self.latest)
+
+
+class OutboundDispatcher:
+    """
+    Sends queued updates to each client at the pace its transport allows
+    """
+    def __init__(self, send, disconnect, transport_backlog=None, max_messages=100,
+                 max_transport_backlog=10, slow_consumer_timeout=30,
+                 conflate_events=('market_data_update',), interval=0.05):
+        """
+        Initialize the dispatcher
+
+        Args:
+            send (callable): send(sid, event, payload) emits to one client
+            disconnect (callable): disconnect(sid) drops a client
+            transport_backlog (callable): transport_backlog(sid) returns the
+                number of packets already waiting in the client's transport
+                (treated as 0 when None)
+            max_messages (int): Outbox bound per client and message kind
+            max_transport_backlog (int): Stop sending to a client while its
+                transport holds this many packets
+            slow_consumer_timeout (float): Seconds a client may stay backed
+                up before it is disconnected
+            conflate_events (tuple): Events where only the latest value matters
+            interval (float): Seconds between dispatch rounds
+        """
+        self.send = send
+        self.disconnect = disconnect
+        self.transport_backlog = transport_backlog or (lambda sid: 0)
+        self.max_messages = max_messages
+        self.max_transport_backlog = max_transport_backlog
+        self.slow_consumer_timeout = slow_consumer_timeout
+        self.conflate_events = set(conflate_events)
+        self.interval = interval
+
+        self.outboxes = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.metrics = {
+            'enqueued': 0,
+            'sent': 0,
+            'conflated': 0,
+            'dropped': 0,
+            'slow_disconnects': 0,
+            'avg_queue_delay_ms': 0.0
+        }
+
+    def add_client(self, sid):
+        with self.lock:
+            self.outboxes.setdefault(sid, ClientOutbox(self.max_messages))
+
+    def remove_client(self, sid):
+        with self.lock:
+            self.outboxes.pop(sid, None)
+
+    def publish(self, event, key, payload, sids):
+        """
+        Queue an update for a set of clients
+
+        Args:
+            event (str): SocketIO event name
+            key (tuple): Identifies the stream, e.g. (asset, timeframe)
+            payload (dict): Event payload
+            sids (iterable): Session ids of the subscribed clients
+        """
+        conflate = event in self.conflate_events
+        with self.lock:
+            for sid in sids:
+                outbox = self.outboxes.get(sid)
+                if outbox is None:
+                    continue
+                outcome = outbox.put(event, (event,) + tuple(key), payload, conflate)
+                self.metrics['enqueued'] += 1
+                if outcome:
+                    self.metrics[outcome] += 1
+
+    def get_metrics(self):
+        """
+        Snapshot of the dispatcher counters
+
+        Returns:
+            dict: Counters plus connected clients and messages still queued
+        """
+        with self.lock:
+            metrics = dict(self.metrics)
+            metrics['clients'] = len(self.outboxes)
+            metrics['queued'] = sum(len(outbox) for outbox in self.outboxes.values())
+            metrics['slow_clients'] = sum(
+                1 for outbox in self.outboxes.values() if outbox.slow_since is not None
+            )
+        return metrics
+
+    def dispatch_once(self):
+        """Send what each client can take right now and drop stuck clients"""
+        now = time.monotonic()
+        to_send = []
+        to_disconnect = []
+
+        with self.lock:
+            for sid, outbox in self.outboxes.items():
+                if not outbox:
+                    outbox.slow_since = None
+                    continue
+                backlog = self.transport_backlog(sid)
+                if backlog >= self.max_transport_backlog:
+                    if outbox.slow_since is None:
+                        outbox.slow_since = now
+                    elif now - outbox.slow_since > self.slow_consumer_timeout:
+                        to_disconnect.append(sid)
+                    continue
+                outbox.slow_since = None
+                for _ in range(self.max_transport_backlog - backlog):
+                    message = outbox.pop()
+                    if message is None:
+                        break
+                    to_send.append((sid, message))
+
+            for sid in to_disconnect:
+                del self.outboxes[sid]
+                self.metrics['slow_disconnects'] += 1
+
+        # Emit outside the lock so publishers are never blocked by transports
+        for sid, (event, payload, enqueued_at) in to_send:
+            try:
+                self.send(sid, event, payload)
+            except Exception as e:
+                print(f"Error sending {event} to {sid}: {str(e)}")
+                continue
+            delay_ms = (now - enqueued_at) * 1000
+            with self.lock:
+                self.metrics['sent'] += 1
+                self.metrics['avg_queue_delay_ms'] += 0.05 * (delay_ms - self.metrics['avg_queue_delay_ms'])
+
+        for sid in to_disconnect:
+            print(f"Disconnecting slow consumer {sid}")
+            try:
+                self.disconnect(sid)
+            except Exception as e:
+                print(f"Error disconnecting {sid}: {str(e)}")
+
+    def run(self):
+        """Dispatch loop, meant to run on a background thread"""
+        while not self.stopped.is_set():
+            self.dispatch_once()
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
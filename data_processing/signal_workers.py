@@ -0,0 +1,337 @@
+"""
+Multi-process signal generation.
+
+Signal generation (feature preparation, RandomForest inference and news
+sentiment) is CPU-bound, so running it on one thread under the GIL caps
+throughput at a single core. ``SignalWorkerPool`` spreads subscribed
+(asset, timeframe) keys over N worker processes with a consistent hash ring.
+Each worker preloads its own model and keeps its own per-key state, and
+publishes finished signals back to the SocketIO process through a local queue.
+"""
+import bisect
+import hashlib
+import multiprocessing
+import queue
+import threading
+import time
+from datetime import datetime
+
+
+class ConsistentHashRing:
+    """
+    Consistent hash ring mapping keys to worker ids
+
+    Each worker is placed on the ring ``replicas`` times so keys spread
+    evenly, and adding or removing a worker only moves the keys that hashed
+    next to it.
+    """
+    def __init__(self, nodes=None, replicas=100):
+        """
+        Initialize the ring
+
+        Args:
+            nodes (list): Initial node ids
+            replicas (int): Virtual points per node
+        """
+        self.replicas = replicas
+        self._points = []
+        self._owners = {}
+        for node in nodes or []:
+            self.add_node(node)
+
+    @staticmethod
+    def _hash(value):
+        # md5 rather than hash() so every process agrees on placement
+        return int(hashlib.md5(str(value).encode('utf-8')).hexdigest()[:16], 16)
+
+    def add_node(self, node):
+        for replica in range(self.replicas):
+            point = self._hash(f"{node}#{replica}")
+            self._owners[point] = node
+            bisect.insort(self._points, point)
+
+    def remove_node(self, node):
+        for replica in range(self.replicas):
+            point = self._hash(f"{node}#{replica}")
+            if self._owners.pop(point, None) is not None:
+                self._points.remove(point)
+
+    def get_node(self, key):
+        """
+        Find the node owning a key
+
+        Args:
+            key (str): Key to place on the ring
+
+        Returns:
+            The node id owning the key
+        """
+        if not self._points:
+            raise ValueError("Hash ring has no nodes")
+        index = bisect.bisect(self._points, self._hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+
+def subscription_key(asset, timeframe):
+    """Ring key for an (asset, timeframe) subscription"""
+    return f"{asset}|{timeframe}"
+
+
+def _build_worker_state(config):
+    """Create the clients and preloaded model owned by one worker process"""
+    from market_data.api_client import MarketDataClient
+    from news_sentiment import NewsAPIClient, SentimentAnalyzer, NewsSentimentManager, SentimentCache
+    from ml_models.trading_model import TradingSignalModel
+    from ml_models.model_registry import ModelRegistry, ModelHandle
+
+    market_client = MarketDataClient(api_provider='twelvedata', api_key=config.get('market_api_key'))
+    news_client = NewsAPIClient(api_provider='newsapi', api_key=config.get('news_api_key'), fold_keywords=True)
+    cache = SentimentCache(config['sentiment_cache_path']) if config.get('sentiment_cache_path') else None
+    news_manager = NewsSentimentManager(
+        news_client, SentimentAnalyzer(cache=cache, backends=config.get('sentiment_backends', 'vader'))
+    )
+    news_manager.sentiment_analyzer.warm_up()
+    registry = ModelRegistry(config['model_registry']) if config.get('model_registry') else None
+    model_handle = ModelHandle(registry=registry, name=config.get('model_name', 'trading_signal'))
+    if model_handle.model is None:
+        trading_model = TradingSignalModel()
+        if config.get('model_path'):
+            trading_model.load_model(config['model_path'])
+        model_handle.swap(trading_model)
+    return market_client, news_manager, model_handle
+
+
+def signal_worker_main(worker_id, command_queue, result_queue, config):
+    """
+    Entry point of a signal worker process
+
+    Commands are ``('subscribe', asset, timeframe)``,
+    ``('unsubscribe', asset, timeframe)`` and ``('stop',)``. Every
+    ``config['interval']`` seconds the worker generates a signal for each
+    key it owns and puts ``(asset, timeframe, payload)`` on ``result_queue``.
+
+    Args:
+        worker_id (int): Index of this worker in the pool
+        command_queue (multiprocessing.Queue): Commands from the pool
+        result_queue (multiprocessing.Queue): Queue shared with the SocketIO process
+        config (dict): Worker configuration (interval, model path or registry, API keys)
+    """
+    market_client, news_manager, model_handle = _build_worker_state(config)
+    interval = config.get('interval', 5)
+
+    # Keys owned by this worker (their feature state lives in the model)
+    subscriptions = set()
+    next_run = time.monotonic()
+
+    while True:
+        # Wait for commands until the next update round is due
+        timeout = max(0.0, next_run - time.monotonic())
+        try:
+            command = command_queue.get(timeout=timeout)
+        except queue.Empty:
+            command = None
+
+        if command is not None:
+            action = command[0]
+            if action == 'stop':
+                break
+            key = (command[1], command[2])
+            if action == 'subscribe':
+                subscriptions.add(key)
+            elif action == 'unsubscribe':
+                subscriptions.discard(key)
+                model_handle.model.live_states.pop(key, None)
+
+        if time.monotonic() < next_run:
+            continue
+
+        # Pick up a newly promoted model version between rounds (the new
+        # version's arrays are memory-mapped, so workers share its pages)
+        try:
+            model_handle.refresh()
+        except Exception as e:
+            print(f"Worker {worker_id}: error refreshing model: {str(e)}")
+
+        # Fetch every owned key's data, then score them all with one model call
+        assets = list(dict.fromkeys(asset for asset, _ in subscriptions))
+        sentiment = {}
+        if assets:
+            try:
+                news_data = news_manager.collect_and_analyze_news(assets, days_back=3, max_articles_per_asset=5)
+                sentiment = news_manager.get_signal_sentiment(news_data)
+            except Exception as e:
+                print(f"Worker {worker_id}: error collecting news for trading signals: {str(e)}")
+
+        streams = {}
+        for asset, timeframe in list(subscriptions):
+            if asset not in sentiment:
+                continue
+            try:
+                market_data = market_client.get_price_data(asset, interval=timeframe, bars=100)
+                streams[(asset, timeframe)] = (market_data, sentiment[asset])
+            except Exception as e:
+                print(f"Worker {worker_id}: error updating trading signal for {asset}: {str(e)}")
+
+        try:
+            signals = model_handle.model.predict_batch(streams) if streams else {}
+        except Exception as e:
+            print(f"Worker {worker_id}: error scoring trading signals: {str(e)}")
+            signals = {}
+        for (asset, timeframe), signal in signals.items():
+            if 'error' in signal:
+                print(f"Worker {worker_id}: error updating trading signal for {asset}: {signal['error']}")
+                continue
+            result_queue.put((asset, timeframe, {
+                'asset': asset,
+                'timeframe': timeframe,
+                'signal': signal,
+                'worker': worker_id,
+                'timestamp': datetime.now().isoformat()
+            }))
+        next_run = time.monotonic() + interval
+
+
+class SignalWorkerPool:
+    """
+    Pool of processes generating trading signals for sharded subscriptions
+
+    The pool remembers each worker's subscriptions, so a worker that died is
+    restarted and resubscribed the next time the pool is used.
+    """
+    # Process entry point, called as worker_main(worker_id, command_queue, result_queue, config)
+    worker_main = staticmethod(signal_worker_main)
+
+    def __init__(self, num_workers=None, interval=5, model_path=None,
+                 market_api_key=None, news_api_key=None, replicas=100,
+                 sentiment_cache_path=None, sentiment_backends='vader',
+                 model_registry=None, model_name='trading_signal'):
+        """
+        Initialize the pool
+
+        Args:
+            num_workers (int): Number of worker processes (CPU count when None)
+            interval (float): Seconds between signal updates for each key
+            model_path (str): Saved TradingSignalModel preloaded by every worker
+                (when no registry version is current)
+            market_api_key (str): API key for the market data provider
+            news_api_key (str): API key for the news provider
+            replicas (int): Virtual points per worker on the hash ring
+            sentiment_cache_path (str): SQLite sentiment cache shared by the workers
+            sentiment_backends (str): Sentiment backend mode of the workers ('vader'
+                or 'both'); signals only use VADER scores, so TextBlob is skipped by default
+            model_registry (str): ModelRegistry directory whose current version
+                every worker serves, switching when another is promoted
+            model_name (str): Registered model name
+        """
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.config = {
+            'interval': interval,
+            'model_path': model_path,
+            'model_registry': model_registry,
+            'model_name': model_name,
+            'market_api_key': market_api_key,
+            'news_api_key': news_api_key,
+            'sentiment_cache_path': sentiment_cache_path,
+            'sentiment_backends': sentiment_backends
+        }
+        self.ring = ConsistentHashRing(range(self.num_workers), replicas=replicas)
+
+        # Spawned processes don't inherit the parent's threads or sockets
+        self._context = multiprocessing.get_context('spawn')
+        self.result_queue = self._context.Queue()
+        self.command_queues = []
+        self.processes = []
+        # Subscriptions of each worker, re-sent when it is restarted
+        self.worker_subscriptions = [set() for _ in range(self.num_workers)]
+        self.restarts = 0
+        self._lock = threading.Lock()
+
+    def _start_worker(self, worker_id):
+        command_queue = self._context.Queue()
+        process = self._context.Process(
+            target=self.worker_main,
+            args=(worker_id, command_queue, self.result_queue, self.config),
+            name=f"signal-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        return command_queue, process
+
+    def start(self):
+        """Start the worker processes"""
+        for worker_id in range(self.num_workers):
+            command_queue, process = self._start_worker(worker_id)
+            self.command_queues.append(command_queue)
+            self.processes.append(process)
+        return self
+
+    def _ensure_alive(self, worker_id):
+        """Restart a worker that exited and resubscribe its keys (caller holds the lock)"""
+        process = self.processes[worker_id]
+        if process.is_alive():
+            return
+        print(f"Signal worker {worker_id} exited with code {process.exitcode}, restarting it")
+        self.command_queues[worker_id], self.processes[worker_id] = self._start_worker(worker_id)
+        self.restarts += 1
+        for asset, timeframe in self.worker_subscriptions[worker_id]:
+            self.command_queues[worker_id].put(('subscribe', asset, timeframe))
+
+    def check_workers(self):
+        """Restart every worker that exited since the last check"""
+        with self._lock:
+            for worker_id in range(len(self.processes)):
+                self._ensure_alive(worker_id)
+
+    def worker_for(self, asset, timeframe):
+        """Return the id of the worker owning a subscription"""
+        return self.ring.get_node(subscription_key(asset, timeframe))
+
+    def subscribe(self, asset, timeframe):
+        worker_id = self.worker_for(asset, timeframe)
+        with self._lock:
+            self.worker_subscriptions[worker_id].add((asset, timeframe))
+            self._ensure_alive(worker_id)
+            self.command_queues[worker_id].put(('subscribe', asset, timeframe))
+
+    def unsubscribe(self, asset, timeframe):
+        worker_id = self.worker_for(asset, timeframe)
+        with self._lock:
+            self.worker_subscriptions[worker_id].discard((asset, timeframe))
+            self._ensure_alive(worker_id)
+            self.command_queues[worker_id].put(('unsubscribe', asset, timeframe))
+
+    def get_result(self, timeout=None):
+        """
+        Wait for the next signal published by any worker
+
+        Workers that died are restarted first, so a caller polling for
+        results keeps the pool at full strength.
+
+        Args:
+            timeout (float): Seconds to wait (forever when None)
+
+        Returns:
+            tuple: (asset, timeframe, payload), or None on timeout
+        """
+        self.check_workers()
+        try:
+            return self.result_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def stop(self, timeout=10):
+        """
+        Ask every worker to finish its current round and exit
+
+        Args:
+            timeout (float): Seconds to wait for each worker before terminating it
+        """
+        with self._lock:
+            for command_queue in self.command_queues:
+                command_queue.put(('stop',))
+            for process in self.processes:
+                process.join(timeout)
+                if process.is_alive():
+                    process.terminate()
+            self.command_queues = []
+            self.processes = []
@@ -1,3 +1,5 @@
+import math
+from collections import deque
 import pandas as pd
 import numpy as np
 
@@ -127,4 +129,183 @@ def generate_trading_signals(df):
     signals.loc[signals['combined_signal'] >= 2, 'trading_signal'] = 1  # Strong buy
     signals.loc[signals['combined_signal'] <= -2, 'trading_signal'] = -1  # Strong sell
     
-    return signals 
\ No newline at end of file
+    return signals 
+
+class RollingWindow:
+    """Latest values of a series for rolling statistics updated one bar at a time"""
+    def __init__(self, period):
+        self.period = period
+        self.values = deque(maxlen=period)
+
+    def copy(self):
+        window = RollingWindow(self.period)
+        window.values.extend(self.values)
+        return window
+
+    def push(self, value):
+        self.values.append(value)
+
+    @property
+    def full(self):
+        return len(self.values) == self.period
+
+    def mean(self):
+        """Mean of the window (NaN until it is full, like rolling().mean())"""
+        if not self.full:
+            return math.nan
+        return sum(self.values) / self.period
+
+    def std(self):
+        """Sample standard deviation of the window (NaN until it is full)"""
+        if not self.full:
+            return math.nan
+        mean = sum(self.values) / self.period
+        return math.sqrt(sum((value - mean) ** 2 for value in self.values) / (self.period - 1))
+
+    def min(self):
+        return min(self.values) if self.full else math.nan
+
+    def max(self):
+        return max(self.values) if self.full else math.nan
+
+    def __getitem__(self, position):
+        return self.values[position]
+
+    def __len__(self):
+        return len(self.values)
+
+class ExponentialAverage:
+    """Exponential moving average updated one value at a time, as ewm(span, adjust=False)"""
+    def __init__(self, span):
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.value = None
+
+    def copy(self):
+        average = ExponentialAverage(self.span)
+        average.value = self.value
+        return average
+
+    def push(self, value):
+        if self.value is None:
+            self.value = value
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * value
+        return self.value
+
+def safe_divide(a, b):
+    """a / b for floats with NumPy semantics (inf or NaN instead of ZeroDivisionError)"""
+    if b == 0 or math.isnan(b):
+        if math.isnan(a) or a == 0 or math.isnan(b):
+            return math.nan
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+class IncrementalIndicators:
+    """
+    Base class of indicator features updated one OHLCV bar at a time
+
+    Subclasses keep their rolling windows and averages in the dict returned
+    by _initial_state() and compute the features of a new bar from it in
+    _compute(). update() adds a bar, or replaces the last one when the
+    timestamp repeats, so a forming bar can be fed repeatedly as it changes.
+    sync() feeds only the bars of a price window that are new since the
+    last call.
+    """
+    BAR_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget all bars"""
+        self.last_timestamp = None
+        self.last_bar = None
+        self.bars = 0
+        self.features = None
+        self._state = self._initial_state()
+        self._previous = None
+
+    def _initial_state(self):
+        raise NotImplementedError
+
+    def _compute(self, state, bar):
+        """
+        Update the state with a bar and compute its features
+
+        Args:
+            state (dict): State left by the previous bar, updated in place
+            bar (dict): open, high, low, close and volume of the bar
+
+        Returns:
+            dict: Feature values of the bar
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _copy_state(state):
+        copied = {}
+        for key, value in state.items():
+            if isinstance(value, (RollingWindow, ExponentialAverage)):
+                value = value.copy()
+            elif isinstance(value, deque):
+                value = deque(value, maxlen=value.maxlen)
+            copied[key] = value
+        return copied
+
+    def update(self, timestamp, bar):
+        """
+        Add a bar, or replace the last one if the timestamp repeats
+
+        Args:
+            timestamp: Bar timestamp
+            bar (dict): open, high, low, close and volume of the bar
+
+        Returns:
+            dict: Feature values of the bar
+        """
+        if self.last_timestamp is not None and timestamp == self.last_timestamp:
+            # Replacing the forming bar: restart from the state before it
+            state = self._copy_state(self._previous)
+            self.bars -= 1
+        else:
+            self._previous = self._copy_state(self._state)
+            state = self._state
+
+        self.features = self._compute(state, bar)
+        self._state = state
+        self.last_timestamp = timestamp
+        self.last_bar = tuple(bar[name] for name in self.BAR_COLUMNS)
+        self.bars += 1
+        return self.features
+
+    def sync(self, market_data):
+        """
+        Feed the bars of a price window that have not been seen yet
+
+        The last known bar is fed again if it changed (it was still forming).
+        If the window no longer contains the last known bar the state is
+        rebuilt from the whole window.
+
+        Args:
+            market_data (pandas.DataFrame): OHLCV bars indexed by timestamp
+
+        Returns:
+            dict: Feature values of the newest bar (None for an empty window)
+        """
+        index = market_data.index
+        start = 0
+        if self.last_timestamp is not None:
+            position = index.get_loc(self.last_timestamp) if self.last_timestamp in index else None
+            if isinstance(position, (int, np.integer)):
+                start = position
+            else:
+                self.reset()
+
+        columns = {name: market_data[name].to_numpy(dtype=np.float64)[start:] for name in self.BAR_COLUMNS}
+        for offset, timestamp in enumerate(index[start:]):
+            bar = {name: float(column[offset]) for name, column in columns.items()}
+            if offset == 0 and self.last_bar == tuple(bar[name] for name in self.BAR_COLUMNS):
+                continue
+            self.update(timestamp, bar)
+        return self.features
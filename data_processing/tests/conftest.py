@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The services import their modules as top-level packages (see api.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
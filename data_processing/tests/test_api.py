@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import api
+from news_sentiment import NewsSentimentManager
+from ml_models.trading_model import TradingSignalModel
+from ml_models.model_registry import ModelHandle
+
+
+class StubMarketClient:
+    def get_price_data(self, asset, interval='1h', bars=100):
+        return api._dummy_market_data()
+
+
+class StubNewsClient:
+    def get_news_for_assets(self, assets, days_back=3, max_articles_per_asset=10):
+        return {asset: [
+            {'title': f'{asset} rallies', 'url': f'https://example.com/{asset}/1', 'publishedAt': '2026-01-01T00:00:00Z'},
+            {'title': f'{asset} slips', 'url': f'https://example.com/{asset}/2', 'publishedAt': '2026-01-01T01:00:00Z'}
+        ] for asset in assets}
+
+
+class StubSentimentAnalyzer:
+    """VADER-only scores without the NLTK lexicon"""
+    def analyze_articles(self, articles):
+        for article in articles:
+            score = 0.6 if 'rallies' in article['title'] else -0.2
+            article['sentiment'] = {
+                'vader_compound': score,
+                'sentiment_label': 'positive' if score > 0 else 'negative'
+            }
+        return articles
+
+
+def _trained_model():
+    model = TradingSignalModel()
+    market_data = api._dummy_market_data()
+    sentiment_data = {'compound': 0.0, 'article_count': 0}
+    rows = len(model.prepare_features(market_data, sentiment_data))
+    model.train(market_data, sentiment_data, np.arange(rows) % 2)
+    return model
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    news_manager = NewsSentimentManager(StubNewsClient(), StubSentimentAnalyzer(), data_dir=str(tmp_path))
+    monkeypatch.setattr(api, '_services', {
+        'market_client': StubMarketClient(),
+        'news_manager': news_manager,
+        'model_handle': ModelHandle(_trained_model())
+    })
+    yield api.app.test_client()
+    news_manager.close()
+
+
+def test_trading_signal_uses_news_sentiment(client):
+    response = client.get('/api/trading-signal/US100')
+
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body['signal'] in ('BUY', 'SELL')
+    assert body['features']['sentiment_score'] == pytest.approx(0.2)
+    assert body['features']['sentiment_volume'] == 2
+
+
+def test_warm_model_runs_dummy_inference(client):
+    trading_model = api.get_trading_model()
+
+    api._warm_model(trading_model)
+
+    assert 'warm_up' not in trading_model.live_states
+
+
+def test_news_sentiment_averages_asset_articles(client):
+    response = client.get('/api/news-sentiment/US100')
+
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body['overall_sentiment']['score'] == pytest.approx(0.2)
+    assert body['overall_sentiment']['direction'] == 'positive'
+    assert len(body['articles']) == 2
+
+
+def test_news_sentiment_without_articles(client, monkeypatch):
+    monkeypatch.setattr(StubNewsClient, 'get_news_for_assets',
+                        lambda self, assets, *args: {asset: [] for asset in assets})
+
+    response = client.get('/api/news-sentiment/US100')
+
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['overall_sentiment'] == {'score': 0, 'direction': 'negative'}